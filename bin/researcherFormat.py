@@ -22,7 +22,11 @@ def usage():
     print('Correct syntax is:')
     print('researcherFormat -i MARC_PATH -r REQUEST_PATH -o OUTPUT_FOLDER [OPTIONS]\n')
     print('\nConvert MARC_PATH to Researcher Format with parameters set in REQUEST_PATH.')
-    print('    -i    Path to file of MARC records')
+    print('    -i    Path to file of MARC records (.lex), MARCXML records (.xml)')
+    print('          or MARC-in-JSON records, one on each line (.json)')
+    print('          Files may be compressed (e.g. .lex.gz, or .lex.zst if zstandard is installed).')
+    print('          Several files can be given as a glob pattern (e.g. part*.lex.gz),')
+    print('          or as paths separated by {}, and are read in turn as a single file.'.format(os.pathsep))
     print('    -r    Path to Outlook message containing details of the request')
     print('    -o    Folder to save Researcher Format output files')
     print('\nUse quotation marks (") around arguments which contain spaces')
@@ -38,6 +42,13 @@ def usage():
     print('    -n       Default transformation for Newspaper records.')
     print('\nAny of ...')
     print('    -o       OUTPUT_FOLDER to save output files.')
+    print('    --select Only convert records which meet the selection criteria in REQUEST_PATH.')
+    print('    --resume Resume an interrupted conversion from the last checkpoint saved in OUTPUT_FOLDER.')
+    print('             The same parameters must be used as for the interrupted conversion.')
+    print('    --shards N   Divide the conversion into N shards, which can be converted independently.')
+    print('    --shard K    Convert shard K of N, writing part files to OUTPUT_FOLDER.')
+    print('    --shard_by   Divide records between shards by count (default) or by id.')
+    print('    --merge      Merge the part files written by N shards in OUTPUT_FOLDER, without converting records.')
     print('    --debug  Debug mode.')
     print('    --help   Show this message and exit.')
     exit_prompt()
@@ -48,10 +59,12 @@ def main(argv=None):
         name = str(sys.argv[1])
 
     marc_path, request_path, output_folder, options = '', '', '', ''
-    debug = False
+    debug, select, resume, merge = False, False, False, False
+    shards, shard, shard_by = 1, 1, 'count'
 
     try:
-        opts, args = getopt.getopt(argv, 'i:r:o:dbcefmn', ['request_path=', 'output_folder=', 'debug', 'help'])
+        opts, args = getopt.getopt(argv, 'i:r:o:dbcefmn', ['request_path=', 'output_folder=', 'select', 'resume',
+                                                           'shards=', 'shard=', 'shard_by=', 'merge', 'debug', 'help'])
     except getopt.GetoptError as err:
         exit_prompt('Error: {}'.format(err))
     if opts is None or not opts:
@@ -59,6 +72,15 @@ def main(argv=None):
     for opt, arg in opts:
         if opt == '--help': usage()
         elif opt == '--debug': debug = True
+        elif opt == '--select': select = True
+        elif opt == '--resume': resume = True
+        elif opt == '--merge': merge = True
+        elif opt in ['--shards', '--shard']:
+            try:
+                if opt == '--shards': shards = int(arg)
+                else: shard = int(arg)
+            except ValueError: exit_prompt('Error: {} must be a number'.format(opt))
+        elif opt == '--shard_by': shard_by = arg.lower()
         elif opt in ['-i', '--marc_path']: marc_path = arg
         elif opt in ['-r', '--request_path']: request_path = arg
         elif opt in ['-o', '--output_folder']: output_folder = arg
@@ -67,8 +89,16 @@ def main(argv=None):
 
     if len(re.sub(r'[^a-z]','',options)) > 1:
         exit_prompt('Error: too many optional parameters specified')
+    if shards < 1 or not 1 <= shard <= shards:
+        exit_prompt('Error: shard must be between 1 and the number of shards')
+    if shard_by not in ['count', 'id']:
+        exit_prompt('Error: shards must be divided by count or by id')
 
-    marc2rf_researcherFormat(marc_path, request_path, output_folder, options, debug)
+    if merge:
+        marc2rf_merge_shards(output_folder, shards, debug)
+    else:
+        marc2rf_researcherFormat(marc_path, request_path, output_folder, options, debug, select, resume,
+                                 shards, shard, shard_by)
 
     print('\n\nAll processing complete')
     print('----------------------------------------')
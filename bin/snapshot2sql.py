@@ -28,8 +28,20 @@ def usage():
     print('    -d    Path to save the SQL database')
     print('\nUse quotation marks (") around arguments which contain spaces')
     print('\nOptions:')
+    print('    --benchmark  Compare the speed and output of the authority parsers')
+    print('                 over the authorities in IAMS_SNAPSHOT_PATH, without creating a database.')
+    print('    --spill      Look up authorities from the database on disk rather than holding them in memory.')
+    print('    --incremental  Update DB_PATH with records which have changed since it was built,')
+    print('                   or which link to authorities which have changed, rather than rebuilding it.')
+    print('    --processes    Number of PROCESSES to use when converting records (default 1).')
+    print('    --resume       Resume an interrupted conversion from the last checkpoint saved in DB_PATH.')
+    print('    --reparse      Parse all authorities and convert all records again,')
+    print('                   rather than using those saved in DB_PATH.')
     print('    --debug  Debug mode.')
     print('    --help   Show this message and exit.')
+    print('\nAuthorities are saved in DB_PATH, and are only parsed again if they have changed')
+    print('since the previous time DB_PATH was built, or if they were saved by a different version')
+    print('of snapshot2sql. With --incremental, DB_PATH is rebuilt if it was built by a different version.')
     exit_prompt()
 
 
@@ -38,9 +50,10 @@ def main(argv=None):
         name = str(sys.argv[1])
 
     iams_snapshot_path, db_path = '', ''
-    debug = False
+    benchmark, spill, incremental, resume, reparse, debug = False, False, False, False, False, False
+    processes = 1
 
-    try: opts, args = getopt.getopt(argv, 'i:d:', ['iams_snapshot_path=', 'db_path=', 'debug', 'help'])
+    try: opts, args = getopt.getopt(argv, 'i:d:', ['iams_snapshot_path=', 'db_path=', 'benchmark', 'spill', 'incremental', 'processes=', 'resume', 'reparse', 'debug', 'help'])
     except getopt.GetoptError as err:
         exit_prompt('Error: {}'.format(err))
     if opts is None or not opts:
@@ -50,6 +63,19 @@ def main(argv=None):
             usage()
         elif opt == '--debug':
             debug = True
+        elif opt == '--benchmark':
+            benchmark = True
+        elif opt == '--spill':
+            spill = True
+        elif opt == '--incremental':
+            incremental = True
+        elif opt == '--resume':
+            resume = True
+        elif opt == '--reparse':
+            reparse = True
+        elif opt == '--processes':
+            try: processes = int(arg)
+            except ValueError: exit_prompt('Error: PROCESSES must be a number')
         elif opt in ['-i', '--iams_snapshot_path']:
             iams_snapshot_path = arg
         elif opt in ['-d', '--db_path']:
@@ -60,7 +86,11 @@ def main(argv=None):
         print('IAMS_SNAPSHOT_PATH: {}'.format(str(iams_snapshot_path)))
         print('DB_PATH: {}'.format(str(db_path)))
 
-    iams2rf_snapshot2sql(iams_snapshot_path, db_path, debug)
+    if benchmark:
+        iams_folder, iams_file, iams_ext = check_file_location(iams_snapshot_path, 'IAMS Database Snapshot', '.csv', True)
+        benchmark_authorities(os.path.join(iams_folder, iams_file + iams_ext))
+    else:
+        iams2rf_snapshot2sql(iams_snapshot_path, db_path, debug, spill, incremental, processes, resume, reparse)
 
     print('\n\nAll processing complete')
     print('----------------------------------------')
@@ -32,6 +32,10 @@ def usage():
     print('\nIf REQUEST_PATH is not specified you will be given the option to set parameters for the output')
     print('\nOptions:')
     print('    -o       OUTPUT_FOLDER to save output files.')    
+    print('    --serve  PORT to answer requests as a service on localhost, instead of using REQUEST_PATH.')
+    print('             Results are returned as CSV for requests of the form')
+    print('             http://localhost:PORT/records?l1=eng&d1=1800&d2=1850&o=ID|TT')
+    print('             (use /titles, /names or /topics for the other output files).')
     print('    --debug  Debug mode.')
     print('    --help   Show this message and exit.')
     exit_prompt()
@@ -42,10 +46,11 @@ def main(argv=None):
         name = str(sys.argv[1])
 
     db_path, request_path, output_folder = '', '', ''
+    port = None
     debug = False
 
     try:
-        opts, args = getopt.getopt(argv, 'd:r:o:', ['db_path=', 'request_path=', 'output_folder=', 'debug', 'help'])
+        opts, args = getopt.getopt(argv, 'd:r:o:', ['db_path=', 'request_path=', 'output_folder=', 'serve=', 'debug', 'help'])
     except getopt.GetoptError as err:
         exit_prompt('Error: {}'.format(err))
     if opts is None or not opts:
@@ -56,9 +61,15 @@ def main(argv=None):
         elif opt in ['-d', '--db_path']: db_path = arg
         elif opt in ['-r', '--request_path']: request_path = arg
         elif opt in ['-o', '--output_folder']: output_folder = arg
+        elif opt == '--serve':
+            try: port = int(arg)
+            except ValueError: exit_prompt('Error: PORT must be a number')
         else: exit_prompt('Error: Option {} not recognised'.format(opt))
 
-    iams2rf_sql2rf(db_path, request_path, output_folder, debug)
+    if port is not None:
+        iams2rf_sql2rf_service(db_path, port, debug)
+    else:
+        iams2rf_sql2rf(db_path, request_path, output_folder, debug)
 
     print('\n\nAll processing complete')
     print('----------------------------------------')
@@ -14,20 +14,31 @@ __version__ = '1.0.0'
 __status__ = '4 - Beta Development'
 
 
-def iams2rf_snapshot2sql(iams_snapshot_path, db_path, debug=False):
+def iams2rf_snapshot2sql(iams_snapshot_path, db_path, debug=False, spill=False, incremental=False, processes=1,
+                         resume=False, reparse=False):
     """Convert the IAMS Published Snapshot to an SQL database.
 
     :rtype: object
     :param iams_snapshot_path: Path to the IAMS Published Snapshot.
     :param db_path: Path to save the SQL database.
     :param debug: Display additional output to assist with debugging.
+    :param spill: Look up authorities from the database rather than holding them in memory.
+    :param incremental: Update an existing database with records which have changed, rather than rebuilding it.
+    :param processes: Number of processes to use when converting records.
+    :param resume: Resume an interrupted conversion from the last checkpoint saved in the database.
+    :param reparse: Parse all authorities and convert all records again, rather than using those saved in the database.
     """
 
-    converter = IAMS2SQL(debug)
+    converter = IAMS2SQL(debug, spill, incremental, processes, resume, reparse)
     if debug:
         print('Creating instance of IAMS2SQL class with the following parameters:')
         print('iams_snapshot_path: {}'.format(str(iams_snapshot_path)))
         print('db_path: {}'.format(str(db_path)))
+        print('spill: {}'.format(str(spill)))
+        print('incremental: {}'.format(str(incremental)))
+        print('processes: {}'.format(str(processes)))
+        print('resume: {}'.format(str(resume)))
+        print('reparse: {}'.format(str(reparse)))
     converter.iams2rf_snapshot2sql(iams_snapshot_path, db_path)
 
 
@@ -49,3 +60,21 @@ def iams2rf_sql2rf(db_path, request_path, output_folder, debug=False):
         print('request_path: {}'.format(str(request_path)))
         print('output_folder: {}'.format(str(output_folder)))
     converter.iams2rf_sql2rf(db_path, request_path, output_folder)
+
+
+def iams2rf_sql2rf_service(db_path, port=8080, debug=False):
+    """Run sql2rf as a long-running service on localhost,
+    keeping the connection to the SQL database open between requests
+
+    :rtype: object
+    :param db_path: Path to the SQL database.
+    :param port: Port on which to listen for requests.
+    :param debug: Display additional output to assist with debugging.
+    """
+
+    service = SQL2RFService(db_path, debug=debug)
+    if debug:
+        print('Creating instance of SQL2RFService class with the following parameters:')
+        print('db_path: {}'.format(str(db_path)))
+        print('port: {}'.format(str(port)))
+    service.serve(port)
@@ -5,15 +5,18 @@
 
 # Import required modules
 # These should all be contained in the standard library
-from collections import OrderedDict
+from collections import OrderedDict, deque
 import datetime
 import gc
+import hashlib
 import locale
+import multiprocessing
 import os
 import re
 import sqlite3
 import sys
 import unicodedata
+import urllib.parse
 
 __author__ = 'Victoria Morris'
 __license__ = 'MIT License'
@@ -31,6 +34,17 @@ gc.set_threshold(400, 5, 5)
 # ====================
 
 RE_IAMS_ID = re.compile('0[34][0-9]-[0-9]{9}')
+RE_HYPHENS = re.compile('-{2,}')
+RE_WHITESPACE = re.compile(r'\s+')
+RE_SELF_CLOSING_TAG = re.compile(r'<[^/>]+/>', flags=re.IGNORECASE)
+RE_EMPTY_ITEM = re.compile(r'[;\s.]+;')
+RE_END_PARAGRAPH = re.compile(r'[.\s]*</p>\s*', flags=re.IGNORECASE)
+RE_FORMATTING_TAG = re.compile(
+    r'[<\[]/*(b|br|emph|i|italic|italics|item|li|list|ol|p|sup|superscript|sub|subscript|ul)(\s+[^>\]]+)?\s*/*[>\]]',
+    flags=re.IGNORECASE)
+RE_SEMICOLON_FULL_STOP = re.compile(r';\s+\.')
+RE_TAG = re.compile(r'<(/?)([A-Za-z_][\w.:-]*)([^<>]*?)(/?)>')
+RE_ATTRIBUTE = re.compile(r'([A-Za-z_][\w.:-]*)\s*=\s*["\']+([^"\'>]*)["\']+')
 
 REGEXES = {
     'rel_name': re.compile(
@@ -76,15 +90,6 @@ REGEXES = {
     's_text': re.compile('<Entry\s*[^>]*>(.*?)</Entry>'),
     's_type': re.compile('<Type\s*[^>]*>(.*?)</Type>'),
     'b_reference': re.compile('<Reference\s*[^>]*>(.*?)</Reference>'),
-    'b_title': re.compile('<Title\s*[^>]*>(.*?)</Title>'),
-    'AN': re.compile(
-        '<RelatedArchiveDescriptionNamedAuthority TargetNumber=["\']([0-9]{3}-[0-9]{9})["\']>\s*' +
-        '<RelationshipType>(.*?)</RelationshipType>'),
-    'LA': re.compile('<MaterialLanguage\s+[^>]*>(.*?)</MaterialLanguage>'),
-    'S_LANGUAGES': re.compile('<MaterialLanguage .*?LanguageIsoCode=["\']([a-z]+)["\']>'),
-    'SU': re.compile('<RelatedArchiveDescription(?:Place|Subject) TargetNumber=["\']([0-9]{3}-[0-9]{9})["\']>'),
-    'TV': re.compile('<AdditionalTitle>[^<>]*?<A?Title>(.*?)<\/A?Title>.*?<\/AdditionalTitle>'),
-    'OI': re.compile('<ExternalIdentifier>[^<>]*?<Value>(.*?)<\/Value>.*?<Type .*?>(.*?)<\/Type>.*?<\/ExternalIdentifier>'),
     'isni': re.compile('<ExternalIdentifier>[^<>]*?<Value>(.*?)<\/Value>.*?<Type .*?>[^<>]*?ISNI[^<>]*?<\/Type>.*?<\/ExternalIdentifier>'),
     'viaf': re.compile('<ExternalIdentifier>[^<>]*?<Value>(.*?)<\/Value>.*?<Type .*?>[^<>]*?VIAF[^<>]*?<\/Type>.*?<\/ExternalIdentifier>'),
 
@@ -94,6 +99,13 @@ REGEXES = {
 #    Lookup tables
 # ====================
 
+# Translation table used by clean() to normalize quotation marks, spaces and hyphens and remove control characters
+CLEAN_CHARACTERS = str.maketrans(dict(
+    [(c, "'") for c in '\u0022\u055A\u05F4\u2018\u2019\u201A\u201B\u201C\u201D\u201E\u201F\u275B\u275C\u275D\u275E\uFF07\u0060'] +
+    [(chr(c), None) for c in list(range(0x00, 0x20)) + list(range(0x80, 0xA0)) + [0x2028, 0x2029]] +
+    [(chr(c), ' ') for c in [0x00A0, 0x1680] + list(range(0x2000, 0x200B)) + [0x202F, 0x205F, 0x3000]] +
+    [(chr(c), '-') for c in list(range(0x2010, 0x2016)) + [0x2E3A, 0x2E3B, 0xFE58, 0xFE63, 0xFF0D]]))
+
 STATUS = {
     '1': 'Draft',
     '3': 'Pending Deletion',
@@ -127,10 +139,59 @@ TYPES = OrderedDict({
 })
 
 
+# Element containing each component of an authority record,
+# and the element with the authorised form of the name within which it should be found (if any)
+AUTHORITY_ELEMENTS = {
+    'c_name': ('CorporationName', 'CorporateName'),
+    'c_qualifiers': ('CorporationName', 'AdditionalQualifiers'),
+    'c_jurisdiction': ('CorporationName', 'Jurisdiction'),
+    'c_dates': ('CorporationName', 'DateRange'),
+    'f_surname': ('FamilyName', 'FamilySurname'),
+    'f_epithet': ('FamilyName', 'FamilyEpithet'),
+    'f_dates': ('FamilyName', 'DateRange'),
+    'p_surname': ('PersonName', 'Surname'),
+    'p_forename': ('PersonName', 'FirstName'),
+    'p_title': ('PersonName', 'Title'),
+    'p_epithet': ('PersonName', 'Epithet'),
+    'p_dates': ('PersonName', 'DateRange'),
+    'pl_name': (None, 'Name'),
+    'pl_localUnit': (None, 'LocalAdminUnit'),
+    'pl_widerUnit': (None, 'WiderAdminUnit'),
+    'pl_country': (None, 'Country'),
+    's_text': (None, 'Entry'),
+}
+
+
 # ====================
 #   Global variables
 # ====================
 
+# Number of archive descriptions sent to a worker process at a time when converting records in parallel
+BATCH_SIZE = 250
+
+# Number of archive descriptions read between checkpoints when converting records in parallel
+# When converting records in a single process, a checkpoint is saved whenever changes are committed
+CHECKPOINT_INTERVAL = 10000
+
+# Version of the authority parser, saved in the database with the authorities
+# Increase it whenever parse_authority() or AuthorityEntry change, so that saved authorities are parsed again
+AUTHORITY_VERSION = 1
+
+# Version of the conversion of archive descriptions, saved in the database with the hashes of the records
+# Increase it whenever ArchiveDescription, description_rows() or the cleaning functions change,
+# so that a database built by an earlier version is rebuilt rather than updated
+DESCRIPTION_VERSION = 1
+
+# Authorities used by a worker process when converting records in parallel
+WORKER_AUTHORITIES = None
+
+OUTPUT_FILES = OrderedDict([
+    ('records', 'records_IAMS.csv'),
+    ('titles', 'titles_IAMS.csv'),
+    ('names', 'names_IAMS.csv'),
+    ('topics', 'topics_IAMS.csv'),
+])
+
 TABLE_DEFINITIONS = {
     'records': None,
     'subjects': ([
@@ -148,6 +209,15 @@ TABLE_DEFINITIONS = {
     'titles': ([
         ('Title', 'NTEXT')
     ]),
+    'hashes': ([
+        ('Hash', 'NCHAR(40)'),
+        ('Authorities', 'NTEXT')
+    ]),
+    'checkpoint': ([
+        ('Records', 'INTEGER'),
+        ('Authorities', 'NTEXT'),
+        ('Incremental', 'INTEGER')
+    ]),
 }
 
 # ====================
@@ -155,6 +225,16 @@ TABLE_DEFINITIONS = {
 # ====================
 
 
+class ConversionError(Exception):
+    """Raised when an archive description cannot be converted, in either the main process or a worker process"""
+
+    def __init__(self, rid, error):
+        Exception.__init__(self, rid, error)
+        self.rid, self.error = rid, error
+
+    def __str__(self): return 'Error [at008]: Record {} could not be converted: {}'.format(self.rid, self.error)
+
+
 class Output:
     def __init__(self):
         self.values = OrderedDict([
@@ -251,19 +331,25 @@ class Output:
 
 
 class Authority:
-    def __init__(self, record, a, atype):
+    def __init__(self, record, a, atype, method='elements'):
         self.a = a
         self.atype = atype
 
-        # Remove <AdditionalTitles> elements to avoid conflict with <Title> element
-        record = re.sub(r'<AdditionalTitles>.*?</AdditionalTitles>', '', record)
+        if method == 'regex':
+            # Remove <AdditionalTitles> elements to avoid conflict with <Title> element
+            record = re.sub(r'<AdditionalTitles>.*?</AdditionalTitles>', '', record)
+        elif not isinstance(record, Fragment):
+            record = Fragment(record)
 
         for item in self.a:
             self.a[item] = ''
             try:
-                if REGEXES[item].search(record) and REGEXES[item].search(record).group(1).lower() not in \
-                        ['-', 'not applicable', 'undetermined', 'unknown', 'unspecified']:
-                    self.a[item] = REGEXES[item].search(record).group(1)
+                if method == 'regex':
+                    value = REGEXES[item].search(record)
+                    if value: value = value.group(1)
+                else: value = get_authority_value(record, item)
+                if value and value.lower() not in ['-', 'not applicable', 'undetermined', 'unknown', 'unspecified']:
+                    self.a[item] = value
                     if item == 'isni':
                         self.a[item] = 'http://isni.org/isni/' + self.a[item]
                     elif item == 'viaf':
@@ -283,7 +369,7 @@ class Authority:
 
 
 class Corporation(Authority):
-    def __init__(self, record):
+    def __init__(self, record, method='elements'):
         a = OrderedDict([
             ('c_name', ''),
             ('c_qualifiers', ''),
@@ -292,11 +378,11 @@ class Corporation(Authority):
             ('isni', ''),
             ('viaf', ''),
         ])
-        Authority.__init__(self, record, a, 'corporation')
+        Authority.__init__(self, record, a, 'corporation', method)
 
 
 class Family(Authority):
-    def __init__(self, record):
+    def __init__(self, record, method='elements'):
         a = OrderedDict([
             ('f_surname', ''),
             ('f_epithet', ''),
@@ -304,11 +390,11 @@ class Family(Authority):
             ('isni', ''),
             ('viaf', ''),
         ])
-        Authority.__init__(self, record, a, 'family')
+        Authority.__init__(self, record, a, 'family', method)
 
 
 class Person(Authority):
-    def __init__(self, record):
+    def __init__(self, record, method='elements'):
         a = OrderedDict([
             ('p_surname', ''),
             ('p_forename', ''),
@@ -318,50 +404,261 @@ class Person(Authority):
             ('isni', ''),
             ('viaf', ''),
         ])
-        Authority.__init__(self, record, a, 'person')
+        Authority.__init__(self, record, a, 'person', method)
 
 
 class Place(Authority):
-    def __init__(self, record):
+    def __init__(self, record, method='elements'):
         a = OrderedDict([
             ('pl_name', ''),
             ('pl_localUnit', ''),
             ('pl_widerUnit', ''),
             ('pl_country', ''),
         ])
-        Authority.__init__(self, record, a, 'place')
+        Authority.__init__(self, record, a, 'place', method)
 
 
 class Subject(Authority):
-    def __init__(self, record):
+    def __init__(self, record, method='elements'):
         a = OrderedDict([
             ('s_text', ''),
         ])
-        try:
-            atype = REGEXES['s_type'].search(record).group(1).lower()
-        except:
-            atype = 'general term'
-        Authority.__init__(self, record, a, atype)
+        if method == 'regex':
+            try:
+                atype = REGEXES['s_type'].search(record).group(1).lower()
+            except:
+                atype = 'general term'
+        else:
+            record = Fragment(record)
+            e = record.find('Type')
+            atype = e.content.lower() if e is not None else 'general term'
+        Authority.__init__(self, record, a, atype, method)
+
+
+class AuthorityEntry(object):
+    """Compact form of an authority record, holding only what is needed by ArchiveDescription.
+
+    :param rid: IAMS record ID of the authority.
+    :param text: String form of the authority.
+    :param name: Name.
+    :param dates: Dates associated with the name.
+    :param atype: Type of authority.
+    :param isni: ISNI URL.
+    :param viaf: VIAF URL.
+    """
+    __slots__ = ('rid', 'text', 'name', 'dates', 'atype', 'isni', 'viaf')
+
+    def __init__(self, rid, text, name, dates, atype, isni, viaf):
+        self.rid = rid
+        self.text = text
+        self.name = name
+        self.dates = dates
+        self.atype = sys.intern(atype)
+        self.isni = isni
+        self.viaf = viaf
+
+    def __str__(self):
+        return self.text
+
+    def __eq__(self, other):
+        return isinstance(other, AuthorityEntry) and self.rid == other.rid
+
+    def __hash__(self):
+        return hash(self.rid)
+
+    def row(self):
+        return self.rid, self.text, self.name, self.dates, self.atype, self.isni, self.viaf
+
+
+class AuthorityStore(object):
+    """Lookup of authority records by IAMS record ID.
+
+    If a connection to an SQL database is given, authorities are also saved in its authorities table,
+    together with a hash of the text of the authority record,
+    so that unchanged authorities need not be parsed again the next time the database is built.
+
+    :param conn: Connection to the SQL database.
+    :param spill: Look up authorities from the database rather than holding them in memory.
+    """
+
+    def __init__(self, conn=None, spill=False):
+        self.entries = {}
+        self.conn = conn
+        self.spill = spill and conn is not None
+        if self.conn is not None:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS authorities (RecordId NCHAR(13) PRIMARY KEY, Hash NCHAR(40), '
+                              'Authority NTEXT, Name NTEXT, Dates NTEXT, Type NTEXT, ISNI NTEXT, VIAF NTEXT);')
+
+    def __setitem__(self, rid, authority):
+        self.add(rid, authority)
+
+    def __getitem__(self, rid):
+        authority = self.get(rid)
+        if authority is None:
+            raise KeyError(rid)
+        return authority
+
+    def __contains__(self, rid):
+        return self.get(rid) is not None
+
+    def __len__(self):
+        if not self.spill:
+            return len(self.entries)
+        return self.conn.execute('SELECT COUNT(*) FROM authorities;').fetchone()[0]
+
+    def add(self, rid, authority, digest=''):
+        """Add an authority to the store, with a hash of the text of the authority record"""
+        if not isinstance(authority, AuthorityEntry):
+            authority = AuthorityEntry(rid, str(authority), authority.name, authority.dates, authority.atype,
+                                       authority.isni, authority.viaf)
+        if not self.spill:
+            self.entries[rid] = authority
+        if self.conn is not None:
+            self.conn.execute('INSERT OR REPLACE INTO authorities (RecordId, Hash, Authority, Name, Dates, Type, ISNI, VIAF) '
+                              'VALUES (?, ?, ?, ?, ?, ?, ?, ?);', (rid, digest) + authority.row()[1:])
+
+    def get(self, rid, default=None):
+        if not self.spill:
+            return self.entries.get(rid, default)
+        row = self.conn.execute('SELECT RecordId, Authority, Name, Dates, Type, ISNI, VIAF FROM authorities '
+                                'WHERE RecordId = ?;', (rid,)).fetchone()
+        if row is None:
+            return default
+        return AuthorityEntry(*row)
+
+    def hashes(self):
+        """Return the hashes of the authority records saved in the database"""
+        if self.conn is None:
+            return {}
+        return dict(self.conn.execute('SELECT RecordId, Hash FROM authorities;'))
+
+    def remove(self, rids):
+        """Remove authorities from the store"""
+        for rid in rids:
+            self.entries.pop(rid, None)
+            if self.conn is not None:
+                self.conn.execute('DELETE FROM authorities WHERE RecordId = ?;', (rid,))
+
+    def load(self):
+        """Load authorities saved in the database into memory"""
+        if self.conn is None or self.spill:
+            return
+        for row in self.conn.execute('SELECT RecordId, Authority, Name, Dates, Type, ISNI, VIAF FROM authorities;'):
+            if row[0] not in self.entries:
+                self.entries[row[0]] = AuthorityEntry(*row)
+
+    def commit(self):
+        if self.conn is not None:
+            self.conn.commit()
+
+
+class Element(object):
+    """An element within the XML fragment of an IAMS record.
+
+    :param name: Element name.
+    :param attributes: Unparsed attributes of the start tag.
+    :param parent: Parent element, or None for top-level elements.
+    """
+    __slots__ = ('name', 'attributes', 'parent', 'children', 'content')
+
+    def __init__(self, name, attributes='', parent=None):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.children = []
+        self.content = ''
+
+    def __str__(self):
+        return self.content
+
+    def get(self, attribute, default=''):
+        """Return the value of an attribute of the element"""
+        for match in RE_ATTRIBUTE.finditer(self.attributes):
+            if match.group(1) == attribute:
+                return match.group(2)
+        return default
+
+    def child(self, name):
+        """Return the first child element with a given name, or None"""
+        for c in self.children:
+            if c.name == name:
+                return c
+        return None
+
+    def find(self, name):
+        """Return the first descendant element with a given name, or None"""
+        for c in self.children:
+            if c.name == name:
+                return c
+            e = c.find(name)
+            if e is not None:
+                return e
+        return None
+
+
+class Fragment(object):
+    """Index of the elements within the XML fragment of an IAMS record, built in a single pass.
+
+    Element content is the raw text between the start and end tags, including any nested markup.
+    The fragment does not need to be well-formed: end tags without a start tag are ignored,
+    and elements without an end tag extend to the end of the text.
+
+    :param text: Text of the IAMS record.
+    """
+
+    def __init__(self, text):
+        self.elements = []
+        self.index = {}
+        stack, starts = [], []
+        for match in RE_TAG.finditer(text):
+            closing, name, attributes, empty = match.groups()
+            if closing:
+                for i in range(len(stack) - 1, -1, -1):
+                    if stack[i].name == name:
+                        stack[i].content = text[starts[i]:match.start()]
+                        for j in range(i + 1, len(stack)):
+                            stack[j].content = text[starts[j]:]
+                        del stack[i:], starts[i:]
+                        break
+                continue
+            element = Element(name, attributes, stack[-1] if stack else None)
+            if element.parent is not None:
+                element.parent.children.append(element)
+            self.elements.append(element)
+            self.index.setdefault(name, []).append(element)
+            if not empty:
+                stack.append(element)
+                starts.append(match.end())
+        for element, start in zip(stack, starts):
+            element.content = text[start:]
+
+    def find(self, name):
+        """Return the first element with a given name, or None"""
+        try: return self.index[name][0]
+        except (KeyError, IndexError): return None
+
+    def find_all(self, *names):
+        """Return all elements with any of the given names, in document order"""
+        if len(names) == 1:
+            return self.index.get(names[0], [])
+        return [e for e in self.elements if e.name in names]
 
 
 class ArchiveDescription:
     cols = Output()
+    # Columns taken directly from the content of one or more elements
+    elements = [(k, v[1].strip('|').split('|')) for (k, v) in cols.values.items() if v[1].startswith('||')]
+    # Columns derived by a method of the class; populated below the class definition
+    methods = []
 
     def __init__(self, record, authorities):
         self.text = clean(record)
-        # Rename additional titles to prevent conflicting element names
-        # <Title> element inside <AdditionalTitle> is now named <ATitle>
-        # <TitleType> element is now named <TTitleType>
-        # <TitleType> element inside <AdditionalTitle> is now named <ATTitleType>
-        self.text = re.sub(r'<AdditionalTitle>([^<>]*?)<Title>([^<>]*?)</Title>',
-                         r'<AdditionalTitle>\1<ATitle>\2</ATitle>', self.text)
-        self.text = re.sub(r'<TitleType>([^<>]*?)</TitleType>([^<>]*?)</AdditionalTitle>',
-                         r'<ATTitleType>\1</ATTitleType>\2<AdditionalTitle>', self.text)
-        self.text = self.text.replace('<TitleType', '<TTitleType').replace('</TitleType', '</TTitleType')
+        self.fragment = Fragment(self.text)
         self.output = Output()
         self.subjects = set()
         self.names = set()
         self.titles = set()
+        self.links = set()
         self.authorities = authorities
         for item in self.output.values:
             self.output.values[item] = set()
@@ -371,110 +668,117 @@ class ArchiveDescription:
         self.output.values['_ID'].add(self.ID)
         self.type = record_type(self.ID)
 
-        for k, v in self.cols.values.items():
-            if v[1].startswith('||'):
-                for c in v[1].strip('|').split('|'):
-                    try:
-                        self.output.values[k].add(
-                            quick_clean(self.text.split('<' + c, 1)[1].split('>', 1)[1].split('</' + c, 1)[0]))
-                    except: pass
-            else:
-                try: sub = getattr(self, k)
-                except: pass
-                else:
-                    try:
-                        if callable(sub):
-                            self.output.values[k].add(sub())
-                    except:
-                        print('\nError [cad001]: {}\n'.format(str(sys.exc_info())))
+        # <Title> elements inside <AdditionalTitle> are variant titles
+        titles = [e for e in self.fragment.find_all('Title') if e.parent is None or e.parent.name != 'AdditionalTitle']
+
+        for k, names in self.elements:
+            for c in names:
+                if c == 'Title': e = titles[0] if titles else None
+                else: e = self.fragment.find(c)
+                if e is not None:
+                    self.output.values[k].add(quick_clean(e.content))
+        for k in self.methods:
+            try:
+                self.output.values[k].add(getattr(self, k)())
+            except:
+                print('\nError [cad001]: {}\n'.format(str(sys.exc_info())))
 
         # IAMS <ExternalIdentifiers> element contains identifiers for fields VF, II, LC and OI
-        for match in REGEXES['OI'].findall(self.text):
-            if match[0] and match[0] !='':
-                if 'VIAF' in match[1]:
-                    self.output.values['VF'].add('http://viaf.org/viaf/' + match[0])
-                elif 'ISNI' in match[1]:
-                    self.output.values['II'].add('http://isni.org/isni/' + match[0])
-                elif 'LCCN' in match[1]:
-                    self.output.values['LC'].add(match[0])
+        for e in self.fragment.find_all('ExternalIdentifier'):
+            value, id_type = e.child('Value'), e.child('Type')
+            if value is None or id_type is None: continue
+            value, id_type = value.content, id_type.content
+            if value and value != '':
+                if 'VIAF' in id_type:
+                    self.output.values['VF'].add('http://viaf.org/viaf/' + value)
+                elif 'ISNI' in id_type:
+                    self.output.values['II'].add('http://isni.org/isni/' + value)
+                elif 'LCCN' in id_type:
+                    self.output.values['LC'].add(value)
                 else:
-                    if match[1] and match[1]!='':
-                        self.output.values['OI'].add('{} [{}]'.format(match[0], match[1]))
+                    if id_type and id_type != '':
+                        self.output.values['OI'].add('{} [{}]'.format(value, id_type))
                     else:
-                        self.output.values['OI'].add(match[0])
+                        self.output.values['OI'].add(value)
 
         # IAMS <DigitalFormatName> element is added to field DS
-        try: f = quick_clean(self.text.split('<DigitalFormatName>', 1)[1].split('</DigitalFormatName>', 1)[0])
-        except: f = ''
+        e = self.fragment.find('DigitalFormatName')
+        f = quick_clean(e.content) if e is not None else ''
         if f and f != '':
             self.output.values['DS'].add('Digital file format: {}.'.format(f))
 
-        # <AdditionalTitle> is repeatable, so requires a regular expression
+        # <AdditionalTitle> is repeatable
         # Also add title to self.titles
-        for match in REGEXES['TV'].findall(self.text):
-            self.output.values['TV'].add(match)
-            self.titles.add(match)
-        for match in REGEXES['b_title'].findall(self.text):
-            self.titles.add(match)
-
-        # Languages is repeatable, so requires a regular expression
-        for match in REGEXES['LA'].findall(self.text):
-            if match.lower() not in ['multiple languages', 'not applicable', 'undetermined', 'unknown', 'unspecified']:
-                self.output.values['LA'].add(match)
-
-        for match in REGEXES['S_LANGUAGES'].findall(self.text):
-            if match.lower() not in ['mul', 'und', 'zxx']:
-                self.output.values['S_LANGUAGES'].add(match)
+        for e in self.fragment.find_all('AdditionalTitle'):
+            title = e.child('Title')
+            if title is not None:
+                self.output.values['TV'].add(title.content)
+                self.titles.add(title.content)
+        for e in titles:
+            self.titles.add(e.content)
+
+        # Languages is repeatable
+        for e in self.fragment.find_all('MaterialLanguage'):
+            if e.attributes.strip() != '' and e.content.lower() not in \
+                    ['multiple languages', 'not applicable', 'undetermined', 'unknown', 'unspecified']:
+                self.output.values['LA'].add(e.content)
+            code = e.get('LanguageIsoCode')
+            if re.fullmatch('[a-z]+', code) and code not in ['mul', 'und', 'zxx']:
+                self.output.values['S_LANGUAGES'].add(code)
 
         # Subjects requires authority lookup
-        for match in REGEXES['SU'].findall(self.text):
-            if match in self.authorities and str(self.authorities[match]) != '':
-                self.subjects.add(self.authorities[match])
-                self.output.values['SU'].add(str(self.authorities[match]))
+        for e in self.fragment.find_all('RelatedArchiveDescriptionPlace', 'RelatedArchiveDescriptionSubject'):
+            match = e.get('TargetNumber')
+            self.links.add(match)
+            authority = self.authorities.get(match)
+            if authority is not None and str(authority) != '':
+                self.subjects.add(authority)
+                self.output.values['SU'].add(str(authority))
                 if record_type(match) == 'Place':
                     if len(self.output.values['G1']) == 0:
-                        self.output.values['G1'].add(str(self.authorities[match]))
+                        self.output.values['G1'].add(str(authority))
                     elif len(self.output.values['G2']) == 0:
-                        self.output.values['G2'].add(str(self.authorities[match]))
+                        self.output.values['G2'].add(str(authority))
 
         # Names requires authority lookup
-        for match in REGEXES['AN'].findall(self.text):
-            if match[0] in self.authorities and str(self.authorities[match[0]]) != '':
+        for e in self.fragment.find_all('RelatedArchiveDescriptionNamedAuthority'):
+            self.links.add(e.get('TargetNumber'))
+            if not e.children or e.children[0].name != 'RelationshipType': continue
+            match = (e.get('TargetNumber'), e.children[0].content)
+            authority = self.authorities.get(match[0])
+            if authority is not None and str(authority) != '':
                 if match[1].lower() == 'subject':
                     # Store a the name object
-                    self.subjects.add(self.authorities[match[0]])
-                    self.output.values['SU'].add(str(self.authorities[match[0]]))
+                    self.subjects.add(authority)
+                    self.output.values['SU'].add(str(authority))
                 elif match[1] != '':
                     # Store a tuple containing the name object and the relationship
-                    self.names.add((self.authorities[match[0]], match[1].lower()))
-                    self.output.values['AN'].add(str(self.authorities[match[0]]) + ' [' + match[1].lower() + ']')
+                    self.names.add((authority, match[1].lower()))
+                    self.output.values['AN'].add(str(authority) + ' [' + match[1].lower() + ']')
                     if match[1].lower() in ['author', 'creator'] and len(self.output.values['AA']) == 0 \
-                            and self.authorities[match[0]].name != '':
-                        self.output.values['AA'].add(self.authorities[match[0]].name)
-                        self.output.values['AD'].add(self.authorities[match[0]].dates)
-                        self.output.values['AT'].add(self.authorities[match[0]].atype)
+                            and authority.name != '':
+                        self.output.values['AA'].add(authority.name)
+                        self.output.values['AD'].add(authority.dates)
+                        self.output.values['AT'].add(authority.atype)
                         self.output.values['AR'].add(match[1].lower())
                         # Add ISNI and VIAF from first author
-                        self.output.values['II'].add(self.authorities[match[0]].isni)
-                        self.output.values['VF'].add(self.authorities[match[0]].viaf)
+                        self.output.values['II'].add(authority.isni)
+                        self.output.values['VF'].add(authority.viaf)
 
     def __str__(self):
         return self.text
 
     def RT(self):
-        try:
-            return quick_clean(record_type(self.ID) + '. ' +
-                               self.text.split('<MaterialType', 1)[1].split('>', 1)[1].split('</MaterialType>', 1)[0])
+        e = self.fragment.find('MaterialType')
+        if e is None: return ''
+        try: return quick_clean(record_type(self.ID) + '. ' + e.content)
         except: return ''
 
     def SM(self):
-        try:
-            ref = quick_clean(self.text.split('<Reference', 1)[1].split('>', 1)[1].split('</Reference>', 1)[0])
-        except: ref = ''
-        try:
-            collection = quick_clean(
-                self.text.split('<CollectionArea', 1)[1].split('>', 1)[1].split('</CollectionArea>', 1)[0])
-        except: collection = ''
+        e = self.fragment.find('Reference')
+        ref = quick_clean(e.content) if e is not None else ''
+        e = self.fragment.find('CollectionArea')
+        collection = quick_clean(e.content) if e is not None else ''
         return quick_clean(collection + '. ' + ref)
 
     def SX(self):
@@ -482,11 +786,159 @@ class ArchiveDescription:
         except: return ''
 
 
+ArchiveDescription.methods = [k for k in ArchiveDescription.cols.values if callable(getattr(ArchiveDescription, k, None))]
+
+
 # ====================
 #      Functions
 # ====================
 
 
+def get_authority_value(fragment, item):
+    """Function to find a component of the authorised form of a name within an authority record"""
+    if item in ['isni', 'viaf']:
+        for e in fragment.find_all('ExternalIdentifier'):
+            value, id_type = e.child('Value'), e.child('Type')
+            if value is not None and id_type is not None and item.upper() in id_type.content:
+                return value.content
+        return None
+    container, name = AUTHORITY_ELEMENTS[item]
+    if container is None:
+        e = fragment.find(name)
+        return e.content if e is not None else None
+    for c in fragment.find_all(container):
+        name_type = c.find('NameType')
+        if name_type is not None and name_type.content == 'Authorised':
+            e = c.find(name)
+            return e.content if e is not None else None
+    return None
+
+
+def parse_authority(record, method='elements'):
+    """Function to create an object of the appropriate Authority subclass from a cleaned IAMS authority record"""
+    try: atype = record_type(record.split(',')[1])
+    except IndexError: return None
+    if atype == 'Corporation': return Corporation(record, method)
+    if atype == 'Family': return Family(record, method)
+    if atype == 'Person': return Person(record, method)
+    if atype == 'Place': return Place(record, method)
+    if atype == 'Subject': return Subject(record, method)
+    return None
+
+
+def read_authorities(iams_snapshot_path, debug=False):
+    """Generator yielding the raw text of each authority record in the IAMS Published Snapshot"""
+    rfile = open(iams_snapshot_path, mode='r', encoding='utf-16-le', errors='replace')
+    rec = ''
+
+    # Don't process lines before authorities have been reached
+    if debug:
+        print('Enumerating IAMS Database Snapshot ... Authorities not yet reached')
+    for filelineno, line in enumerate(rfile):
+        if '},045-' in line:
+            rec = line
+            if debug: print('Reached the authorities')
+            break
+    gc.collect()
+
+    for filelineno, line in enumerate(rfile):
+        line = line.strip()
+        if line.startswith('{') and rec:
+            yield rec
+            rec = line
+        else:
+            rec += line
+    # Ensure last record in the file is processed
+    if rec:
+        yield rec
+    rfile.close()
+
+
+def read_descriptions(iams_snapshot_path):
+    """Generator yielding the raw text of each record in the IAMS Published Snapshot, from the start of the file"""
+    rfile = open(iams_snapshot_path, mode='r', encoding='utf-16-le', errors='replace')
+    rec = ''
+    try:
+        for filelineno, line in enumerate(rfile):
+            line = line.strip()
+            if line.startswith('{') and rec:
+                yield rec
+                rec = line
+            else:
+                rec += line
+    finally:
+        rfile.close()
+
+
+def description_rows(rec, authorities):
+    """Function to convert the raw text of an archive description to rows for the tables in the database
+
+    Returns None if the record does not have a valid IAMS record ID"""
+    record = ArchiveDescription(rec, authorities)
+    if not is_IAMS_id(record.ID):
+        return None
+    return (record.ID,
+            [' ; '.join(str(q) for q in sorted(record.output.values[item])) for item in ArchiveDescription.cols.values],
+            sorted((n[0].name, n[0].dates, n[0].atype, n[1], n[0].isni, n[0].viaf) for n in record.names),
+            sorted((str(s), s.atype) for s in record.subjects),
+            sorted(str(t) for t in record.titles),
+            ' '.join(sorted(record.links)))
+
+
+def convert_description(rec, authorities):
+    """Function to convert an archive description, raising ConversionError if it cannot be converted
+
+    The conversion stops in the same way whether records are converted in this process or in a worker process,
+    rather than leaving the record out of the database"""
+    try:
+        return description_rows(rec, authorities)
+    except:
+        try: rid = str(rec.split(',')[1])
+        except: rid = ''
+        raise ConversionError(rid, repr(sys.exc_info()[1]))
+
+
+def init_worker(authorities):
+    """Function to give a worker process the authorities needed to convert archive descriptions
+
+    authorities is either a dictionary of AuthorityEntry objects, or the path to the SQL database,
+    which is opened read-only"""
+    global WORKER_AUTHORITIES
+    if isinstance(authorities, str):
+        WORKER_AUTHORITIES = AuthorityStore(sqlite3.connect(
+            'file:{}?mode=ro'.format(urllib.parse.quote(authorities.replace(os.sep, '/'))), uri=True), spill=True)
+    else:
+        WORKER_AUTHORITIES = authorities
+
+
+def convert_descriptions(batch):
+    """Function to convert a batch of (raw text, hash) pairs of archive descriptions in a worker process"""
+    return [(digest, convert_description(rec, WORKER_AUTHORITIES)) for rec, digest in batch]
+
+
+def benchmark_authorities(iams_snapshot_path):
+    """Function to compare the element-based and regular expression authority parsers
+    over the authority records in the IAMS Published Snapshot"""
+    records = [clean(rec) for rec in read_authorities(iams_snapshot_path)]
+    print('{} authority records read'.format(str(len(records))))
+    results = {}
+    for method in ['regex', 'elements']:
+        start = datetime.datetime.now()
+        results[method] = [parse_authority(rec, method) for rec in records]
+        seconds = (datetime.datetime.now() - start).total_seconds()
+        print('{:<10}{:>10.2f} seconds{:>12.0f} records/second'.format(
+            method, seconds, len(records) / seconds if seconds else 0))
+    differences = 0
+    for rec, a, b in zip(records, results['regex'], results['elements']):
+        if a is None or b is None: continue
+        if (str(a), a.name, a.dates, a.atype, a.isni, a.viaf) != (str(b), b.name, b.dates, b.atype, b.isni, b.viaf):
+            differences += 1
+            if differences <= 10:
+                print('{}\n    regex:    {}\n    elements: {}'.format(rec.split(',')[1], str(a), str(b)))
+    print('{} authority records differ'.format(str(differences)))
+    return differences
+
+
 def create_table(conn, cursor, table_name, debug=False):
     """Function to create a table within the database"""
     if table_name is None or table_name not in TABLE_DEFINITIONS: exit_prompt('Table name not recognised')
@@ -511,6 +963,25 @@ def create_table(conn, cursor, table_name, debug=False):
     gc.collect()
 
 
+def table_exists(cursor, table_name):
+    """Function to test whether a table exists within the database"""
+    return cursor.execute('SELECT name FROM sqlite_master WHERE type = "table" AND name = ?;',
+                          (table_name,)).fetchone() is not None
+
+
+def read_version(cursor, name):
+    """Function to read the version of the code which saved part of the database, or None if it is not known"""
+    if not table_exists(cursor, 'versions'): return None
+    row = cursor.execute('SELECT Version FROM versions WHERE Name = ?;', (name,)).fetchone()
+    return row[0] if row is not None else None
+
+
+def save_version(cursor, name, version):
+    """Function to save the version of the code which saved part of the database"""
+    cursor.execute('CREATE TABLE IF NOT EXISTS versions (Name NTEXT PRIMARY KEY, Version INTEGER);')
+    cursor.execute('INSERT OR REPLACE INTO versions (Name, Version) VALUES (?, ?);', (name, version))
+
+
 def build_index(conn, cursor, table_name, index_name):
     """Function to build an index on a table within the database"""
     if table_name is None or index_name is None: exit_prompt('Error building index {} on table {}'.format(index_name, table_name))
@@ -548,27 +1019,18 @@ def clean(string):
     """Function to clean punctuation and normalize Unicode"""
     if string is None or not string or string == 'None':
         return ''
-    string = string.strip()
-    string = re.sub(
-        u'[\u0022\u055A\u05F4\u2018\u2019\u201A\u201B\u201C\u201D\u201E\u201F\u275B\u275C\u275D\u275E\uFF07\u0060]',
-        '\'',
-        string)
-    string = re.sub(
-        u'[\u0000-\u0009\u000A-\u000f\u0010-\u0019\u001A-\u001F\u0080-\u0089\u008A-\u008F\u0090-\u0099\u009A-\u009F\u2028\u2029]+',
-        '', string)
-    string = re.sub(u'[\u00A0\u1680\u2000-\u200A\u202F\u205F\u3000]+', ' ', string)
-    string = re.sub(u'[\u002D\u2010-\u2015\u2E3A\u2E3B\uFE58\uFE63\uFF0D]+', '-', string)
+    string = string.strip().translate(CLEAN_CHARACTERS)
+    if '--' in string:
+        string = RE_HYPHENS.sub('-', string)
     string = string.replace('&gt;', '>').replace('&lt;', '<').replace('&amp;', '&')
-    string = re.sub(r'\s+', ' ', string).strip()
-    string = re.sub(r'<[^/>]+/>', '', string, flags=re.IGNORECASE)
-    string = re.sub(r'[.\s]*</p>\s*', '. ', re.sub(r'[;\s.]+;', ';', string.replace('</item>', '; ')),
-                    flags=re.IGNORECASE)
-    string = re.sub(
-        r'[<\[]/*(b|br|emph|i|italic|italics|item|li|list|ol|p|sup|superscript|sub|subscript|ul)(\s+[^>\]]+)?\s*/*[>\]]',
-        ' ', string, flags=re.IGNORECASE)
-    string = re.sub(r';\s+\.', '.', string).strip()
-    string = re.sub(r'\s+', ' ', string).strip()
-    string = unicodedata.normalize('NFC', string)
+    string = RE_WHITESPACE.sub(' ', string).strip()
+    string = RE_SELF_CLOSING_TAG.sub('', string)
+    string = RE_END_PARAGRAPH.sub('. ', RE_EMPTY_ITEM.sub(';', string.replace('</item>', '; ')))
+    string = RE_FORMATTING_TAG.sub(' ', string)
+    string = RE_SEMICOLON_FULL_STOP.sub('.', string).strip()
+    string = RE_WHITESPACE.sub(' ', string).strip()
+    if not string.isascii() and not unicodedata.is_normalized('NFC', string):
+        string = unicodedata.normalize('NFC', string)
     return string
 
 
@@ -577,11 +1039,11 @@ def quick_clean(string, hyphens=True):
         If hyphens=True, trailing/leading hyphens are preserved"""
     if string is None or not string or string == 'None':
         return ''
-    string = re.sub(r';\s+\.', '.', string).strip()
-    string = re.sub(r'\s+', ' ', string).strip()
+    string = RE_SEMICOLON_FULL_STOP.sub('.', string).strip()
+    string = RE_WHITESPACE.sub(' ', string).strip()
     l = '?$.,:;/\])} ' if hyphens else '?$.,:;/\-])} '
     r = '.,:;/\[({ ' if hyphens else '.,:;/\-[({ '
-    string = re.sub(r'\s+', ' ', string.strip().lstrip(l).rstrip(r)).strip()
+    string = RE_WHITESPACE.sub(' ', string.strip().lstrip(l).rstrip(r)).strip()
     string = string.replace('( ', '(').replace(' )', ')')
     string = string.replace(' ,', ',').replace(',,', ',').replace(',.', '.').replace('.,', ',')
     string = string.replace('. [', ' [').replace(' : (', ' (')
@@ -664,6 +1126,18 @@ def run_sql(cursor, sql_command, ofile, debug=False):
         except: return j
 
 
+def read_exclusions(db_folder):
+    """Function to read the list of IDs of records not to be exported"""
+    exclusions = set()
+    if os.path.isfile(os.path.join(db_folder, 'List of IDs not to be exported.txt')):
+        ifile = open(os.path.join(db_folder, 'List of IDs not to be exported.txt'), mode='r', encoding='utf-8', errors='replace')
+        for filelineno, line in enumerate(ifile):
+            line = line.strip()
+            if is_IAMS_id(line): exclusions.add(line)
+        ifile.close()
+    return exclusions
+
+
 def check_file_location(file_path, function, file_ext='', exists=False):
     """Function to check whether a file exists and has the correct file extension."""
     folder, file, ext = '', '', ''
@@ -717,8 +1191,10 @@ class SQL2RF(Converter):
         }
         self.output_fields = Output()
         self.search_string = ''
+        self.search_parameters = []
         self.search_list = ''
         self.ids = set()
+        self.file_records, self.file_titles, self.file_names, self.file_topics = False, False, False, False
         self.header = '========================================\n' \
                       'sql2rf\n' \
                       'IAMS data extraction for Researcher Format\n' \
@@ -728,6 +1204,179 @@ class SQL2RF(Converter):
                       'and converts matching records to Researcher Format\n'
         Converter.__init__(self, debug)
 
+    def set_parameter(self, parameter, values):
+        """Set a single coded transformation parameter (o, v, l1, txt, d1 or d2)"""
+        if parameter == '' or values == '': return
+        if parameter == 'o':
+            for f in re.sub(r'[^a-zA-Z0-9|]', '', values).split('|'):
+                f = f.replace('ID', '_ID').replace('IS', '_IS').replace('8F', '_8F')
+                if f in self.output_fields.values:
+                    self.output_fields.values[f][0] = self.output_fields.values[f][0].replace('N==', 'Y==')
+        elif parameter == 'v' and (re.sub(r'[^rtnscRTNSC|]', '', values) == values):
+            values = values.lower()
+            self.file_records = 'r' in values
+            self.file_titles = 't' in values
+            self.file_names = 'n' in values
+            self.file_topics = 's' in values
+
+        elif parameter in ['l1', 'txt']:
+            # Languages codes and search strings
+            for v in re.sub(r'\$[a-z0-9]', ' ', re.sub(r'([^\x00-\x7F]|,)', '_', values)).split('|'):
+                self.search_criteria[parameter].add(v)
+        elif parameter in ['d1', 'd2']:
+            # Date range
+            if len(re.sub(r'[^0-9]', '', values)) >= 4:
+                self.search_criteria[parameter] = re.sub(r'[^0-9]', '', values)[:4]
+
+    def read_request(self, request_path):
+        """Read the coded transformation parameters from an Outlook message"""
+        msgfile = open(request_path, mode='r', encoding='utf-8', errors='replace')
+        for filelineno, line in enumerate(msgfile):
+            line = clean_msg(line)
+            if 'Coded parameters for your transformation' in line: break
+        for filelineno, line in enumerate(msgfile):
+            line = clean_msg(line)
+            if 'End of coded parameters' in line: break
+            if '=' in line:
+                line = clean_msg(line)
+                self.set_parameter(line.split('=', 1)[0].strip(), re.sub(r'^ ', '', line.split('=', 1)[-1]))
+        msgfile.close()
+
+    def build_search_string(self):
+        """Build the WHERE clause used to select matching records
+
+        Search terms and dates are not written into the clause, but are bound to its placeholders
+        from search_parameters, since they may come from an HTTP request.
+        """
+        clauses, self.search_parameters = [], []
+        if len(self.search_criteria['l1']) > 0:
+            clauses.append('( ' + ' OR '.join('S_LANGUAGES LIKE ?' for s in sorted(self.search_criteria['l1'])) + ' )')
+            self.search_parameters.extend('%{}%'.format(s) for s in sorted(self.search_criteria['l1']))
+        if len(self.search_criteria['txt']) > 0:
+            fields = ['AA', 'AN', 'TT', 'DS', 'SM', 'SU', 'NN', 'PV', 'RF']
+            clauses.append('( ' + ' OR '.join('{} LIKE ?'.format(f) for f in fields
+                                              for s in sorted(self.search_criteria['txt'])) + ' )')
+            self.search_parameters.extend('%{}%'.format(s) for f in fields for s in sorted(self.search_criteria['txt']))
+        if self.search_criteria['d1'] != '':
+            clauses.append('S_DATE2 >= ?')
+            self.search_parameters.append(int(self.search_criteria['d1']))
+        if self.search_criteria['d2'] != '':
+            clauses.append('S_DATE1 <= ?')
+            self.search_parameters.append(int(self.search_criteria['d2']))
+        self.search_string = 'WHERE ' + ' AND '.join(clauses) if clauses else ''
+        if self.debug:
+            try:
+                print(self.search_string)
+                print(str(self.search_parameters))
+            except ValueError: pass
+        return self.search_string
+
+    def find_records(self, cursor, exclusions=None):
+        """Find the IDs of matching records, less any records that should not be exported"""
+        self.ids = set()
+        i = 0
+        format_str = """
+SELECT RecordId FROM records {where}
+ORDER BY RecordId ASC;"""
+        try: sql_command = format_str.format(where=self.search_string)
+        except:
+            exit_prompt('Error creating XSL command to search for matching records: {}'.format(str(sys.exc_info())))
+        else:
+            if self.debug:
+                print(str(cursor.execute("""EXPLAIN QUERY PLAN {}""".format(sql_command), self.search_parameters).fetchall()))
+            cursor.execute(sql_command, self.search_parameters)
+            row = cursor.fetchone()
+            while row:
+                self.ids.add(row[0])
+                i += 1
+                if self.debug: print('\r{} matching records'.format(str(i)), end='\r')
+                try: row = cursor.fetchone()
+                except: break
+        if exclusions:
+            self.ids = self.ids - exclusions
+        self.search_list = '\'' + str('\', \''.join(self.ids)) + '\''
+        return self.ids
+
+    def file_header(self, file_type):
+        """Build the column headings for an output file"""
+        values = self.output_fields.values
+        if file_type == 'records':
+            header = ''
+            excluded = []
+        elif file_type == 'names':
+            header = '"Name","Dates associated with name","Type of name","Role","Other names"'
+            excluded = ['AA', 'AD', 'AT', 'AR', 'II', 'VF', 'AN']
+        elif file_type == 'titles':
+            header = '"Title","Other titles"'
+            excluded = ['TT', 'TV', 'TU', 'TK']
+        else:
+            header = '"Topic","Type of topic"'
+            excluded = ['SU']
+        for f in values:
+            if values[f][0].startswith('Y==') and f not in excluded:
+                header += ',"' + values[f][0].replace('Y==', '') + '"'
+        return header.strip(',') + '\n'
+
+    def file_query(self, file_type):
+        """Build the SQL command used to extract the contents of an output file"""
+        values = self.output_fields.values
+
+        # Records
+        if file_type == 'records':
+            format_str = """
+SELECT {search_fields} FROM records
+WHERE RecordId IN ({search_list}) ORDER BY RecordId ASC;"""
+            return format_str.format(
+                search_fields=', '.join(str(f) for f in values if values[f][0].startswith('Y==')),
+                search_list=self.search_list)
+
+        # Titles
+        if file_type == 'titles':
+            format_str = """
+SELECT t1.Title,
+( SELECT GROUP_CONCAT(t2.Title, ' ; ')
+FROM  titles t2
+WHERE ( t2.RecordId = t1.RecordId AND t1.Title <> t2.Title )
+ORDER BY t2.Title ASC
+) AS otherTitles,
+{search_fields}
+FROM titles t1
+INNER JOIN records ON records.RecordId = t1.RecordId
+WHERE t1.RecordId IN ({search_list}) ORDER BY t1.Title ASC ;"""
+            return format_str.format(
+                search_fields=', '.join(('records.' + str(f)) for f in values
+                                        if values[f][0].startswith('Y==') and f not in ['TK', 'TT', 'TU', 'TV']),
+                search_list=self.search_list)
+
+        # Names
+        if file_type == 'names':
+            format_str = """
+SELECT n1.Name, n1.NameDates, n1.NameType, n1.NameRole, n1.NameISNI, n1.NameVIAF,
+( SELECT GROUP_CONCAT(n2.Name || ', ' || n2.NameDates || ' [' || n1.NameRole || '], ' || n2.NameISNI || ', ' || n2.NameVIAF, ' ; ')
+FROM  names n2
+WHERE ( n2.RecordId = n1.RecordId AND n1.Name <> n2.Name AND n1.NameDates <> n2.NameDates )
+ORDER BY n2.Name ASC
+) AS otherNames,
+{search_fields}
+FROM names n1
+INNER JOIN records ON records.RecordId = n1.RecordId
+WHERE n1.RecordId IN ({search_list}) ORDER BY n1.Name ASC ;"""
+            return format_str.format(
+                search_fields=', '.join(('records.' + str(f)) for f in values
+                                        if values[f][0].startswith('Y==')
+                                        and f not in ['AN', 'AA', 'AD', 'AT', 'AR', 'II', 'VF']),
+                search_list=self.search_list)
+
+        # Subjects
+        format_str = """
+SELECT subjects.Topic, subjects.TopicType, {search_fields}
+FROM subjects INNER JOIN records ON subjects.RecordId = records.RecordId
+WHERE subjects.RecordId IN ({search_list}) ORDER BY subjects.Topic ASC ;"""
+        return format_str.format(
+            search_fields=', '.join(('records.' + str(f)) for f in values
+                                    if values[f][0].startswith('Y==') and f not in ['SU']),
+            search_list=self.search_list)
+
     def iams2rf_sql2rf(self, db_path, request_path, output_folder):
         """Search for records within an SQL database created using snapshot2sql
         and convert to Researcher Format
@@ -772,58 +1421,8 @@ class SQL2RF(Converter):
         if request_path != '':
 
             # Determine output fields to be included based on contents of request message file
-            msgfile = open(os.path.join(request_folder, request_file + request_ext), mode='r', encoding='utf-8', errors='replace')
-            for filelineno, line in enumerate(msgfile):
-                line = clean_msg(line)
-                if 'Coded parameters for your transformation' in line: break
-            for filelineno, line in enumerate(msgfile):
-                line = clean_msg(line)
-                if 'End of coded parameters' in line: break
-                if '=' in line:
-                    line = clean_msg(line)
-                    parameter = line.split('=', 1)[0].strip()
-                    values = re.sub(r'^ ', '', line.split('=', 1)[-1])
-                    if parameter != '' and values != '':
-                        if parameter == 'o':
-                            for f in re.sub(r'[^a-zA-Z0-9|]', '', values).split('|'):
-                                f = f.replace('ID', '_ID').replace('IS', '_IS').replace('8F', '_8F')
-                                if f in self.output_fields.values:
-                                    self.output_fields.values[f][0] = self.output_fields.values[f][0].replace('N==', 'Y==')
-                        elif parameter == 'v' and (re.sub(r'[^rtnscRTNSC|]', '', values) == values):
-                            values = values.lower()
-                            file_records = 'r' in values
-                            file_titles = 't' in values
-                            file_names = 'n' in values
-                            file_topics = 's' in values
-
-                        elif parameter in ['l1', 'txt']:
-                            # Languages codes and search strings
-                            for v in re.sub(r'\$[a-z0-9]', ' ', re.sub(r'([^\x00-\x7F]|,)', '_', values)).split('|'):
-                                self.search_criteria[parameter].add(v)
-                        elif parameter in ['d1', 'd2']:
-                            # Date range
-                            if len(re.sub(r'[^0-9]', '', values)) >= 4:
-                                self.search_criteria[parameter] = re.sub(r'[^0-9]', '', values)[:4]
-
-            if len(self.search_criteria['l1']) > 0:
-                self.search_string = '( ' + \
-                                     ' OR '.join((' S_LANGUAGES LIKE "%{}%" '.format(s))
-                                                 for s in sorted(self.search_criteria['l1'])) \
-                                     + ' )'
-            if len(self.search_criteria['txt']) > 0:
-                self.search_string = add_string('( {} )'.format(
-                    ' OR '.join('{} LIKE "%{}%"'.format(f, s)
-                                for f in ['AA', 'AN', 'TT', 'DS', 'SM', 'SU', 'NN', 'PV', 'RF']
-                                for s in sorted(self.search_criteria['txt']))), self.search_string, ' AND ')
-            self.search_string = add_string(self.search_criteria['d1'], self.search_string, ' AND S_DATE2 >= ')
-            self.search_string = add_string(self.search_criteria['d2'], self.search_string, ' AND S_DATE1 <= ')
-            if self.search_string != '':
-                self.search_string = 'WHERE ' + self.search_string
-            if self.debug:
-                try:
-                    print(self.search_string)
-                    print(str(self.search_criteria))
-                except ValueError: pass
+            self.read_request(os.path.join(request_folder, request_file + request_ext))
+            self.build_search_string()
 
         # If request message has not been specified, user must provide transformation parameters
         else:
@@ -895,50 +1494,22 @@ class SQL2RF(Converter):
             # User selects output files to include
             print('\n----------------------------------------')
             print('Select output files to include:\n')
-            file_records = get_boolean('Include the Records file? (Y/N):')
-            file_titles = get_boolean('Include the Titles file? (Y/N):')
-            file_names = get_boolean('Include the Names file? (Y/N):')
-            file_topics = get_boolean('Include the Topics file? (Y/N):')
+            self.file_records = get_boolean('Include the Records file? (Y/N):')
+            self.file_titles = get_boolean('Include the Titles file? (Y/N):')
+            self.file_names = get_boolean('Include the Names file? (Y/N):')
+            self.file_topics = get_boolean('Include the Topics file? (Y/N):')
 
         # --------------------
         # Build column headings and create output files
         # --------------------
 
-        records_header = ''
-        if file_records:
-            for f in self.output_fields.values:
-                if self.output_fields.values[f][0].startswith('Y=='):
-                    records_header += ',"' + self.output_fields.values[f][0].replace('Y==', '') + '"'
-            records_header = records_header.strip(',') + '\n'
-            records = open(os.path.join(output_folder,'records_IAMS.csv'), mode='w', encoding='utf-8', errors='replace')
-            records.write(records_header)
-
-        names_header = '"Name","Dates associated with name","Type of name","Role","Other names"'
-        if file_names:
-            for f in self.output_fields.values:
-                if self.output_fields.values[f][0].startswith('Y==') and f not in ['AA', 'AD', 'AT', 'AR', 'II', 'VF', 'AN']:
-                    names_header += ',"' + self.output_fields.values[f][0].replace('Y==', '') + '"'
-            names_header = names_header.strip(',') + '\n'
-            names = open(os.path.join(output_folder,'names_IAMS.csv'), mode='w', encoding='utf-8', errors='replace')
-            names.write(names_header)
-
-        titles_header = '"Title","Other titles"'
-        if file_titles:
-            for f in self.output_fields.values:
-                if self.output_fields.values[f][0].startswith('Y==') and f not in ['TT', 'TV', 'TU', 'TK']:
-                    titles_header += ',"' + self.output_fields.values[f][0].replace('Y==', '') + '"'
-            titles_header = titles_header.strip(',') + '\n'
-            titles = open(os.path.join(output_folder,'titles_IAMS.csv'), mode='w', encoding='utf-8', errors='replace')
-            titles.write(titles_header)
-
-        topics_header = '"Topic","Type of topic"'
-        if file_topics:
-            for f in self.output_fields.values:
-                if self.output_fields.values[f][0].startswith('Y==') and f != 'SU':
-                    topics_header += ',"' + self.output_fields.values[f][0].replace('Y==', '') + '"'
-            topics_header = topics_header.strip(',') + '\n'
-            topics = open(os.path.join(output_folder,'topics_IAMS.csv'), mode='w', encoding='utf-8', errors='replace')
-            topics.write(topics_header)
+        files = OrderedDict()
+        for file_type, selected in [('records', self.file_records), ('titles', self.file_titles),
+                                    ('names', self.file_names), ('topics', self.file_topics)]:
+            if selected:
+                files[file_type] = open(os.path.join(output_folder, OUTPUT_FILES[file_type]),
+                                        mode='w', encoding='utf-8', errors='replace')
+                files[file_type].write(self.file_header(file_type))
 
         # --------------------
         # Connect to local database
@@ -955,132 +1526,183 @@ class SQL2RF(Converter):
         print('----------------------------------------')
         print(str(datetime.datetime.now()))
 
-        # Get a list of matching records
-        i = 0
-        format_str = """
-SELECT RecordId FROM records {where}
-ORDER BY RecordId ASC;"""
-        try: sql_command = format_str.format(where=self.search_string)
-        except:
-            exit_prompt('Error creating XSL command to search for matching records: {}'.format(str(sys.exc_info())))
-        else:
-            if self.debug:
-                print(str(cursor.execute("""EXPLAIN QUERY PLAN {}""".format(sql_command)).fetchall()))
-            cursor.execute(sql_command)
-            row = cursor.fetchone()
-            while row:
-                self.ids.add(row[0])
-                i += 1
-                print('\r{} matching records'.format(str(i)), end='\r')
-                try: row = cursor.fetchone()
-                except: break
-
-        # Remove records not to be exported
-        if os.path.isfile(os.path.join(db_folder, 'List of IDs not to be exported.txt')):
+        # Get a list of matching records, less any records not to be exported
+        exclusions = read_exclusions(db_folder)
+        if exclusions:
             print('\n\nRemoving records that should not be exported ...')
-            eap = set()
-            ifile = open(os.path.join(db_folder, 'List of IDs not to be exported.txt'), mode='r', encoding='utf-8', errors='replace')
-            for filelineno, line in enumerate(ifile):
-                line = line.strip()
-                if is_IAMS_id(line): eap.add(line)
-            ifile.close()
-            self.ids = self.ids - eap
-            del eap
+        self.find_records(cursor, exclusions)
+        print('{} matching records'.format(str(len(self.ids))))
+        del exclusions
         gc.collect()
-        self.search_list = '\'' + str('\', \''.join(self.ids)) + '\''
-
-        # Records
-        if file_records:
 
-            print('\n\nWriting records file ...')
-            format_str = """
-SELECT {search_fields} FROM records
-WHERE RecordId IN ({search_list}) ORDER BY RecordId ASC;"""
-            sql_command = format_str.format(
-                search_fields=', '.join(str(f) for f in self.output_fields.values
-                                        if self.output_fields.values[f][0].startswith('Y==')),
-                search_list=self.search_list)
-            run_sql(cursor, sql_command, records, self.debug)
+        for file_type in files:
+            print('\n\nWriting {} file ...'.format('subjects' if file_type == 'topics' else file_type))
+            run_sql(cursor, self.file_query(file_type), files[file_type], self.debug)
 
-        # Titles
-        if file_titles:
-            print('\n\nWriting titles file ...')
+        # Close files
+        for file in files.values():
+            try: file.close()
+            except: pass
 
-            format_str = """
-SELECT t1.Title,
-( SELECT GROUP_CONCAT(t2.Title, ' ; ')
-FROM  titles t2
-WHERE ( t2.RecordId = t1.RecordId AND t1.Title <> t2.Title )
-ORDER BY t2.Title ASC
-) AS otherTitles,
-{search_fields}
-FROM titles t1
-INNER JOIN records ON records.RecordId = t1.RecordId
-WHERE t1.RecordId IN ({search_list}) ORDER BY t1.Title ASC ;"""
-            sql_command = format_str.format(
-                search_fields=', '.join(('records.' + str(f)) for f in self.output_fields.values
-                                       if self.output_fields.values[f][0].startswith('Y==')
-                                       and f not in ['TK', 'TT', 'TU', 'TV']),
-                search_list=self.search_list)
-            run_sql(cursor, sql_command, topics, self.debug)
+        # Close connection to local database
+        conn.close()
 
-            # Old format_str
-            # format_str =
-            """
-SELECT TT, TV, {search_fields} FROM records
-WHERE ( RecordId IN ({search_list}) AND TT <> '' )
-ORDER BY RecordId ASC;"""
 
-        # Names
-        if file_names:
+class SQL2RFService(object):
+    """A long-running service answering sql2rf requests over HTTP on localhost.
 
-            print('\n\nWriting names file ...')
-            format_str = """
-SELECT n1.Name, n1.NameDates, n1.NameType, n1.NameRole, n1.NameISNI, n1.NameVIAF,
-( SELECT GROUP_CONCAT(n2.Name || ', ' || n2.NameDates || ' [' || n1.NameRole || '], ' || n2.NameISNI || ', ' || n2.NameVIAF, ' ; ')
-FROM  names n2
-WHERE ( n2.RecordId = n1.RecordId AND n1.Name <> n2.Name AND n1.NameDates <> n2.NameDates )
-ORDER BY n2.Name ASC
-) AS otherNames,
-{search_fields}
-FROM names n1
-INNER JOIN records ON records.RecordId = n1.RecordId
-WHERE n1.RecordId IN ({search_list}) ORDER BY n1.Name ASC ;"""
-            sql_command = format_str.format(
-                search_fields=', '.join(('records.' + str(f)) for f in self.output_fields.values
-                                       if self.output_fields.values[f][0].startswith('Y==')
-                                       and f not in ['AN', 'AA', 'AD', 'AT', 'AR', 'II', 'VF']),
-                search_list=self.search_list)
-            run_sql(cursor, sql_command, names, self.debug)
+    The connection to the SQL database and the list of records not to be exported are kept open between requests,
+    and results are cached until the database file is modified.
+    Rows are returned as the database yields them, so that large result sets are not held in memory;
+    only result sets small enough to fit in the cache are kept.
 
-        # Subjects
-        if file_topics:
+    :param db_path: Path to the SQL database.
+    :param cache_bytes: Maximum total size, in characters, of the result sets held in the cache.
+    :param debug: Display additional output to assist with debugging.
+    """
 
-            print('\n\nWriting subjects file ...')
-            format_str = """
-SELECT subjects.Topic, subjects.TopicType, {search_fields}
-FROM subjects INNER JOIN records ON subjects.RecordId = records.RecordId
-WHERE subjects.RecordId IN ({search_list}) ORDER BY subjects.Topic ASC ;"""
-            sql_command = format_str.format(
-                search_fields=', '.join(('records.' + str(f)) for f in self.output_fields.values
-                                       if self.output_fields.values[f][0].startswith('Y==')
-                                       and f not in ['SU']),
-                search_list=self.search_list)
-            run_sql(cursor, sql_command, topics, self.debug)
+    def __init__(self, db_path, cache_bytes=64 * 1024 * 1024, debug=False):
+        self.db_folder, self.db_file, self.db_ext = check_file_location(db_path, 'SQL database', '.db', True)
+        self.db_path = os.path.join(self.db_folder, self.db_file + self.db_ext)
+        self.conn = sqlite3.connect(self.db_path)
+        self.exclusions_path = os.path.join(self.db_folder, 'List of IDs not to be exported.txt')
+        self.exclusions, self.exclusions_mtime = set(), None
+        self.cache = OrderedDict()
+        self.cache_bytes = cache_bytes
+        self.cache_used = 0
+        self.debug = debug
+        self.load_exclusions()
 
-        # Close files
-        for file in [records, names, titles, topics]:
-            try: file.close()
-            except: pass
+    def load_exclusions(self):
+        """(Re)load the list of records not to be exported if it has changed"""
+        # The size is also checked, since the file may be changed twice within the resolution of its modification time
+        try:
+            stat = os.stat(self.exclusions_path)
+            mtime = (stat.st_mtime_ns, stat.st_size)
+        except os.error: mtime = None
+        if mtime != self.exclusions_mtime:
+            self.exclusions = read_exclusions(self.db_folder)
+            self.exclusions_mtime = mtime
+        return self.exclusions
+
+    def query(self, parameters, file_type='records'):
+        """Return the rows of an output file matching a set of coded parameters
+
+        :param parameters: Iterable of (parameter, values) pairs, using the codes in request messages.
+        :param file_type: One of 'records', 'titles', 'names' or 'topics'.
+        :return: Iterator over the rows of the output file.
+        """
+        if file_type not in OUTPUT_FILES:
+            raise ValueError('Output file not recognised: {}'.format(file_type))
+        parameters = tuple(sorted((p, v) for (p, v) in parameters if p in ['o', 'l1', 'txt', 'd1', 'd2']))
+        # The list of records not to be exported is reloaded first, so that cached results are not used if it has changed
+        exclusions = self.load_exclusions()
+        key = (os.path.getmtime(self.db_path), self.exclusions_mtime, file_type, parameters)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return iter(self.cache[key][0])
+
+        request = SQL2RF(self.debug)
+        for parameter, values in parameters:
+            request.set_parameter(parameter, values)
+        request.build_search_string()
+        cursor = self.conn.cursor()
+        # The query is executed before any rows are returned, so that errors are raised before a response is sent
+        try:
+            request.find_records(cursor, exclusions)
+            cursor.execute(request.file_query(file_type))
+        except:
+            cursor.close()
+            raise
+        return self.stream(key, request.file_header(file_type), cursor)
 
-        # Close connection to local database
-        conn.close()
+    def stream(self, key, header, cursor):
+        """Yield the rows of an output file from a cursor, caching them if they fit in the cache"""
+        rows, size = [header], len(header)
+        try:
+            yield header
+            for row in cursor:
+                row = csv_row(row)
+                if rows is not None:
+                    rows.append(row)
+                    size += len(row)
+                    if size > self.cache_bytes: rows = None
+                yield row
+        finally:
+            cursor.close()
+        if rows is None: return
+        self.cache[key] = (rows, size)
+        self.cache_used += size
+        while self.cache_used > self.cache_bytes:
+            self.cache_used -= self.cache.popitem(last=False)[1][1]
+
+    def serve(self, port=8080, host='localhost'):
+        """Answer requests of the form /records?l1=eng&d1=1800&d2=1850&o=ID|TT until interrupted"""
+        # Imported here rather than at the top of the module, since it is slow to import
+        # and only the query service needs it
+        import http.server
+        service = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                parameters = urllib.parse.parse_qsl(url.query)
+                file_type = url.path.strip('/') or 'records'
+                for parameter, values in parameters:
+                    if parameter == 'v' and len(values) == 1:
+                        file_type = {'r': 'records', 't': 'titles', 'n': 'names', 's': 'topics'}.get(values.lower(), file_type)
+                try:
+                    rows = service.query(parameters, file_type)
+                except ValueError as e:
+                    self.send_error(404, str(e))
+                    return
+                except:
+                    self.send_error(500, str(sys.exc_info()[1]))
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=utf-8')
+                self.send_header('Content-Disposition', 'attachment; filename="{}"'.format(OUTPUT_FILES[file_type]))
+                self.end_headers()
+                # Rows are written in blocks, since the response is not buffered
+                block, size = [], 0
+                try:
+                    for row in rows:
+                        block.append(row)
+                        size += len(row)
+                        if size >= 65536:
+                            self.wfile.write(''.join(block).encode('utf-8', errors='replace'))
+                            block, size = [], 0
+                    self.wfile.write(''.join(block).encode('utf-8', errors='replace'))
+                finally:
+                    if hasattr(rows, 'close'): rows.close()
+
+            def log_message(self, format, *args):
+                if service.debug:
+                    http.server.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+        server = http.server.HTTPServer((host, port), Handler)
+        print('Serving {} at http://{}:{}/'.format(self.db_file + self.db_ext, host, str(port)))
+        print('Press Ctrl+C to stop')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        self.conn.close()
 
 
 class IAMS2SQL(Converter):
 
-    def __init__(self, debug=False):
-        self.authorities = {}
+    def __init__(self, debug=False, spill=False, incremental=False, processes=1, resume=False, reparse=False):
+        self.authorities = AuthorityStore()
+        self.changed_authorities = set()
+        self.spill = spill
+        self.incremental = incremental
+        self.resume = resume
+        self.reparse = reparse
+        self.processes = max(1, processes)
+        self.fields = Output()
         self.header = '========================================\n' + \
                       'snapshot2sql\n' + \
                       'IAMS data preparation for Researcher Format\n' + \
@@ -1112,84 +1734,122 @@ class IAMS2SQL(Converter):
             print('Debug mode')
 
         # --------------------
-        # Build indexes
+        # Connect to local database
         # --------------------
 
-        print('\nBuilding indexes ...')
+        print('\nConnecting to local database ...')
         print('----------------------------------------')
         print(str(datetime.datetime.now()))
 
-        rfile = open(os.path.join(iams_folder, iams_file + iams_ext), mode='r', encoding='utf-16-le', errors='replace')
-        i = 0
-        rec, rid = '', ''
-
-        # Don't process lines before authorities have been reached
         if self.debug:
-            print('Enumerating IAMS Database Snapshot ... Authorities not yet reached')
-        for filelineno, line in enumerate(rfile):
-            if '},045-' in line:
-                rec = line
-                if self.debug: print('Reached the authorities')
-                break
-        gc.collect()
+            print('sqlite connection: {}'.format(str(os.path.join(db_folder, db_file + db_ext))))
+        conn = sqlite3.connect(os.path.join(db_folder, db_file + db_ext))
+        cursor = conn.cursor()
 
-        for filelineno, line in enumerate(rfile):
-            line = line.strip()
-            if line.startswith('{') and rec:
-                i += 1
-                print('\r{} records indexed'.format(str(i)), end='\r')
-                rec = clean(rec)
-                rid = rec.split(',')[1]
-                if record_type(rid) == 'Corporation':
-                    self.authorities[rid] = Corporation(rec)
-                elif record_type(rid) == 'Family':
-                    self.authorities[rid] = Family(rec)
-                elif record_type(rid) == 'Person':
-                    self.authorities[rid] = Person(rec)
-                elif record_type(rid) == 'Place':
-                    self.authorities[rid] = Place(rec)
-                elif record_type(rid) == 'Subject':
-                    self.authorities[rid] = Subject(rec)
-                rec = line
+        # An interrupted conversion leaves a checkpoint in the database
+        leftover = None
+        if table_exists(cursor, 'checkpoint'):
+            try: leftover = cursor.execute('SELECT RecordId, Records, Authorities, Incremental FROM checkpoint;').fetchone()
+            except sqlite3.OperationalError: leftover = None
+
+        # When resuming, records up to the last checkpoint have already been saved to the database
+        tables = ['records', 'names', 'subjects', 'titles', 'hashes']
+        checkpoint = None
+        if self.resume:
+            if leftover is not None and all(table_exists(cursor, table_name) for table_name in tables):
+                checkpoint = leftover
+            if checkpoint is None:
+                print('\nDatabase does not contain a checkpoint; records will be added from the start of the snapshot')
+            # Records saved in incremental mode replace existing rows, so resuming in a different mode would duplicate them
+            elif bool(checkpoint[3]) != bool(self.incremental):
+                exit_prompt('Error: The checkpoint in the database was saved {} incremental mode'.format(
+                    'in' if checkpoint[3] else 'without'))
             else:
-                rec += line
-        # Ensure last record in the file is processed
-        if rec:
-            i += 1
-            print('\r{} records indexed'.format(str(i)), end='\r')
-            rec = clean(rec)
-            rid = rec.split(',')[1]
-            if record_type(rid) == 'Corporation':
-                self.authorities[rid] = Corporation(rec)
-            elif record_type(rid) == 'Family':
-                self.authorities[rid] = Family(rec)
-            elif record_type(rid) == 'Person':
-                self.authorities[rid] = Person(rec)
-            elif record_type(rid) == 'Place':
-                self.authorities[rid] = Place(rec)
-            elif record_type(rid) == 'Subject':
-                self.authorities[rid] = Subject(rec)
-
-        rfile.close()
-        gc.collect()
+                print('\nResuming after record {} ({} records)'.format(str(checkpoint[0]), str(checkpoint[1])))
+
+        if leftover is None:
+            create_table(conn, cursor, 'checkpoint', debug=self.debug)
+            cursor.execute('INSERT INTO checkpoint (id, RecordId, Records, Authorities, Incremental) '
+                           'VALUES (NULL, ?, ?, ?, ?);', ('', 0, '', int(bool(self.incremental))))
+        elif checkpoint is None:
+            cursor.execute('UPDATE checkpoint SET RecordId = ?, Records = ?, Incremental = ?;',
+                           ('', 0, int(bool(self.incremental))))
+        conn.commit()
 
         # --------------------
-        # Connect to local database
+        # Build indexes
         # --------------------
 
-        print('\n\nConnecting to local database ...')
+        print('\n\nBuilding indexes ...')
         print('----------------------------------------')
         print(str(datetime.datetime.now()))
 
+        # Authorities are saved in the database, and are only parsed again if their text has changed
+        # They can also be looked up from the database rather than held in memory
+        self.authorities = AuthorityStore(conn, self.spill)
+        hashes = self.authorities.hashes()
         if self.debug:
-            print('sqlite connection: {}'.format(str(os.path.join(db_folder, db_file + db_ext))))
-        conn = sqlite3.connect(os.path.join(db_folder, db_file + db_ext))
-        cursor = conn.cursor()
+            print('{} authorities saved in the database'.format(str(len(hashes))))
+        # Authorities saved by a different version of the parser are all parsed again, as they are with --reparse
+        if self.reparse or read_version(cursor, 'authorities') != AUTHORITY_VERSION:
+            if hashes: print('\nAll authorities will be parsed again')
+            hashes = dict.fromkeys(hashes)
+        seen = set()
+        # Authorities which had changed before an interrupted conversion have already been saved to the database,
+        # but the records linked to them may not have been updated, so they are treated as changed again
+        self.changed_authorities = set(leftover[2].split()) if leftover is not None else set()
+
+        i, parsed, unchanged = 0, 0, 0
+        for rec in read_authorities(os.path.join(iams_folder, iams_file + iams_ext), self.debug):
+            i += 1
+            print('\r{} records indexed'.format(str(i)), end='\r')
+            try: rid = rec.split(',')[1]
+            except IndexError: continue
+            seen.add(rid)
+            digest = hashlib.sha1(rec.encode('utf-8', errors='replace')).hexdigest()
+            if hashes.get(rid) == digest:
+                unchanged += 1
+                continue
+            authority = parse_authority(clean(rec))
+            if authority is not None:
+                self.authorities.add(rid, authority, digest)
+                self.changed_authorities.add(rid)
+                parsed += 1
+
+        # Remove authorities which are no longer in the snapshot
+        deleted = set(hashes) - seen
+        self.authorities.remove(deleted)
+        self.changed_authorities |= deleted
+        # The changed authorities are saved in the checkpoint in the same transaction as the authorities themselves,
+        # so that they are not forgotten if the conversion is interrupted before the linked records are updated
+        cursor.execute('UPDATE checkpoint SET Authorities = ?;', (' '.join(sorted(self.changed_authorities)),))
+        save_version(cursor, 'authorities', AUTHORITY_VERSION)
+        self.authorities.commit()
+        self.authorities.load()
+        print('\n{} authorities parsed, {} unchanged, {} removed'.format(
+            str(parsed), str(unchanged), str(len(deleted))))
+        del hashes, seen
+        gc.collect()
 
         # Create tables
-        fields = Output()
-        for table_name in ['records', 'names', 'subjects', 'titles']:
-            create_table(conn, cursor, table_name, debug=self.debug)
+        # In incremental mode, existing tables are updated rather than replaced
+        incremental = self.incremental and all(table_exists(cursor, table_name) for table_name in tables)
+        if self.incremental and not incremental:
+            print('\nDatabase does not contain the tables needed to update it; it will be rebuilt')
+        # Records saved by a different version of the conversion are all converted again, as they are with --reparse
+        elif incremental and (self.reparse or read_version(cursor, 'records') != DESCRIPTION_VERSION):
+            incremental = False
+            print('\nDatabase was built by a different version of snapshot2sql, or --reparse was given; it will be rebuilt')
+
+        previous = {}
+        if incremental:
+            for rid, digest, links in cursor.execute('SELECT RecordId, Hash, Authorities FROM hashes;'):
+                previous[rid] = (digest, set(links.split()))
+        elif checkpoint is None:
+            # The version is only saved once all records have been added, so that a partly built database is not updated
+            save_version(cursor, 'records', None)
+            for table_name in tables:
+                create_table(conn, cursor, table_name, debug=self.debug)
 
         # Add records to database
         # ====================================================================================================
@@ -1203,87 +1863,95 @@ class IAMS2SQL(Converter):
         # --------------------
 
         print('\n\nOpening CSV file from IAMS snapshot ...')
-        rfile = open(os.path.join(iams_folder, iams_file + iams_ext), mode='r', encoding='utf-16-le', errors='replace')
-        rec = ''
-        i = 0
-        for filelineno, line in enumerate(rfile):
-            line = line.strip()
-            if line.startswith('{') and rec:
-                i += 1
-                print('\r{} records processed'.format(str(i)), end='\r')
-                record = ArchiveDescription(rec, self.authorities)
-                # Need to amend something here
-
-                if record.type in ['Corporation', 'Family', 'Person', 'Place', 'Subject']:
-                    break
-
-                if is_IAMS_id(record.ID):
-                    try:
-                        format_str = """
-INSERT INTO records (id, RecordId, {Fields})
-VALUES (NULL, "{RecordId}", {Values}); """
-                        sql_command = format_str.format(RecordId=record.ID,
-                                                        Fields=', '.join(item for item in fields.values),
-                                                        Values='"' + '", "'.join(str(p) for p in [
-                                                            ' ; '.join(
-                                                                str(q) for q in sorted(record.output.values[item]))
-                                                            for item in fields.values]) + '"')
-                        cursor.execute(sql_command)
-                    except:
-                        print('\nError [at002]: {}\n'.format(str(sys.exc_info())))
-
-                    # Save names
-                    for n in record.names:
-                        try:
-                            format_str = """
-INSERT INTO names (id, RecordId, Name, NameDates, NameType, NameRole, NameISNI, NameVIAF)
-VALUES (NULL, "{RecordId}", "{Name}", "{NameDates}", "{NameType}", "{NameRole}", "{NameISNI}", "{NameVIAF}"); """
-                            sql_command = format_str.format(RecordId=record.ID,
-                                                            Name=n[0].name,
-                                                            NameDates=n[0].dates,
-                                                            NameType=n[0].atype,
-                                                            NameRole=n[1],
-                                                            NameISNI=n[0].isni,
-                                                            NameVIAF=n[0].viaf)
-                            cursor.execute(sql_command)
-                        except:
-                            print('\nError [at003]: {}\n'.format(str(sys.exc_info())))
-
-                    # Save subjects
-                    for s in record.subjects:
-                        try:
-                            format_str = """
-INSERT INTO subjects (id, RecordId, Topic, TopicType)
-VALUES (NULL, "{RecordId}", "{Topic}", "{TopicType}"); """
-                            sql_command = format_str.format(RecordId=record.ID,
-                                                            Topic=str(s),
-                                                            TopicType=s.atype)
-                            cursor.execute(sql_command)
-                        except:
-                            print('\nError [at004]: {}\n'.format(str(sys.exc_info())))
-
-
-                    # Save titles
-                    for t in record.titles:
-                        try:
-                            format_str = """
-INSERT INTO titles (id, RecordId, Title)
-VALUES (NULL, "{RecordId}", "{Title}"); """
-                            sql_command = format_str.format(RecordId=record.ID,
-                                                            Title=str(t))
-                            cursor.execute(sql_command)
-                        except:
-                            print('\nError [at005]: {}\n'.format(str(sys.exc_info())))
 
-                rec = line
+        # Records can be converted in parallel by a pool of worker processes
+        # Results are written to the database by this process, in the order in which the records appear in the snapshot
+        pool, pending, batch = None, deque(), []
+        if self.processes > 1:
+            print('Converting records using {} processes'.format(str(self.processes)))
+            # With --spill, workers look up authorities in the database while this process writes records to it
+            # In WAL mode, readers are not blocked by a transaction in progress, however long it is
+            if self.spill:
+                conn.commit()
+                cursor.execute('PRAGMA journal_mode=WAL;').fetchone()
+            pool = multiprocessing.Pool(self.processes, init_worker, (
+                os.path.join(db_folder, db_file + db_ext) if self.spill else self.authorities.entries,))
+
+        i, updated, unchanged = 0, 0, 0
+        seen = set()
+        for rec in read_descriptions(os.path.join(iams_folder, iams_file + iams_ext)):
+            i += 1
+            print('\r{} records processed'.format(str(i)), end='\r')
+            try: rid = str(rec.split(',')[1])
+            except: rid = ''
+
+            if record_type(rid) in ['Corporation', 'Family', 'Person', 'Place', 'Subject']:
+                break
+
+            # Records up to the checkpoint are skipped
+            if checkpoint is not None and i <= checkpoint[1]:
+                if i == checkpoint[1] and rid != checkpoint[0]:
+                    exit_prompt('Error: IAMS snapshot does not match the checkpoint in the database')
+                seen.add(rid)
+                continue
+
+            # Records are only converted again if their text, or an authority they link to, has changed
+            digest = hashlib.sha1(rec.encode('utf-8', errors='replace')).hexdigest()
+            seen.add(rid)
+            if rid in previous and previous[rid][0] == digest \
+                    and previous[rid][1].isdisjoint(self.changed_authorities):
+                unchanged += 1
+            elif pool is None:
+                updated += self.save_record(cursor, convert_description(rec, self.authorities), digest, incremental)
             else:
-                rec += line
+                batch.append((rec, digest))
+                if len(batch) >= BATCH_SIZE:
+                    pending.append(pool.apply_async(convert_descriptions, (batch,)))
+                    batch = []
+                # Write completed batches in order, limiting the number of batches in progress
+                while pending and (pending[0].ready() or len(pending) > 2 * self.processes):
+                    for d, rows in self.collect(pool, pending.popleft()):
+                        updated += self.save_record(cursor, rows, d, incremental)
 
             # Save changes at every 1000th record
-            if filelineno % 1000 == 0:
+            # When converting records in parallel, changes are saved at each checkpoint,
+            # once all the records read so far have been written
+            if pool is None and i % 1000 == 0:
+                self.save_checkpoint(cursor, rid, i)
+                conn.commit()
+            elif pool is not None and i % CHECKPOINT_INTERVAL == 0:
+                if batch:
+                    pending.append(pool.apply_async(convert_descriptions, (batch,)))
+                    batch = []
+                while pending:
+                    for d, rows in self.collect(pool, pending.popleft()):
+                        updated += self.save_record(cursor, rows, d, incremental)
+                self.save_checkpoint(cursor, rid, i)
                 conn.commit()
 
+        if pool is not None:
+            if batch:
+                pending.append(pool.apply_async(convert_descriptions, (batch,)))
+            while pending:
+                for d, rows in self.collect(pool, pending.popleft()):
+                    updated += self.save_record(cursor, rows, d, incremental)
+            pool.close()
+            pool.join()
+
+        # Remove records which are no longer in the snapshot
+        removed = set(previous) - seen
+        for rid in removed:
+            self.delete_record(cursor, rid)
+        # All records have been added, so the checkpoint is no longer needed
+        cursor.execute('DROP TABLE IF EXISTS checkpoint;')
+        save_version(cursor, 'records', DESCRIPTION_VERSION)
         conn.commit()
+        if pool is not None and self.spill:
+            cursor.execute('PRAGMA journal_mode=DELETE;').fetchone()
+        if incremental:
+            print('\n{} records updated, {} unchanged, {} removed'.format(
+                str(updated), str(unchanged), str(len(removed))))
+        del previous, seen
 
         # Build indexes
         # ====================================================================================================
@@ -1291,7 +1959,7 @@ VALUES (NULL, "{RecordId}", "{Title}"); """
         print('\n\nCreating indexes ...')
         print('----------------------------------------')
         print(str(datetime.datetime.now()))
-        for table_name in ['records', 'names', 'subjects', 'titles']:
+        for table_name in ['records', 'names', 'subjects', 'titles', 'hashes']:
             build_index(conn, cursor, table_name, 'IDX_{}'.format(table_name))
 
         # Text file dumps of tables
@@ -1305,3 +1973,69 @@ VALUES (NULL, "{RecordId}", "{Title}"); """
 
         # Close connection to local database
         conn.close()
+
+    def collect(self, pool, result):
+        """Return the results of a batch of archive descriptions converted by a worker process.
+        If a description could not be converted, the worker processes are stopped before the error is raised"""
+        try: return result.get()
+        except:
+            pool.terminate()
+            raise
+
+    def save_checkpoint(self, cursor, rid, records):
+        """Record the last record saved to the database, so that an interrupted conversion can be resumed.
+        The checkpoint is saved in the same transaction as the records."""
+        cursor.execute('UPDATE checkpoint SET RecordId = ?, Records = ?;', (rid, records))
+
+    def delete_record(self, cursor, rid):
+        """Delete a record from all tables in the database"""
+        for table_name in ['records', 'names', 'subjects', 'titles', 'hashes']:
+            try:
+                cursor.execute('DELETE FROM {} WHERE RecordId = ?;'.format(table_name), (rid,))
+            except:
+                print('\nError [at006]: {}\n'.format(str(sys.exc_info())))
+
+    def save_record(self, cursor, rows, digest='', incremental=False):
+        """Save the rows produced by description_rows() to the database
+
+        Returns 1 if the record was saved, or 0 otherwise"""
+        if rows is None:
+            return 0
+        rid, record, names, subjects, titles, links = rows
+        if incremental:
+            self.delete_record(cursor, rid)
+        try:
+            cursor.execute('INSERT INTO records (id, RecordId, {}) VALUES (NULL, ?, {});'.format(
+                ', '.join(item for item in self.fields.values), ', '.join('?' for item in self.fields.values)),
+                [rid] + record)
+        except:
+            print('\nError [at002]: {}\n'.format(str(sys.exc_info())))
+
+        # Save names
+        try:
+            cursor.executemany('INSERT INTO names (id, RecordId, Name, NameDates, NameType, NameRole, NameISNI, NameVIAF) '
+                               'VALUES (NULL, ?, ?, ?, ?, ?, ?, ?);', ((rid,) + n for n in names))
+        except:
+            print('\nError [at003]: {}\n'.format(str(sys.exc_info())))
+
+        # Save subjects
+        try:
+            cursor.executemany('INSERT INTO subjects (id, RecordId, Topic, TopicType) VALUES (NULL, ?, ?, ?);',
+                               ((rid,) + s for s in subjects))
+        except:
+            print('\nError [at004]: {}\n'.format(str(sys.exc_info())))
+
+        # Save titles
+        try:
+            cursor.executemany('INSERT INTO titles (id, RecordId, Title) VALUES (NULL, ?, ?);',
+                               ((rid, t) for t in titles))
+        except:
+            print('\nError [at005]: {}\n'.format(str(sys.exc_info())))
+
+        # Save hash of the record, and the authorities it links to
+        try:
+            cursor.execute('INSERT INTO hashes (id, RecordId, Hash, Authorities) VALUES (NULL, ?, ?, ?);',
+                           (rid, digest, links))
+        except:
+            print('\nError [at007]: {}\n'.format(str(sys.exc_info())))
+        return 1
@@ -30,23 +30,52 @@ def marc2rf_write_rf_config(request_path, output_folder, debug=False):
     config.marc2rf_write_rf_config(request_path, output_folder)
 
 
-def marc2rf_researcherFormat(marc_path, request_path, output_folder, options, debug=False):
+def marc2rf_researcherFormat(marc_path, request_path, output_folder, options, debug=False, select=False, resume=False,
+                             shards=1, shard=1, shard_by='count'):
     """Convert MARC records to Researcher Format.
 
     :rtype: object
-    :param marc_path: Path to file of MARC records.
+    :param marc_path: Path to file of MARC records (.lex, or MARCXML .xml, or MARC-in-JSON .json),
+        which may be compressed (e.g. .lex.gz or .lex.zst),
+        or a glob pattern or list of paths to several files, which are read as a single file.
     :param request_path: Path to Outlook message containing details of the request.
     :param output_folder: Folder to save Researcher Format output files.
     :param options: Options to set default transformation parameters.
     :param debug: Display additional output to assist with debugging.
+    :param select: Only convert records which meet the selection criteria in the request message.
+    :param resume: Resume an interrupted conversion from the last checkpoint saved in the output folder.
+    :param shards: Number of shards into which the conversion is divided.
+    :param shard: Number of the shard to convert, from 1 to shards.
+    :param shard_by: Divide records between shards by 'count' or by 'id'.
     """
 
-    converter = Converter(marc_path, request_path, output_folder, options, debug)
+    converter = Converter(marc_path, request_path, output_folder, options, debug, select, resume,
+                          shards, shard, shard_by)
     if debug:
         print('Converting MARC records with the following parameters:')
         print('marc_path: {}'.format(str(marc_path)))
         print('request_path: {}'.format(str(request_path)))
         print('output_folder: {}'.format(str(output_folder)))
         print('options: {}'.format(str(options)))
+        print('select: {}'.format(str(select)))
+        print('resume: {}'.format(str(resume)))
+        print('shard: {} of {} (by {})'.format(str(shard), str(shards), str(shard_by)))
     converter.marc2rf_researcherFormat()
 
+
+def marc2rf_merge_shards(output_folder, shards, debug=False):
+    """Merge the output files written by each shard of a Researcher Format conversion.
+
+    :rtype: object
+    :param output_folder: Folder containing the output files written by each shard.
+    :param shards: Number of shards into which the conversion was divided.
+    :param debug: Display additional output to assist with debugging.
+    """
+
+    converter = Converter('', '', output_folder, '', debug, shards=shards)
+    if debug:
+        print('Merging shards with the following parameters:')
+        print('output_folder: {}'.format(str(output_folder)))
+        print('shards: {}'.format(str(shards)))
+    converter.merge_shards()
+
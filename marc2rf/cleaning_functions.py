@@ -3,6 +3,7 @@
 """Data cleaning functions used in the Researcher Format transformation."""
 
 # Import required modules
+import functools
 import html
 import os
 import sys
@@ -11,6 +12,8 @@ import unicodedata
 import marc2rf.publisher as publisher
 import marc2rf.multiregex as mrx
 import regex as re
+# The standard library engine scans the trie patterns built by KeywordMatcher faster than regex
+import re as stdlib_re
 from marc2rf.lookup import *
 
 __author__ = 'Victoria Morris'
@@ -23,23 +26,476 @@ __status__ = '4 - Beta Development'
 # ====================
 
 BRACKETS = [('[', ']'), ('(', ')'), ('{', '}')]
+MONTH_NAMES = ['', 'january', 'february', 'march', 'april', 'may', 'june',
+               'july', 'august', 'september', 'october', 'november', 'december']
+BRACKET_CHARACTERS = '[](){}<>'
+
+# Words trimmed from the start and end of place names
+PLACE_WORDS_TO_TRIM = frozenset([
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+    'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth',
+    '1st', '2nd', '3rd', '4th', '5th', '6th', '7th', '8th', '9th', '10th',
+    'erste', 'zweite', 'dritte', 'vierte', u'f\u00FCnfte', 'sechste', 'siebte', 'achte', 'neunte',
+    'zehnte',
+    'at', 'bde', 'by', u'd\u00EDl', 'for', 'heft', 'hefte', 'hft', 'hfte', 'honorary', 'imprinted',
+    'in', 'kn',
+    'page', 'pages', 'play', 'plays', 'pp', 'printed', 'privately', 'pt', 'reihe',
+    'sammlung', 'secretary', 'stuk', 'the', 'thl', 'vol',
+    u'\u03BC\u03B5\u03C1\u03B7', u'\u1F10\u03BD'
+])
+
+# Words trimmed from the start and end of publisher names
+# Can't add to the above: association, house, library, libraries, lit, mit, trust
+PUBLISHER_WORDS_TO_TRIM = frozenset([
+    '1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '&', '?', 'co', u'\u00E0', u'\u00E1',
+    'ac', u'academi\u00E6', 'act', 'aedibus', 'ah', 'also', 'all', 'an', 'and', 'appointment', 'apud',
+    'as', 'at', 'au', 'be', 'bei', 'beim', 'bey', 'books', 'bookds', 'bookseller', 'booksellers',
+    'bros', 'by', 'cased', 'catalogue', 'catalogues', 'cc', 'chez', 'chex', 'cie', 'city', 'co',
+    'collegio', 'company', 'cum', 'de', 'de\'', 'dem', 'der', 'designed', 'directs', 'didtributed',
+    'distribution', 'distributor', 'distributorp', 'distributors', 'distribuzione', 'each', 'ed',
+    u'\u00E9d', u'\u00E9diteur', 'edition', 'editions', 'editor', 'editore', 'editors', 'editrice',
+    'editura', 'edizioni', 'elsewhere', 'engraved', u'\u00E9rudition', 'esplanade', 'et', 'etiam',
+    'etonae', 'ex', 'exclusive', 'exclusively', 'excudebant', 'excudebat', 'execudit', 'excusum',
+    'filhos', 'filios', 'following', 'for', 'forlag', 'from', 'fur', u'f\u00FCr', 'gedruckt',
+    u'glasgu\u00E6', 'gmbh', 'graveur', 'had', 'her', 'herausgeber', 'him', 'his', 'impensa',
+    'impensis', 'impr', 'imprime', u'imprim\u00E9', 'imprimerie', 'imprint', 'imprinted', 'imprynt',
+    'in', 'inc', 'issued', 'istributor', 'izdanie', u'izdan\u012Be', u'izdatel\u02B9',
+    u'izdatel\u02B9stvo', u'izdava\u010Dko', 'izd-vo', 'kent', u'kiad\u00E1s', u'kiad\u00E1sa',
+    'kiadja', u'kiad\u00F3', 'king', u'k\u00F6nyvek', u'k\u00F6nyvkiad\u00F3' u'k\u00F6nyvkiad\u00F3',
+    'komm', 'kommission', 'law', 'librairies', 'librairie', 'librarie', u'libraire-\u00E9diteur',
+    'londini', u'limi\u1E6De\u1E0Da', 'majesty', 'may', 'musicsellers', 'na', 'nakladatelstvi', 'near',
+    'nella', 'newly', 'no', 'of', 'official', 'officina', 'oficyna', 'on', 'only', 'or', 'other',
+    'others', 'oxf', 'p', 'par', 'pl', 'por', 'pour', 'pr', u'preduze\u0107e', 'presso', 'print',
+    'printd', 'printed', 'printer', 'printers', 'printing', 'privately', 'privilegi', 'quem',
+    'reprinted', 're-printed', 'repirnted', 'rest', 'revised', 'sa', 'sculp', 'se', 'si', 'sohn',
+    'son', 'sons', 'son-in-law', 'stamperia', 'stereotype', 'stereotyped', 'stereotyper', 'sumtibus',
+    u'szerkeszt\u0151s\u00E9ge', 'the', 'them', 'tip', 'to', 'tpagr', u'tpagrut\u02BFiwn', 'tparan',
+    'translator', 'trova', 'trustees', 'typ', 'typograph', 'typographia', 'typographum', 'typis', 'u',
+    'uitgeverij', 'uk', 'vend', 'vendido', 'vendita', 'veneunt', 'verbindung', 'verl', 'verlag',
+    'verlegt', 'verlegung', 'von', 'vormals', 'with', 'within', 'without', 'withowt', 'written',
+    'wydawn', 'wydawnictwa', 'wydawnictwo', 'www', 'xi'
+])
+
+# Translation tables used by clean(): quotation marks are folded to apostrophes,
+# control characters are deleted and (optionally) Unicode spaces become plain spaces
+CLEAN_CHARACTERS = dict.fromkeys(map(ord, u'\u0022\u055A\u05F4\u2018\u2019\u201A\u201B\u201C\u201D\u201E\u201F\u275B\u275C\u275D\u275E\uFF07'), '\'')
+CLEAN_CHARACTERS.update(dict.fromkeys(list(range(0x00, 0x20)) + list(range(0x80, 0xA0)) + [0x2028, 0x2029]))
+CLEAN_SPACES = dict(CLEAN_CHARACTERS)
+CLEAN_SPACES.update(dict.fromkeys([0x00A0, 0x1680] + list(range(0x2000, 0x200B)) + [0x202F, 0x205F, 0x3000], ' '))
+
+# Whitespace characters that regex does not treat as \s, but str.split() does
+INFORMATION_SEPARATORS = ('\x1c', '\x1d', '\x1e', '\x1f')
+
+# Character sets for keep_characters() and only_characters()
+DIGITS = frozenset('0123456789')
+LOWER_CASE_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyz')
+LETTERS = LOWER_CASE_LETTERS | frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+DECIMAL_CHARACTERS = DIGITS | frozenset('.')
+DEWEY_CHARACTERS = DIGITS | frozenset('.[]-')
+STANDARD_NUMBER_CHARACTERS = DIGITS | frozenset('X')
+ISSN_CHARACTERS = DIGITS | frozenset('xX')
+LC_CLASS_CHARACTERS = DIGITS | frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ.')
+LITERARY_FORM_CHARACTERS = LOWER_CASE_LETTERS | frozenset('01')
+NUMERIC_PUNCTUATION = DIGITS | frozenset('-.,')
+NUMERIC_RANGE_CHARACTERS = DIGITS | frozenset('-')
+PRICE_CHARACTERS = DIGITS | frozenset(u'\u00A3$\u20AC.')
+
+# ====================
+#      Classes
+# ====================
+
+
+class LazyPattern(object):
+    """A regular expression which is compiled the first time it is used.
+
+    The compiled pattern's methods are then stored on the instance, so later calls
+    go straight to them without passing through __getattr__.
+
+    :param pattern: Regular expression pattern.
+    :param flags: Flags to use when compiling the pattern.
+    """
+
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags
+
+    def __getattr__(self, name):
+        if name.startswith('__'): raise AttributeError(name)
+        regex = re.compile(self.pattern, flags=self.flags)
+        for method in ('findall', 'finditer', 'fullmatch', 'match', 'search', 'split', 'sub', 'subn'):
+            setattr(self, method, getattr(regex, method))
+        self.regex = regex
+        return getattr(regex, name)
+
+
+class KeywordMatcher(object):
+    """Class to find which of a list of keywords occur in a string.
+
+    The keywords are compiled into a trie-shaped pattern inside a lookahead, so the string is
+    scanned once and the longest keyword starting at each position is captured. Shorter keywords
+    starting at the same position are prefixes of it, and are recovered from the prefix map.
+    If lower=True, the string is lower-cased before matching, as with 'keyword in string.lower()'."""
+
+    def __init__(self, keywords, lower=True):
+        self.keywords = frozenset(keywords)
+        self.lower = lower
+
+    def __getattr__(self, name):
+        # The trie is built and compiled the first time the matcher is used
+        if name not in ('regex', 'prefixes'): raise AttributeError(name)
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for c in keyword:
+                node = node.setdefault(c, {})
+            node[''] = {}
+        self.regex = stdlib_re.compile('(?=(' + self.trie_pattern(trie) + '))')
+        self.prefixes = {k: frozenset(p for p in self.keywords if k.startswith(p)) for k in self.keywords}
+        return getattr(self, name)
+
+    @classmethod
+    def trie_pattern(cls, node):
+        """Return a pattern matching the keywords below a node of the trie, longest first"""
+        branches = [stdlib_re.escape(c) + cls.trie_pattern(child) for (c, child) in sorted(node.items()) if c != '']
+        if not branches: return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node: pattern = '(?:' + pattern + ')?'
+        return pattern
+
+    def search(self, string):
+        """Return the first keyword found in the string, or None"""
+        if self.lower: string = string.lower()
+        match = self.regex.search(string)
+        if match is None: return None
+        return match.group(1)
+
+    def findall(self, string):
+        """Return the set of all keywords found in the string"""
+        if self.lower: string = string.lower()
+        found = set()
+        for keyword in set(self.regex.findall(string)):
+            found.update(self.prefixes[keyword])
+        return found
+
 
 # ====================
 #  Regular expressions
 # ====================
 
-RE_IAMS_ID = re.compile('0[34][0-9]-[0-9]{9}')
-RE_ISBN10 = re.compile(r'ISBN\x20(?=.{13}$)\d{1,5}([- ])\d{1,7}'r'\1\d{1,6}\1(\d|X)$|[- 0-9X]{10,16}')
-RE_ISBN13 = re.compile(r'97[89]{1}(?:-?\d){10,16}|97[89]{1}[- 0-9]{10,16}')
-RE_YEAR = re.compile('(?<![0-9])(1[0-9][0-9]{2}|2[0-9]{3})(?![0-9])')
-RE_YEAR_POST_1500 = re.compile('(?<![0-9])(1[5-9][0-9]{2}|2[0-9]{3})(?![0-9])')       # Only matches dates after 1500 to avoid confusion with volume numbers
-RE_DATE_1 = re.compile('(janu?a?r?y?|ocak|stycz|febr?u?a?r?y?|marc?h?|apri?l?|ma[iy]|june?|ioun|july?|augu?s?t?|agosto|sept?e?m?b?e?r?|o[ck]to?b?e?r?|nove?m?b?e?r?|listopad|de[czk]e?m?b?e?r?|grudz)\.*\s*([1-9][0-9]?([\-/][1-9]?[0-9]?)?)[^0-9]', flags=re.IGNORECASE)
-RE_DATE_2 = re.compile('(?<![0-9])([1-9][0-9]?([\-/][1-9]?[0-9]?)?)(th|st|nd)?\.*\s*(janu?a?r?y?|ocak|stycz|febr?u?a?r?y?|marc?h?|apri?l?|ma[iy]|june?|ioun|july?|augu?s?t?|agosto|sept?e?m?b?e?r?|o[ck]to?b?e?r?|nove?m?b?e?r?|listopad|de[czk]e?m?b?e?r?|grudz)', flags=re.IGNORECASE)
-RE_VOLUME = re.compile('(?<![a-z])(vo?l?|tomo|d|god|izd|rhif|rok|jahrg|jahrgang)[.:]*\s*([1-9xiv][0-9lxiv]*)[^0-9lxiv]', flags=re.IGNORECASE)
-RE_ISSUE = re.compile('(?<![a-z])(issue|br)[.:]*\s*([1-9lxiv][0-9lxiv]*)[^0-9lxiv]', flags=re.IGNORECASE)
-RE_NUMBER = re.compile('(?<![a-z])(no|nr|numb?e?r?|pa?r?t)[.:]*\s*([1-9lxi][0-9lxiv]*)[^0-9lxiv]', flags=re.IGNORECASE)
-RE_SERIES_NUMBER = re.compile('\s+(ba?n?d|fasc|he?fte?|jahrga?n?g?|knji?g?a?|n[or](?![a-z])|number|pa?r?t|sva?z?e?k?|volu?m?e?)s?[.\s]*[0-9a-zA-Z,\-.\s/]+$', flags=re.IGNORECASE)
-RE_NUMERAL = re.compile('[1-9]+[0-9]*|[cdilmvx]+')
+RE_IAMS_ID = LazyPattern('0[34][0-9]-[0-9]{9}')
+RE_ISBN10 = LazyPattern(r'ISBN\x20(?=.{13}$)\d{1,5}([- ])\d{1,7}'r'\1\d{1,6}\1(\d|X)$|[- 0-9X]{10,16}')
+RE_ISBN13 = LazyPattern(r'97[89]{1}(?:-?\d){10,16}|97[89]{1}[- 0-9]{10,16}')
+RE_YEAR = LazyPattern('(?<![0-9])(1[0-9][0-9]{2}|2[0-9]{3})(?![0-9])')
+RE_YEAR_POST_1500 = LazyPattern('(?<![0-9])(1[5-9][0-9]{2}|2[0-9]{3})(?![0-9])')       # Only matches dates after 1500 to avoid confusion with volume numbers
+RE_DATE_1 = LazyPattern('(janu?a?r?y?|ocak|stycz|febr?u?a?r?y?|marc?h?|apri?l?|ma[iy]|june?|ioun|july?|augu?s?t?|agosto|sept?e?m?b?e?r?|o[ck]to?b?e?r?|nove?m?b?e?r?|listopad|de[czk]e?m?b?e?r?|grudz)\.*\s*([1-9][0-9]?([\-/][1-9]?[0-9]?)?)[^0-9]', flags=re.IGNORECASE)
+RE_DATE_2 = LazyPattern('(?<![0-9])([1-9][0-9]?([\-/][1-9]?[0-9]?)?)(th|st|nd)?\.*\s*(janu?a?r?y?|ocak|stycz|febr?u?a?r?y?|marc?h?|apri?l?|ma[iy]|june?|ioun|july?|augu?s?t?|agosto|sept?e?m?b?e?r?|o[ck]to?b?e?r?|nove?m?b?e?r?|listopad|de[czk]e?m?b?e?r?|grudz)', flags=re.IGNORECASE)
+RE_VOLUME = LazyPattern('(?<![a-z])(vo?l?|tomo|d|god|izd|rhif|rok|jahrg|jahrgang)[.:]*\s*([1-9xiv][0-9lxiv]*)[^0-9lxiv]', flags=re.IGNORECASE)
+RE_ISSUE = LazyPattern('(?<![a-z])(issue|br)[.:]*\s*([1-9lxiv][0-9lxiv]*)[^0-9lxiv]', flags=re.IGNORECASE)
+RE_NUMBER = LazyPattern('(?<![a-z])(no|nr|numb?e?r?|pa?r?t)[.:]*\s*([1-9lxi][0-9lxiv]*)[^0-9lxiv]', flags=re.IGNORECASE)
+RE_SERIES_NUMBER = LazyPattern('\s+(ba?n?d|fasc|he?fte?|jahrga?n?g?|knji?g?a?|n[or](?![a-z])|number|pa?r?t|sva?z?e?k?|volu?m?e?)s?[.\s]*[0-9a-zA-Z,\-.\s/]+$', flags=re.IGNORECASE)
+RE_NUMERAL = LazyPattern('[1-9]+[0-9]*|[cdilmvx]+')
+RE_NUMERIC_DATE = LazyPattern(r'(?<![0-9])([0-9][0-9]?)[.](0?[1-9]|1[0-2])[.]([12][0-9]{3})(?![0-9])')
+RE_LEADING_ZEROS = LazyPattern(r'\s+0+(?=[1-9])')
+RE_YEAR_ABBREVIATION = LazyPattern(r"'([0-9]{2})(?![0-9])")
+RE_RANGE_START = LazyPattern(r'(began|commence|launch|start)[ed]*\s*(at|in|with)?', flags=re.IGNORECASE)
+RE_RANGE_END = LazyPattern(r'(cease|end|finish)[ed]*\s*(with|in|on)?', flags=re.IGNORECASE)
+RE_DIGIT = LazyPattern(r'[0-9]')
+RE_WHITESPACE = LazyPattern(r'\s+')
+RE_ADAPTATIONS = LazyPattern(r'\(adap(ta)?tions\)', flags=re.IGNORECASE)
+RE_PSEUDONYM = LazyPattern(r'(?<![a-z])pseud\.*(?![a-z])', flags=re.IGNORECASE)
+RE_FORMATTING_TAG = LazyPattern(r'</*(b|br|emph|i|li|ol|p|sup|sub|ul)\s*/*>', flags=re.IGNORECASE)
+RE_OPEN_BRACKET = LazyPattern(r'\s*[({<]\s*')
+RE_CLOSE_BRACKET = LazyPattern(r'\s*[)}>]\s*')
+RE_OPEN_SQUARE_BRACKET = LazyPattern(r'\s*\[\s*')
+RE_CLOSE_SQUARE_BRACKET = LazyPattern(r'\s*\]\s*')
+
+# Used in clean_msg()
+RE_MARKUP_TAG = LazyPattern(r'<[^>]+>')
+RE_NULL_CHARACTERS = LazyPattern(r'[\u0000\ufffd]')
+
+# Used in clean_search_string()
+RE_NON_ASCII = LazyPattern(r'[^\x00-\x7F]')
+
+# Used in normalize_dewey()
+RE_DEWEY_DIGIT = LazyPattern(r'([0-9\]])(?![\]\-])')
+
+# Used in get_frequency()
+RE_BRACKETED_TEXT = LazyPattern(r'\([^)]*\)')
+
+# Used in get_name_parts()
+RE_INITIAL = LazyPattern(r'([\s.\-][A-Z])([,\s]|$)')
+
+# Used in get_relators()
+RE_RELATOR_SEPARATOR = LazyPattern(r'[,:;]| and ')
+
+# Used in get_topic_parts()
+RE_SUBFIELD_MARKER = LazyPattern(r'[$][a-z\s]')
+
+# Used in expand_abbreviations()
+RE_WORD = LazyPattern('([\w\-]+\.*)')
+
+# Used in expand_place_abbreviations()
+RE_NEW_YORK = LazyPattern(r'[nN]ew[\-\s]*[yY]ork\s*(\(?,?\s*(NY|New York|City)\)?)?')
+RE_COUNTY_OF = LazyPattern(r'(\bin the )?\bcounty of\b')
+RE_TRAILING_UK_US = LazyPattern(r'[,\s]+(U[\.\s]*K[\.\s]*|U[\.\s]*S[\.\s]*A*[\.\s]*|United\s*Kingdom|United\s*States(\s*of\s*America)?)\s*$', flags=re.IGNORECASE)
+
+# Used in clean_250()
+RE_250_SEPARATORS = LazyPattern(r'\s*[:;\]\/]+')
+RE_250_UNWANTED_CHARACTERS = LazyPattern(r'[\[<>{}*]')
+RE_250_ET_CETERA = LazyPattern(r'\s*&[aceimst\/]{1,3}\.*\s*', flags=re.IGNORECASE)
+RE_LEADING_THE = LazyPattern(r'^the\s+', flags=re.IGNORECASE)
+RE_ELLIPSIS = LazyPattern(r'\s*\.\.\.+\s*')
+RE_THAT_IS = LazyPattern(r'[\s,]+i\.*\s*e[\.\s]+', flags=re.IGNORECASE)
+RE_LETTER_STOP_DIGIT = LazyPattern(r'([a-z])\.*([0-9])')
+RE_LETTER_STOP_LETTER = LazyPattern(r'([a-z])\.+([a-z])')
+RE_NEW_EDITION = LazyPattern(r'new[.,]+\s*ed', flags=re.IGNORECASE)
+RE_STEREOTYPED = LazyPattern(r'(?<![a-z])stere?o-*(typed)?[\.\s]+', flags=re.IGNORECASE)
+
+# Used in clean_26X()
+RE_26X_PAGINATION = LazyPattern(r'^((ff|p(p|ages?)|vol)[.\s]+[0-9,.\-\sivxfp\[\]]+\b\s*|[0-9,.\-\sivxfp\[\]]+\b\s*p(p|ages?))')
+RE_26X_SIZE = LazyPattern(r'\s*\b[0-9]+\s*cm[.\s]*$')
+RE_26X_AT = LazyPattern(r'^(at\s+|a paris)(?!press)')
+RE_26X_ET_CETERA = LazyPattern(r'\s+(etc|anno)$')
+
+# Used in clean_300()
+RE_300_SEPARATORS = LazyPattern(r'[:;]+')
+RE_300_UNWANTED_CHARACTERS = LazyPattern(r'[\[\]<>{}*]')
+RE_300_ET_CETERA = LazyPattern(r'\s*&[aceimsts\/]{1,3}\.*\s*')
+RE_DEGREE_SIGN = LazyPattern(u'[.\s]*[\u030a\u00ba\u2070\u00b0]+m*')
+RE_FORMAT_ABBREVIATION = LazyPattern(u'(?<=[0-9])\s*(mo|o|to|vo)(?![a-z])')
+RE_DIGIT_LETTER = LazyPattern(r'([0-9])([a-z])')
+RE_LETTER_DIGIT = LazyPattern(r'([a-z])([0-9])')
+RE_LETTER_STOP = LazyPattern(r'([a-z])\.')
+RE_SPACED_CLOSE_PARENTHESIS = LazyPattern(r'\s*\)\s*')
+RE_SPACED_COMMA = LazyPattern(r'\s*,\s*')
+RE_SPACED_HYPHEN = LazyPattern(r'\s*-\s*')
+RE_SPACED_OPEN_PARENTHESIS = LazyPattern(r'\s*\(\s*')
+RE_BLACK_AND_WHITE = LazyPattern(r'b(lack)?\.*\s*(and)?/*\s*w(hite)?\.*')
+RE_PAGES_BEFORE_NUMBER = LazyPattern(r'^\s*pages ([0-9\-]+),*')
+RE_SINGLE_PLURAL = LazyPattern(r'(?<![0-9])1 ([a-z]+[a-tv-z])s(?![a-z])')
+RE_FOUR_THREE_QUARTERS = LazyPattern(r'4\s*((sup)?\s*3/(sub)?\s*4|\.75)')
+RE_NEW_SERIES = LazyPattern(r'(?<![a-z])n s(?![a-z])')
+RE_SINGLE_SHEET = LazyPattern(r'(?<![a-z])s sheet')
+RE_COLOUR_ILLUSTRATIONS = LazyPattern(r' (illustrations|maps) \((colour|black and white)\)')
+
+# Used in clean_490()
+RE_490_BIBLIOGRAPHY = LazyPattern(r'bibl\.*[\s]*pp?\.*[0-9\-]+$')
+
+# Used in clean_490_number()
+RE_490_UNPAGED = LazyPattern(r'(?<![a-z])u[.\s]*p[.\s]*(?![a-z])', flags=re.IGNORECASE)
+RE_490_TOME = LazyPattern(r'^t[.\s]+', flags=re.IGNORECASE)
+RE_490_NUMBER = LazyPattern(r'^n[.\s]+', flags=re.IGNORECASE)
+RE_490_VOLUME = LazyPattern(r'(?<![a-z])v[.\s]+', flags=re.IGNORECASE)
+RE_DIGIT_STOP_LETTER = LazyPattern(r'([0-9])\.\s+([a-z])')
+
+# Used in clean_500()
+RE_SIGNATURES = LazyPattern(r'(?<![a-z])[sS]ig\.?(?![a-z])')
+
+# Used in clean_510()
+RE_CD_ROM = LazyPattern(r'[cC][dD]-*[rR][oO][mM]')
+
+# Used in clean_genre()
+RE_NOT_ALPHANUMERIC = LazyPattern(r'[^a-z0-9\s]')
+
+# Used in clean_name_dates()
+RE_BC = LazyPattern(r'B\.?C\.?')
+RE_AD = LazyPattern(r'A\.?D\.?')
+RE_CENT = LazyPattern(r'cent(?!u)')
+RE_CENTURY = LazyPattern(r'([0-9]+) century')
+RE_CENTURY_STOP = LazyPattern(r'([0-9]+)th\. century')
+RE_CENTURY_RANGE = LazyPattern(r'([0-9]+)-([0-9]+)th century')
+RE_CENTURY_PARENTHESES = LazyPattern(r'\(([0-9]+)th\.?\)')
+RE_CIRCA = LazyPattern(r'ca?[.,]*\s*([0-9]+)', flags=re.IGNORECASE)
+RE_QUERIED_YEAR = LazyPattern(r'([0-9]{4})\s*\?', flags=re.IGNORECASE)
+RE_BORN = LazyPattern(r'^(b|n.)[.,]*\s*([0-9]+)', flags=re.IGNORECASE)
+RE_BORN_APPROXIMATELY = LazyPattern(r'^b[.,]*\s*(approximately [0-9]+)', flags=re.IGNORECASE)
+RE_DIED = LazyPattern(r'd?d[.,]*\s*([0-9]+)')
+RE_DIED_APPROXIMATELY = LazyPattern(r'^cd[.,]*\s*(approximately [0-9]+)', flags=re.IGNORECASE)
+RE_LEADING_DIED = LazyPattern(r'^D[.,]*\s*([0-9]+)', flags=re.IGNORECASE)
+RE_FLOURISHED = LazyPattern(r'^f[.,]*l?[.,]*\s*([0-9]+)', flags=re.IGNORECASE)
+RE_REIGNED = LazyPattern(r'r([0-9]{4})')
+RE_BAPTISED = LazyPattern(r'bap\. ([0-9]{4})')
+RE_TEXT_AFTER_DATES = LazyPattern(r'([0-9]+\??)\. .*$')
+RE_TRAILING_WORD = LazyPattern(r' [^ac][a-zA-Z]*$')
+
+# Used in clean_publication_places()
+RE_INITIAL_EXPANSION = LazyPattern(r'\b([A-Z]) \[([a-z]+)\][.,\s]+')
+RE_PLACE_SEPARATORS = LazyPattern(r'[\s\-.,]*[:;\[\]\\/(){}<>&*?|]+[\s\-.,]*')
+RE_PLACE_THAT_IS = LazyPattern(r'[\s\-.,]*(\bi[.\s]*e\b[.\s]*)[\s\-.,]*', flags=re.IGNORECASE)
+RE_PLACE_COMMA_AND = LazyPattern(r'[\s\-.,]*,\s*(&|\bet\b|\band\b|\bund\b)[\s\-.,]*', flags=re.IGNORECASE)
+RE_PLACE_AND = LazyPattern(r'[\s\-.,]*(&|\bet\b|\band\b|\bund\b)[\s\-.,]*', flags=re.IGNORECASE)
+RE_SEMICOLONS = LazyPattern(r'(\s*;\s*)+')
+RE_AND = LazyPattern(r'[,.\-\s]*\b(and|et|und|&)\b[,.\-\s]*', flags=re.IGNORECASE)
+
+# Used in clean_publisher_names()
+RE_PUBLISHER_SEPARATORS = LazyPattern(r'[\s\-.,]*[:;\[\]\\/(){}<>|]+[\s\-.,]*')
+RE_PUBLISHER_PHRASES = LazyPattern(r'[\s\-.,]*((\b[1-2][0-9]{3}\b|\.\.\.+|(&|\bet|\band|\bund)\s*c(o(mp(an)?y)?|(omp)?ie|orp)\b\.*|&c(ie)?\b\.*|\be[.\s]*t[.\s]*c\b[.\s]*|\bi[.\s]*e\b[.\s]*|\bl[.\s]*t[.\s]*d([.\s]*a)?\b[.\s]*|\bb[.\s]*[im]\b[.\s]*|\bn[.\s]*[pv]\b[.\s]*|\bs[.\s]*[inl]\b[.\s]*|\bp[.\s]*[ltv][.\s]*[cty]\b[.\s]*|\b(et\s*al|sic|viz)\b[.\s]*|(&|\bet|\band|\bund)\s*(bro(ther)?|son|the)s*\b[.\s]*|\b(also|distribution\s*(services*)?|exclusively|excudebant|incorporat(ing|ed)|issued|likewise|limited|lithographically|originally|serviced)\s*((by|for|in|into|par|pour|with)\b)?\s*(the\b)?|\bnot\s*avail(able)?\b|(\ban*)?\s*\b(book|division|imprint|part|publication)\s*(from|of)\b|(\bfor\s*)?\bsubscribers*\s*only\b|\btrading\s*as\b|(\bfor)?\s*(\bthe)?\s*\bprivate\s*(circulation|press)\b\s*(of\b)?|,([\s\-.,]*\b(an|and|at|by|chez|et|for|in|par|pour|the|typ|und|under|with)\b)+|\b(by|in|on|with)\s*(associatio?n|assignment|assistance|arrangement|authority|behalf|collaboration|conjunction|co-*operation|permission)\s*((from|of|with)\b)?\s*(the\b)?\s*((trustee|executor|guardian|proprietor)s*)?\s*(of\b)?\s*(the\b)?|(\b(for|from|of|with))?\s*(the)?\s*\b((trustee|executor|guardian|proprietor)s*)\b\s*(of\b)?\s*(the\b)?(late\b)?|\b((exclusive|joint|private)ly\s*)?((co|re)[\-\s]*)?((distribut|issu|print|produc|pub(lish|\.)?)ed\s*((&|\bet|\band|\bund)\b)?\s*)+((exclusive|joint|private)ly\s*)?\s*((at\s*the\s*office\s*of|by|for|par|pour|with)\b)?\s*(the\b)?\s*(assistance\b)?\s*(of\b)?\s*(the\b)?|(\b(&|all|and|by|catholic|every|following|others?|principal|the|rest)[\s\-.,]*)*\b(administrator|author|distribute*or|.dit(eu|o)r|heir|perfumer|printer|proprietor|publisher|(book|law|music)[\s\-.,]*seller|stationer|successor)\'*s*(\s*(friend|syndicate)s?)?\b([\s\-.,]*(&|and|britain|city|country|county|great|in|kingdom|of|the|scotland|town|york)\b)*|\b(under|with)\s*the\s*((assistance|auspices?|co-*operation|direction|permission|sponsorship)\s*((&|\bet|\band|\bund)\b)?\s*)+\s*(of\b)?\s*(the\b)?|((&|\bet|\band|\bund)\s*(are\s*to\s*be)|((&|\bet|\band|\bund)\b)?\s*(are\s*to\s*be))\s*solde?\b|(&|\bet|\band|\bund)\s*subsidiar(y|ies)\b|\bar\s*ran\b|\bargraphwyd\s*(dros)?\b|\b(et\s*)?(a\s*lond.*?)?se\s*(trouve|vend)\b.*?(lond.*?)?che.*?propriet[aeious]*res?\b|\baux?\s*frais\s*(de\s*(l[eas]*\s*)?)?|\bimprim.e*.*?d.pens.*?ladite.*?academie\s*(par|pour)?\b|\bzu\s*finden\s*beym\b|\bdruck\s*der\b|\b(to|for)\s*((her|his|the\s*(king|queen)[.s\s]*most\s*excellent)\s*(majesty|royal\s*highness)([,\s]*pall-mall)?|the\s*society)([,\s]*(the\s*)?prince(\s*of\s*wales|sses))?\b|(&|\bet|\band|\bund)\s*(all|one|two|three|four|five|six|seven|eight|nine|ten|[0-9]+)?\s*others?\b|\ba favourite song in the enchanter\b|\ba scrapbook of pieces from m[.\s]*d\b[.\s]*|\bas\s*the\s*act\s*directs\b|\b(where|by\s*whom)\s*advertisements\s*are\s*taken\s*in\b|\bby\s*the\s*author.?s\s*appointment\b|\bmass\s*market\s*paperback\b|\bentered\s*at\s*stationer.?s hall\b|\b(also)?\s*(in|at)\s*(h(er|is)\s*majesty.?s|the|the\s*(king|queen)\'*s)\s*theatre\s*(in\b)?\s*(the\b)?\s*(hay-*market)?|\bin\s*(the)?\s*(u[.\s]*s[.\s]*a\b[.\s]*|north\s*(&|and)\s*south\s*america|united\s*states(\s*of\s*america)?|western\s*hemisphere)|\bat\s*(his|the)\s*(library|shop|(wholesale)?\s*warehouses?),?(\s*on\s*the\s*esplanade)?)[\s\-.,]*)+', flags=re.IGNORECASE)
+RE_PUBLISHER_COMMITTEE = LazyPattern(r'[\s\-.,]*\b(committee|office)s*\s*of\b[\s\-.,]*\'', flags=re.IGNORECASE)
+RE_PUBLISHER_PUBLICATIONS = LazyPattern(r'\'[\s\-.,]*\b(publi(cation|shing))s*[\s\-.,]*', flags=re.IGNORECASE)
+RE_PUBLISHER_SPLIT_AFTER = LazyPattern(r'[\s\-.,]*\b(agency|associatio?n|library|newspapers|organisation|organization|society|trust|university press)[\s\-.,]+(?!for|of)', flags=re.IGNORECASE)
+RE_PUBLISHER_SPLIT_AFTER_PRESS = LazyPattern(r'[\s\-.,]*\b(press|publications|publishing)[\s\-.,]*(co)?[\s\-.,]+(?!and|house)', flags=re.IGNORECASE)
+RE_PUBLISHER_SPLIT_BEFORE = LazyPattern(r'[\s\-.,]*\b(bloomsbury|british library|british school of|dover|j(ohn)? murray|methuen|penguin)', flags=re.IGNORECASE)
+RE_PUBLISHER_SPLIT_BETWEEN = LazyPattern(r'[\s\-.,]*\b(books|london|westminster)[\s\-.,]*(?:&|et|and|und)?[\s\-.,]*(for the|london|westminster)\b', flags=re.IGNORECASE)
+RE_UNIVERSITY_PRESS = LazyPattern(r'\s*\bu(ni)?(versity)?[.\s]*pr*(ess)?\b[.\s]*', flags=re.IGNORECASE)
+
+# Substitutions applied in sequence
+
+# Numbers written as words, in get_frequency()
+NUMBER_WORDS = [
+    (LazyPattern(r'(?<![a-z])twenty-*four(?![a-z])'), '24'),
+    (LazyPattern(r'(?<![a-z])one(?![a-z])'), '1'),
+    (LazyPattern(r'(?<![a-z])two(?![a-z])'), '2'),
+    (LazyPattern(r'(?<![a-z])three(?![a-z])'), '3'),
+    (LazyPattern(r'(?<![a-z])four(?![a-z])'), '4'),
+    (LazyPattern(r'(?<![a-z])five(?![a-z])'), '5'),
+    (LazyPattern(r'(?<![a-z])six(?![a-z])'), '6'),
+    (LazyPattern(r'(?<![a-z])seven(?![a-z])'), '7'),
+    (LazyPattern(r'(?<![a-z])eight(?![a-z])'), '8'),
+    (LazyPattern(r'(?<![a-z])nine(?![a-z])'), '9'),
+    (LazyPattern(r'(?<![a-z])ten(?![a-z])'), '10'),
+    (LazyPattern(r'(?<![a-z])eleven(?![a-z])'), '11'),
+    (LazyPattern(r'(?<![a-z])twelve(?![a-z])'), '12'),
+]
+
+# Abbreviations which span more than one word, in expand_abbreviations()
+MULTI_WORD_ABBREVIATIONS = [
+    (LazyPattern(r'(?<![a-z])n\.*\s*s(er)?\.*(?![a-z])', flags=re.IGNORECASE), 'new series'),
+    # French
+    (LazyPattern(r' et augm(ent)?(?![a-z])\.*', flags=re.IGNORECASE), u' et augment\u00e9e'),
+    (LazyPattern(r' et corr(ig)?(?![a-z])\.*', flags=re.IGNORECASE), u' et corrig\u00e9e'),
+    (LazyPattern(r'corr(ig)?(\u00e9e)?\.* et ', flags=re.IGNORECASE), u'corrig\u00e9e et '),
+    (LazyPattern(r'r(ev)?\.* et ', flags=re.IGNORECASE), 'revue et '),
+    # German
+    (LazyPattern(r'(?<![a-z])n\.*\s*f\.*(?![a-z])', flags=re.IGNORECASE), 'neue Folge'),
+    # Italian
+    (LazyPattern(r'nuova ser(?![a-z])', flags=re.IGNORECASE), 'nuova serie'),
+    # Spanish
+    (LazyPattern(r'correg\.*\s*y\s*aum\.*', flags=re.IGNORECASE), 'corregida y aumentada'),
+]
+
+# Ordinal numbers in edition statements, in clean_250()
+EDITION_ORDINALS = [
+    (LazyPattern(r'(?<=[0-9])(th| )ed(ition)?\.*', flags=re.IGNORECASE), 'th edition'),
+    (LazyPattern(r'(?<![01])1(st[.,]*|\s*a[.,\s]+)\s*', flags=re.IGNORECASE), '1st '),
+    (LazyPattern(r'^([0-9]{0,2}1)[.][.,]*\s*', flags=re.IGNORECASE), r'\1st '),
+    (LazyPattern(r'2((nd|gn)[.,\s]+|[ad](?![a-z])[.,]*)\s*', flags=re.IGNORECASE), '2nd '),
+    (LazyPattern(r'^([0-9]{0,2}2)[.][.,]*\s*', flags=re.IGNORECASE), r'\1nd '),
+    (LazyPattern(r'3(rd[.,]|\s*(am|rda|te|[ad])(?![a-z])[.,]*)\s*', flags=re.IGNORECASE), '3rd '),
+    (LazyPattern(r'^([0-9]{0,2}3)[.][.,]*\s*', flags=re.IGNORECASE), r'\1rd '),
+    (LazyPattern(r'([4-9])(th[.,]|\s*the(?![a-z])[.,]*)\s*', flags=re.IGNORECASE), r'\1th '),
+    (LazyPattern(r'^([0-9]{0,2}4-9])[.][.,]*\s*', flags=re.IGNORECASE), r'\1th '),
+    (LazyPattern(r'^([0-9]{1,3})\.', flags=re.IGNORECASE), r'\1th '),
+    (LazyPattern(r'([0-9])(st|gn|nd|rd|th)(?![a-z])[.,]\s*', flags=re.IGNORECASE), r'\1\2 '),
+    (LazyPattern(r'([0-9])-?o?e(?![a-z])[.,]*\s*', flags=re.IGNORECASE), r'\1e '),
+]
+
+# Words associated with names, in clean_words_associated_with_name()
+NAME_WORDS = [
+    # (LazyPattern(r'(?<![a-z])[aA]uth?(o|eu)r', flags=re.IGNORECASE), 'author'),
+    (LazyPattern(r'(?<![a-z])[bB]art\.*(?![a-z])', flags=re.IGNORECASE), 'Baronet'),
+    (LazyPattern(r'(?<![a-z])[bB]aron', flags=re.IGNORECASE), 'Baron'),
+    # (LazyPattern(r'(?<![a-z])[cC]ivil engineer', flags=re.IGNORECASE), 'civil engineer'),
+    (LazyPattern(r'(?<![a-z])[cC]urate', flags=re.IGNORECASE), 'curate'),
+    (LazyPattern(r'(?<![a-z])[eE]arl', flags=re.IGNORECASE), 'Earl'),
+    # (LazyPattern(r'(?<![a-z])[eE]ditor', flags=re.IGNORECASE), 'editor'),
+    # (LazyPattern(r'(?<![a-z])[eE]d\.*(?![a-z])', flags=re.IGNORECASE), 'editor'),
+    (LazyPattern(r'(?<![a-z])[eE]xpression', flags=re.IGNORECASE), ''),
+    (LazyPattern(r'(?<![a-z])[hH]on\.*(?![a-z])', flags=re.IGNORECASE), 'Honourable'),
+    (LazyPattern(r'(?<![a-z])[hH]ungarian', flags=re.IGNORECASE), 'Hungarian'),
+    (LazyPattern(r'(?<![a-z])[iI]ssui?ng [bB]ody', flags=re.IGNORECASE), 'issuing body'),
+    (LazyPattern(r'(?<![a-z])[lL]ady', flags=re.IGNORECASE), 'Lady'),
+    (LazyPattern(r'(?<![a-z])[lL]ord', flags=re.IGNORECASE), 'Lord'),
+    # (LazyPattern(r'(?<![a-z])[mM]athematics [tT]eacher', flags=re.IGNORECASE), 'mathematics teacher'),
+    (LazyPattern(r'(?<![a-z])[mM]inister', flags=re.IGNORECASE), 'minister'),
+    (LazyPattern(r'(?<![a-z])[pP]reacher', flags=re.IGNORECASE), 'preacher'),
+    (LazyPattern(r'(?<![a-z])[mM]rs', flags=re.IGNORECASE), 'Mrs'),
+    (LazyPattern(r'(?<![a-z])[rR]ev\.*(?![a-z])', flags=re.IGNORECASE), 'Reverend'),
+    (LazyPattern(r'(?<![a-z])[rR]t\.*(?![a-z])', flags=re.IGNORECASE), 'Right'),
+    (LazyPattern(r'(?<![a-z])[sS]chool[\-\s]*master', flags=re.IGNORECASE), 'schoolmaster'),
+    (LazyPattern(r'(?<![a-z])[sS]ir', flags=re.IGNORECASE), 'Sir'),
+    (LazyPattern(r'(?<![a-z])[sS]tudent', flags=re.IGNORECASE), 'student'),
+    # (LazyPattern(r'(?<![a-z])[tT]eacher', flags=re.IGNORECASE), 'teacher'),
+    # (LazyPattern(r'(?<![a-z])[tT]r\.*(?![a-z])', flags=re.IGNORECASE), 'translator'),
+    (LazyPattern(r'(?<![a-z])[vV]icar', flags=re.IGNORECASE), 'vicar'),
+    (LazyPattern(r'(?<![a-z])[vV]iscount', flags=re.IGNORECASE), 'Viscount'),
+    # (LazyPattern(r'(?<![a-z])[wW]riter', flags=re.IGNORECASE), 'writer'),
+]
+
+
+# ====================
+#  Keyword matchers
+# ====================
+
+# Words that suggest a publication place string contains publisher names
+# Space after 'for' to prevent detection of 'ford' e.g. Bradford
+PUBLISHER_FLAGS = KeywordMatcher(['& co', 'book', 'for ', 'printed', 'private', 'published', 'shop', 'sold'])
+
+# Record status values that exclude a record from output
+STATUS_FLAGS = KeywordMatcher(['deleted', 'suppressed', 'prepublication'])
+
+# Month and season names (and abbreviations), in the order in which they are tested
+MONTHS = [
+    ('January', ['jan', 'enero', 'ionawr', 'ocak', 'stycz']),
+    ('February', ['feb', 'chwe', 'fev']),
+    ('March', ['mar', 'mawrth', u'mu\0072rz']),
+    ('April', ['apr', 'avr', 'ebrill', 'kwie']),
+    ('May', ['may', 'mai', 'mai︠a︡', 'maj']),
+    ('June', ['jun', 'czerw', 'ii︠u︡ni︠a︡', 'ioun', 'juin', 'meh']),
+    ('July', ['jul', 'gorff', 'juil']),
+    ('August', ['aug', 'agosto', 'août', 'awst', 'sierp']),
+    ('September', ['sep', 'medi', 'rugsėjo', 'wrzes']),
+    ('October', ['oct', 'hydref', 'pazdzier']),
+    ('November', ['nov', 'listopad', 'tachw']),
+    ('December', ['dek', 'grudz', 'rhagfyr']),
+    ('Spring', ['spring', 'gwanwyn']),
+    ('Summer', ['summer', 'yr haf']),
+    ('Autumn', ['autumn']),
+    ('Winter', ['winter', 'gaeaf']),
+]
+MONTH_KEYWORDS = KeywordMatcher([k for (m, keywords) in MONTHS for k in keywords] + ['dec', 'dechreuodd'], lower=False)
+
+# Frequency keywords
+# Each rule gives the frequency, words of which at least one must be present,
+# and (optionally) a further list of words of which at least one must also be present
+YEAR_WORDS = frozenset(['year', 'annual', 'annum', 'annuel'])
+FREQUENCIES = [
+    ('Tri-weekly', frozenset(['3', 'three', 'tri-', 'triweek', 'thrice']), frozenset(['week'])),
+    ('Semi-weekly', frozenset(['2', 'two', 'twice', 'semi']), frozenset(['week'])),
+    ('Bi-weekly', frozenset(['biweekl', 'bi-weekl']), None),
+    ('Weekly', frozenset(['wythnosol', 'weekl', 'weeky']), None),
+    ('Fortnightly', frozenset(['fortnight']), None),
+    ('Tri-monthly', frozenset(['3', 'three', 'tri-', 'trimonth', 'thrice']), frozenset(['month'])),
+    ('Semi-monthly', frozenset(['2', 'two', 'twice', 'semi']), frozenset(['month'])),
+    ('Bi-monthly', frozenset(['bi-month', 'bimonth', 'bi-a month']), None),
+    ('Monthly', frozenset(['monthly']), None),
+    ('Quarterly', frozenset(['quarter']), None),
+    ('Tri-annual', frozenset(['3', 'three', 'tri-', 'triannu', 'thrice']), YEAR_WORDS),
+    ('Semi-annual', frozenset(['2', 'two', 'twice', 'semi']), YEAR_WORDS),
+    ('Annual', frozenset(['annual', 'annuel']), None),
+    ('Biennial', frozenset(['biennial', 'bi-ennial', 'biannual', 'bi-annual', 'bienal']), None),
+    ('Triennial', frozenset(['triennial', 'tri-ennial']), None),
+    ('Quadrennial', frozenset(['quadrennial']), None),
+    ('Quinquennial', frozenset(['quinquennial']), None),
+    ('Irregular', frozenset(['irregul']), None),
+    ('Frequency varies', frozenset(['varies']), None),
+]
+DAILY_EXCEPTIONS = [
+    ('Daily (except Saturday & Sunday)', frozenset(['monday to friday', 'except saturday & sunday'])),
+    ('Daily (except Sunday)', frozenset(['monday to saturday', 'except sunday'])),
+    ('Daily (except Monday)', frozenset(['except monday'])),
+]
+FREQUENCY_KEYWORDS = KeywordMatcher(YEAR_WORDS.union(['daily', 'week', 'month'],
+                                                     *[keywords for (f, keywords, required) in FREQUENCIES],
+                                                     *[keywords for (f, keywords) in DAILY_EXCEPTIONS]),
+                                    lower=False)
+
+# Values that identify rubbish in 26X, 300 and 852 fields
+NOT_IDENTIFIED = KeywordMatcher(['not identified', 'not indentified'])
+PUBLISHERS_IN_300 = KeywordMatcher(['jaggard', 'london', 'macmillan'], lower=False)
+NOT_SHELFMARKS = KeywordMatcher(['available', 'availalbe', 'british museum', 'catalog', 'classmark', 'customer service',
+                                 'discard', 'holding', 'impression', 'lacking', 'libraries', 'not found', 'on order',
+                                 'pending', 'pressmark', 'shelmark', 'shelfmrk', 'shelfmark', 'shelfmrak', 'smk',
+                                 'spacer', 'stained', 'superseded', 'test', 'tightly bound', 'unavailable'])
 
 # ====================
 #      Functions
@@ -56,22 +512,23 @@ def sort_quotes(string):
 
 def clean(string, hyphens=True, space=True):
     """Function to clean punctuation, unescape HTML, and normalize Unicode."""
-    string = html.unescape(string)
-    string = re.sub(u'[\u0022\u055A\u05F4\u2018\u2019\u201A\u201B\u201C\u201D\u201E\u201F\u275B\u275C\u275D\u275E\uFF07]', '\'', string)
-    string = re.sub(
-        u'[\u0000-\u0009\u000A-\u000f\u0010-\u0019\u001A-\u001F\u0080-\u0089\u008A-\u008F\u0090-\u0099\u009A-\u009F\u2028\u2029]+',
-        '', string)
-    if space:
-        string = re.sub(r'\s+', ' ', string)
-        string = re.sub(u'[\u00A0\u1680\u2000-\u200A\u202F\u205F\u3000]+', ' ', string)
-        string = re.sub(r'\(adap(ta)?tions\)', '', string, flags=re.IGNORECASE)
-        string = re.sub(r'(?<![a-z])pseud\.*(?![a-z])', 'pseudonym', string, flags=re.IGNORECASE)
-        string = quick_clean(string, hyphens)
-        string = re.sub(r'</*(b|br|emph|i|li|ol|p|sup|sub|ul)\s*/*>', ' ', string, flags=re.IGNORECASE)
-        string = re.sub(r'\s+', ' ', string)
-        string = check_brackets(string)
-    string = unicodedata.normalize('NFC', string).strip()
-    return string
+    if '&' in string:
+        string = html.unescape(string)
+    if not space:
+        return normalize(string.translate(CLEAN_CHARACTERS)).strip()
+    # After translation the only whitespace left is the plain space, so split() collapses it
+    string = ' '.join(string.translate(CLEAN_SPACES).split())
+    if '(' in string:
+        string = RE_ADAPTATIONS.sub('', string)
+    if not string.isascii() or 'pseud' in string.lower():
+        string = RE_PSEUDONYM.sub('pseudonym', string)
+    string = quick_clean(string, hyphens)
+    if '<' in string:
+        string = RE_FORMATTING_TAG.sub(' ', string)
+    if '  ' in string:
+        string = ' '.join(string.split())
+    # check_brackets() returns a normalized, stripped string
+    return check_brackets(string)
 
 
 def quick_clean(string, hyphens=True):
@@ -82,19 +539,54 @@ def quick_clean(string, hyphens=True):
     If hyphens=True, trailing/leading hyphens are preserved."""
     l = '?$.,:;/\])} ' if hyphens else '?$.,:;/\-])} '
     r = '.,:;/\[({ ' if hyphens else '.,:;/\-[({ '
-    string = re.sub(r'\s+', ' ', string.strip().lstrip(l).rstrip(r)).strip()
-    string = string.replace('( ', '(').replace(' )', ')')
-    string = string.replace(' ,', ',').replace(',,', ',').replace(',.', '.').replace('.,', ',')
-    string = string.replace('. [', ' [').replace(' : (', ' (').replace('= =', '=').replace('= :', '=').replace('+,', '+')
-    string = string.replace('number more', 'no more')
+    string = string.strip().lstrip(l).rstrip(r)
+    if any(c in string for c in INFORMATION_SEPARATORS):
+        string = RE_WHITESPACE.sub(' ', string).strip()
+    else:
+        string = ' '.join(string.split())
+    # None of the replacements below introduces a character, so each group can be skipped
+    # when its trigger character is absent
+    if '(' in string:
+        string = string.replace('( ', '(')
+    if ')' in string:
+        string = string.replace(' )', ')')
+    if ',' in string:
+        string = string.replace(' ,', ',').replace(',,', ',').replace(',.', '.').replace('.,', ',')
+    if '[' in string:
+        string = string.replace('. [', ' [')
+    if '(' in string:
+        string = string.replace(' : (', ' (')
+    if '=' in string:
+        string = string.replace('= =', '=').replace('= :', '=')
+    if '+' in string:
+        string = string.replace('+,', '+')
+    if 'more' in string:
+        string = string.replace('number more', 'no more')
     return string
 
 
+def normalize(string):
+    """Function to normalize Unicode to NFC, skipping strings that are already normalized"""
+    if string.isascii() or unicodedata.is_normalized('NFC', string):
+        return string
+    return unicodedata.normalize('NFC', string)
+
+
+def keep_characters(string, characters):
+    """Function to remove all characters from a string except those in a given set"""
+    return ''.join(filter(characters.__contains__, string))
+
+
+def only_characters(string, characters):
+    """Function to test whether a string consists only of characters in a given set"""
+    return set(string).issubset(characters)
+
+
 def clean_msg(string):
     """Function to clean punctuation and normalize Unicode in an Outlook .msg file"""
     if string is None or not string or string == '': return ''
     string = string.replace('"', '\\"').replace('\n', '')
-    string = re.sub(r'<[^>]+>', '', re.sub(r'[\u0000\ufffd]', '', string)).replace('&nbsp;', '')
+    string = RE_MARKUP_TAG.sub('', RE_NULL_CHARACTERS.sub('', string)).replace('&nbsp;', '')
     string = unicodedata.normalize('NFC', string)
     return string
 
@@ -105,7 +597,7 @@ def clean_search_string(string, escape=True):
     string = string.strip('!"£%^&*()_-+={}[]::@~#<,>.?/|\`¬ ').strip("' ")
     if escape:
         string = escape_regex_chars(string)
-        string = re.sub(r'[^\x00-\x7F]', '.*', string)
+        string = RE_NON_ASCII.sub('.*', string)
     return string
 
 
@@ -121,6 +613,14 @@ def escape_regex_chars(string):
 def check_brackets(string):
     """Function to check for inconsistent brackets"""
     string = quick_clean(string)
+    if not any(c in string for c in BRACKET_CHARACTERS):
+        # Only the repeated quick_clean() calls below can change the string,
+        # and they stop having any effect once it is stable
+        for i in range(3):
+            cleaned = quick_clean(string)
+            if cleaned == string: break
+            string = cleaned
+        return normalize(string).strip()
     for (oB, cB) in [('[', ']'), ('<', '>')]:
         while string.startswith(oB) and string.endswith(cB):
             string = quick_clean(string[1:-1])
@@ -138,10 +638,10 @@ def check_brackets(string):
     for (oB, cB) in BRACKETS:
         if oB in string and cB in string and string.index(cB) < string.index(oB):
             string = quick_clean(string.replace(cB, '').replace(oB, ''))
-    string = re.sub(r'\s*[)}>]\s*', ') ', re.sub(r'\s*[({<]\s*', ' (', string)).strip()
-    string = re.sub(r'\s*\]\s*', '] ', re.sub(r'\s*\[\s*', ' [', string)).strip()
+    string = RE_CLOSE_BRACKET.sub(') ', RE_OPEN_BRACKET.sub(' (', string)).strip()
+    string = RE_CLOSE_SQUARE_BRACKET.sub('] ', RE_OPEN_SQUARE_BRACKET.sub(' [', string)).strip()
     string = string.replace('()', '').replace('{}', '').replace('[]', '').replace('<>', '')
-    string = unicodedata.normalize('NFC', string).strip()
+    string = normalize(string).strip()
     return string
 
 
@@ -249,12 +749,12 @@ def normalize_dewey(string, escapes=False):
      for a Dewey classification, i.e. 3 digits, optionally followed by a
      decimal point then more digits."""
     if string is None or not string: return ''
-    string = re.sub(r'[^0-9.\[\]\-]', '', string).rstrip('.')
+    string = keep_characters(string, DEWEY_CHARACTERS).rstrip('.')
     if string == '': return ''
     integer, decimal = (string + '.').split('.', 1)
     if decimal != '':
         if escapes:
-            decimal = '/?\.' + re.sub(r'([0-9\]])(?![\]\-])', r'\1/?', decimal.rstrip('0')).rstrip('/?')
+            decimal = '/?\.' + RE_DEWEY_DIGIT.sub(r'\1/?', decimal.rstrip('0')).rstrip('/?')
         else:
             integer = ('000' + integer)[-3:]
             decimal = '.' + decimal.replace('.', '').rstrip('0')
@@ -288,24 +788,24 @@ def isbn_13_check_digit(twelve_digits):
 
 def isbn_10_check_structure(isbn10):
     """Function to check the structure of a 10-digit ISBN"""
-    return True if re.match(RE_ISBN10, isbn10) else False
+    return True if RE_ISBN10.match(isbn10) else False
 
 
 def isbn_13_check_structure(isbn13):
     """Function to check the structure of a 13-digit ISBN"""
-    return True if re.match(RE_ISBN13, isbn13) else False
+    return True if RE_ISBN13.match(isbn13) else False
 
 
 def is_isbn_10(isbn10):
     """Function to validate a 10-digit ISBN"""
-    isbn10 = re.sub(r'[^0-9X]', '', isbn10.replace('x', 'X'))
+    isbn10 = keep_characters(isbn10.replace('x', 'X'), STANDARD_NUMBER_CHARACTERS)
     if len(isbn10) != 10: return False
     return False if isbn_10_check_digit(isbn10[:-1]) != isbn10[-1] else True
 
 
 def is_isbn_13(isbn13):
     """Function to validate a 13-digit ISBN"""
-    isbn13 = re.sub(r'[^0-9X]', '', isbn13.replace('x', 'X'))
+    isbn13 = keep_characters(isbn13.replace('x', 'X'), STANDARD_NUMBER_CHARACTERS)
     if len(isbn13) != 13: return False
     if isbn13[0:3] not in ('978', '979'): return False
     return False if isbn_13_check_digit(isbn13[:-1]) != isbn13[-1] else True
@@ -374,132 +874,107 @@ def repair_accents_in_place_names(string):
 # FUNCTIONS TO GET PARTS OF NAMES, TOPICS ETC
 
 
+def numeric_date_to_text(match):
+    """Function to rewrite a dd.mm.yyyy date matched by RE_NUMERIC_DATE with the month as a word"""
+    return ' {} {} {} '.format(match.group(1), MONTH_NAMES[int(match.group(2))], match.group(3))
+
+
+@functools.lru_cache(maxsize=4096)
 def clean_for_date_parse(string):
     if string == '': return ''
     string = string.lower()
     # remove leading zeros from numbers
-    string = re.sub(r'\s+0+(?=[1-9])', ' ', string)
+    string = RE_LEADING_ZEROS.sub(' ', string)
     # replace ' as year abbreviation
-    string = re.sub(r"'([0-9]{2})(?![0-9])", r"19\1", string)
-
+    string = RE_YEAR_ABBREVIATION.sub(r"19\1", string)
     # replace numerically formatted dates
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?1[.]([12][0-9]{3})(?![0-9])', r' \1 january \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?2[.]([12][0-9]{3})(?![0-9])', r' \1 february \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?3[.]([12][0-9]{3})(?![0-9])', r' \1 march \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?4[.]([12][0-9]{3})(?![0-9])', r' \1 april \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?5[.]([12][0-9]{3})(?![0-9])', r' \1 may \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?6[.]([12][0-9]{3})(?![0-9])', r' \1 june \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?7[.]([12][0-9]{3})(?![0-9])', r' \1 july \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?8[.]([12][0-9]{3})(?![0-9])', r' \1 august \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]0?9[.]([12][0-9]{3})(?![0-9])', r' \1 september \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]10[.]([12][0-9]{3})(?![0-9])', r' \1 october \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]11[.]([12][0-9]{3})(?![0-9])', r' \1 november \2 ', string)
-    string = re.sub(r'(?<![0-9])([0-9][0-9]?)[.]12[.]([12][0-9]{3})(?![0-9])', r' \1 december \2 ', string)
-
+    if '.' in string:
+        string = RE_NUMERIC_DATE.sub(numeric_date_to_text, string)
     string = quick_clean(string)
     return string
 
 
+# The parse_* functions take a string that has already been through clean_for_date_parse()
+
+
+def parse_year(string, defaultyear=''):
+    """Function to get the last year from a parsed date string"""
+    yearlist = RE_YEAR_POST_1500.findall(string)
+    if yearlist: return yearlist[-1]
+    return defaultyear
+
+
+def parse_month(string):
+    """Function to get the month or season from a parsed date string"""
+    found = MONTH_KEYWORDS.findall(string)
+    if not found: return ''
+    for (month, keywords) in MONTHS:
+        if month == 'December' and 'dec' in found and 'dechreuodd' not in found:
+            return month
+        if found.intersection(keywords):
+            return month
+    return ''
+
+
+def parse_date(string):
+    """Function to get the day (or range of days) from a parsed date string"""
+    match = RE_DATE_1.search(string)
+    if match is not None:
+        return match.group(2).strip('/').replace('/', '-')
+    match = RE_DATE_2.search(string)
+    if match is not None:
+        return match.group(1).strip('/').replace('/', '-')
+    return ''
+
+
+def parse_enumeration(string, regex):
+    """Function to get a volume, issue or number from a parsed date string"""
+    match = regex.search(string)
+    if match is not None:
+        return match.group(2)
+    return ''
+
+
 def get_year(string, defaultyear=''):
     if string == '': return ''
-    year = ''
-    string = clean_for_date_parse(string)
-
-    if RE_YEAR_POST_1500.search(string) is not None:
-        yearlist = RE_YEAR_POST_1500.findall(string)
-        year = RE_YEAR_POST_1500.search(yearlist[-1]).group(1)
-    if year == '' and defaultyear != '': return defaultyear
-    return year
+    return parse_year(clean_for_date_parse(string), defaultyear)
 
 
 def get_month(string):
     if string == '': return ''
-    string = clean_for_date_parse(string)
-
-    if any(s in string for s in ['jan', 'enero', 'ionawr', 'ocak', 'stycz']):
-        return 'January'
-    if any(s in string for s in ['feb', 'chwe', 'fev']):
-        return 'February'
-    if any(s in string for s in ['mar', 'mawrth', u'mu\0072rz']):
-        return 'March'
-    if any(s in string for s in ['apr', 'avr', 'ebrill', 'kwie']):
-        return 'April'
-    if any(s in string for s in ['may', 'mai', 'mai︠a︡', 'maj']):
-        return 'May'
-    if any(s in string for s in ['jun', 'czerw', 'ii︠u︡ni︠a︡', 'ioun', 'juin', 'meh']):
-        return 'June'
-    if any(s in string for s in ['jul', 'gorff', 'juil']):
-        return 'July'
-    if any(s in string for s in ['aug', 'agosto', 'août', 'awst', 'sierp']):
-        return 'August'
-    if any(s in string for s in ['sep', 'medi', 'rugsėjo', 'wrzes']):
-        return 'September'
-    if any(s in string for s in ['oct', 'hydref', 'pazdzier']):
-        return 'October'
-    if any(s in string for s in ['nov', 'listopad', 'tachw']):
-        return 'November'
-    if ('dec' in string and 'dechreuodd' not in string) or any(s in string for s in ['dek', 'grudz', 'rhagfyr']):
-        return 'December'
-    if any(s in string for s in ['spring', 'gwanwyn']):
-        return 'Spring'
-    if any(s in string for s in ['summer', 'yr haf']):
-        return 'Summer'
-    if any(s in string for s in ['autumn']):
-        return 'Autumn'
-    if any(s in string for s in ['winter', 'gaeaf']):
-        return 'Winter'
-    return ''
+    return parse_month(clean_for_date_parse(string))
 
 
 def get_date(string):
     if string == '': return ''
-    date = ''
-    string = clean_for_date_parse(string)
-
-    if RE_DATE_1.search(string) is not None:
-        date = str(RE_DATE_1.search(string).group(2)).strip('/')
-    elif RE_DATE_2.search(string) is not None:
-        date = str(RE_DATE_2.search(string).group(1)).strip('/')
-    date = date.replace('/', '-')
-    return date
+    return parse_date(clean_for_date_parse(string))
 
 
 def get_volume(string):
     if string == '': return ''
-    volume = ''
-    string = clean_for_date_parse(string)
-    if RE_VOLUME.search(string) is not None:
-        volume = str(RE_VOLUME.search(string).group(2))
-    return volume
+    return parse_enumeration(clean_for_date_parse(string), RE_VOLUME)
 
 
 def get_issue(string):
     if string == '': return ''
-    issue = ''
-    string = clean_for_date_parse(string)
-    if RE_ISSUE.search(string) is not None:
-        issue = str(RE_ISSUE.search(string).group(2))
-    return issue
+    return parse_enumeration(clean_for_date_parse(string), RE_ISSUE)
 
 
 def get_number(string):
     if string == '': return ''
-    number = ''
-    string = clean_for_date_parse(string)
-    if RE_NUMBER.search(string) is not None:
-        number = str(RE_NUMBER.search(string).group(2))
-    return number
+    return parse_enumeration(clean_for_date_parse(string), RE_NUMBER)
 
 
 def get_date_parts(string, defaultyear=''):
     if string is None or not string or string == '': return '', '', '', '', '', ''
 
-    year = get_year(string, defaultyear)
-    month = get_month(string)
-    date = get_date(string)
-    volume = get_volume(string)
-    issue = get_issue(string)
-    number = get_number(string)
+    string = clean_for_date_parse(string)
+    year = parse_year(string, defaultyear)
+    month = parse_month(string)
+    date = parse_date(string)
+    volume = parse_enumeration(string, RE_VOLUME)
+    issue = parse_enumeration(string, RE_ISSUE)
+    number = parse_enumeration(string, RE_NUMBER)
 
     return year, month, date, volume, issue, number
 
@@ -524,11 +999,11 @@ def get_date_range(string, default_start_year='', default_end_year=''):
     string = string.replace('-', ' FROM ; TO ')
     string = string.replace(' to ', ' TO ')
     string = string.replace(' from ', ' FROM ')
-    string = re.sub(r'(began|commence|launch|start)[ed]*\s*(at|in|with)?', ' ; FROM ', string, flags=re.IGNORECASE)
-    string = re.sub(r'(cease|end|finish)[ed]*\s*(with|in|on)?', ' ; TO ', string, flags=re.IGNORECASE)
+    string = RE_RANGE_START.sub(' ; FROM ', string)
+    string = RE_RANGE_END.sub(' ; TO ', string)
     start, end, full = '', '', ''
     for sub_range in string.split(';'):
-        if re.sub(r'[^0-9]', '', sub_range) != '':
+        if RE_DIGIT.search(sub_range) is not None:
             if ' FROM ' in sub_range:
                 start = get_date_parts_as_string(sub_range, default_start_year)
             elif ' TO ' in sub_range:
@@ -546,80 +1021,30 @@ def get_frequency(string):
     string = remove_brackets(string.lower())
 
     # Remove anything in brackets
-    string = re.sub(r'\([^)]*\)', '', string).replace(' and ', ' & ')
+    string = RE_BRACKETED_TEXT.sub('', string).replace(' and ', ' & ')
 
     # Replace text with numbers
-    string = re.sub(r'(?<![a-z])twenty-*four(?![a-z])', '24', string)
-    string = re.sub(r'(?<![a-z])one(?![a-z])', '1', string)
-    string = re.sub(r'(?<![a-z])two(?![a-z])', '2', string)
-    string = re.sub(r'(?<![a-z])three(?![a-z])', '3', string)
-    string = re.sub(r'(?<![a-z])four(?![a-z])', '4', string)
-    string = re.sub(r'(?<![a-z])five(?![a-z])', '5', string)
-    string = re.sub(r'(?<![a-z])six(?![a-z])', '6', string)
-    string = re.sub(r'(?<![a-z])seven(?![a-z])', '7', string)
-    string = re.sub(r'(?<![a-z])eight(?![a-z])', '8', string)
-    string = re.sub(r'(?<![a-z])nine(?![a-z])', '9', string)
-    string = re.sub(r'(?<![a-z])ten(?![a-z])', '10', string)
-    string = re.sub(r'(?<![a-z])eleven(?![a-z])', '11', string)
-    string = re.sub(r'(?<![a-z])twelve(?![a-z])', '12', string)
+    for (regex, number) in NUMBER_WORDS:
+        string = regex.sub(number, string)
+
+    found = FREQUENCY_KEYWORDS.findall(string)
 
     # Test if the string starts with a number and ends with 'year'
-    if ' ' in string and is_number(string.split(' ')[0]) and any(
-                    s in string for s in ['year', 'annual', 'annum', 'annuel']):
+    if ' ' in string and is_number(string.split(' ')[0]) and found & YEAR_WORDS:
         if string.split(' ')[0] == '2': return 'Semi-annual'
         if string.split(' ')[0] == '3': return 'Tri-annual'
         string = string.split(' ')[0] + ' times a year'
         string = quick_clean(string)
         return string
 
-    if any(s in string for s in ['daily']):
-        if any(s in string for s in ['monday to friday', 'except saturday & sunday']):
-            return 'Daily (except Saturday & Sunday)'
-        if any(s in string for s in ['monday to saturday', 'except sunday']):
-            return 'Daily (except Sunday)'
-        if any(s in string for s in ['except monday']):
-            return 'Daily (except Monday)'
+    if 'daily' in found:
+        for (frequency, keywords) in DAILY_EXCEPTIONS:
+            if found & keywords:
+                return frequency
         return 'Daily'
-    if any(s in string for s in ['3', 'three', 'tri-', 'triweek', 'thrice']) and 'week' in string:
-        return 'Tri-weekly'
-    if any(s in string for s in ['2', 'two', 'twice', 'semi']) and 'week' in string:
-        return 'Semi-weekly'
-    if any(s in string for s in ['biweekl', 'bi-weekl']):
-        return 'Bi-weekly'
-    if any(s in string for s in ['wythnosol', 'weekl', 'weeky']):
-        return 'Weekly'
-    if any(s in string for s in ['fortnight']):
-        return 'Fortnightly'
-    if any(s in string for s in ['3', 'three', 'tri-', 'trimonth', 'thrice']) and 'month' in string:
-        return 'Tri-monthly'
-    if any(s in string for s in ['2', 'two', 'twice', 'semi']) and 'month' in string:
-        return 'Semi-monthly'
-    if any(s in string for s in ['bi-month', 'bimonth', 'bi-a month']):
-        return 'Bi-monthly'
-    if any(s in string for s in ['monthly']):
-        return 'Monthly'
-    if any(s in string for s in ['quarter']):
-        return 'Quarterly'
-    if any(s in string for s in ['3', 'three', 'tri-', 'triannu', 'thrice']) and any(
-                    s in string for s in ['year', 'annual', 'annum', 'annuel']):
-        return 'Tri-annual'
-    if any(s in string for s in ['2', 'two', 'twice', 'semi']) and any(
-                    s in string for s in ['year', 'annual', 'annum', 'annuel']):
-        return 'Semi-annual'
-    if any(s in string for s in ['annual', 'annuel']):
-        return 'Annual'
-    if any(s in string for s in ['biennial', 'bi-ennial', 'biannual', 'bi-annual', 'bienal']):
-        return 'Biennial'
-    if any(s in string for s in ['triennial', 'tri-ennial']):
-        return 'Triennial'
-    if 'quadrennial' in string:
-        return 'Quadrennial'
-    if 'quinquennial' in string:
-        return 'Quinquennial'
-    if 'irregul' in string:
-        return 'Irregular'
-    if 'varies' in string:
-        return 'Frequency varies'
+    for (frequency, keywords, required) in FREQUENCIES:
+        if found & keywords and (required is None or found & required):
+            return frequency
 
     return ''
 
@@ -633,17 +1058,17 @@ def get_holdings_years(string, startyear='', endyear=''):
     string = RE_NUMBER.sub('', string)
 
     # check if section contains a year number
-    if RE_YEAR_POST_1500.search(string) is not None:
-        yearlist = RE_YEAR_POST_1500.findall(string)
+    yearlist = RE_YEAR_POST_1500.findall(string)
+    if yearlist:
         y = []
         for item in yearlist:
             if not (startyear != '' and int(item) < int(startyear)) and not (endyear != '' and int(item) > int(endyear)):
                 y.append(item)
         if len(y) > 0:
-            start, end = sorted(y)[0], sorted(y)[-1]
+            start, end = min(y), max(y)
 
         # remove everything other than numbers, hyphens, semi-colons and square brackets
-        string = re.sub(r'[^0-9\-]', '', string).strip()
+        string = keep_characters(string, NUMERIC_RANGE_CHARACTERS).strip()
 
         if string[-1] in '-': end = 'Continuing'
 
@@ -665,12 +1090,13 @@ def get_name_parts(field):
             # Remove brackets
             if code in ['a', 'c']: content = remove_brackets(content)
             # Test if name part contains a relator term
-            if code == 'c' and get_relators(content):
-                role = role.union(get_relators(content))
+            if code == 'c':
+                relators_found = get_relators(content)
+                if relators_found: role = role.union(relators_found)
             # Test if name part contains dates
             elif code in ['c', 'f', 'g', 'n', 'p'] and content.lower().startswith(('fl.', 'b.', 'd.')):
                 content = clean_name_dates(content)
-                if re.sub(r'[^0-9]', '', content) != '': dates = content
+                if keep_characters(content, DIGITS) != '': dates = content
             else:
                 if code == 'c': content = clean_words_associated_with_name(content)
                 name = add_string(content, name, ', ').replace(', (', ' (')
@@ -680,7 +1106,7 @@ def get_name_parts(field):
     # Check brackets
     name = remove_brackets(check_brackets(name))
     # Replace missing full stops after initials
-    name = re.sub(r'([\s.\-][A-Z])([,\s]|$)', r'\1.\2', name)
+    name = RE_INITIAL.sub(r'\1.\2', name)
 
     # Dates
     for subfield in field.get_subfields('d'):
@@ -697,13 +1123,14 @@ def get_name_parts(field):
 
     # Role
     for subfield in field.get_subfields('e'):
-        if get_relators(subfield):
-            role = role.union(get_relators(subfield))
+        relators_found = get_relators(subfield)
+        if relators_found:
+            role = role.union(relators_found)
 
     # ISNI
     # VIAF
     for subfield in field.get_subfields('8', '9', cleaning=False):
-        subfield = re.sub(r'\s+', ' ', subfield.replace('|', '')).strip()
+        subfield = RE_WHITESPACE.sub(' ', subfield.replace('|', '')).strip()
         if 'http://isni.org/isni/' in subfield:
             isni.add(subfield)
         elif 'http://viaf.org/viaf/' in subfield:
@@ -735,7 +1162,7 @@ def get_series_parts(field):
 
     for subfield in field.get_subfields('v'):
         subfield = clean_490_number(subfield)
-        if re.sub(r'[^0-9]', '', subfield) != '':
+        if keep_characters(subfield, DIGITS) != '':
             number = add_string(subfield, number, ' ')
 
     return title, number
@@ -744,7 +1171,7 @@ def get_series_parts(field):
 def get_relators(string):
     if string == '': return False
     rels = set()
-    for substring in re.split(r'[,:;]| and ', string):
+    for substring in RE_RELATOR_SEPARATOR.split(string):
         substring = quick_clean(substring)
         if len(substring) > 0:
             if len(substring) == 3:
@@ -771,17 +1198,17 @@ def get_topic_parts(field):
             content = remove_brackets(content)
             # Replace missing full stops after initials
             if field.tag == '600' and code == 'a':
-                content = re.sub(r'([\s.\-][A-Z])([,\s]|$)', r'\1.\2', content)
+                content = RE_INITIAL.sub(r'\1.\2', content)
             term = add_string(content, term, '--')
         elif code in ['c', 'd', 'e', 'n', 'q']:
             content = content.replace('B.C', 'B.C.').replace('A.D', 'A.D.').replace('..', '.')
             term = add_string(content, term, ', ' if code in ['c', 'd', 'n'] else ' ')
 
     term = repair_accents_in_place_names(term)
-    term = re.sub(r'[$][a-z\s]', '--', term).replace('----', '--')
+    term = RE_SUBFIELD_MARKER.sub('--', term).replace('----', '--')
 
     # Type
-    if re.sub(r'[^0-9-]', '', term) == term:
+    if only_characters(term, NUMERIC_RANGE_CHARACTERS):
         ttype = 'chronological term'
     else:
         try:
@@ -809,21 +1236,11 @@ def expand_abbreviations(string, plurals=True, case=True):
     if string == '': return ''
 
     # Expand abbreviations which span more than one word
-    string = re.sub(r'(?<![a-z])n\.*\s*s(er)?\.*(?![a-z])', 'new series', string, flags=re.IGNORECASE)
-    # French
-    string = re.sub(r' et augm(ent)?(?![a-z])\.*', u' et augment\u00e9e', string, flags=re.IGNORECASE)
-    string = re.sub(r' et corr(ig)?(?![a-z])\.*', u' et corrig\u00e9e', string, flags=re.IGNORECASE)
-    string = re.sub(r'corr(ig)?(\u00e9e)?\.* et ', u'corrig\u00e9e et ', string, flags=re.IGNORECASE)
-    string = re.sub(r'r(ev)?\.* et ', 'revue et ', string, flags=re.IGNORECASE)
-    # German
-    string = re.sub(r'(?<![a-z])n\.*\s*f\.*(?![a-z])', 'neue Folge', string, flags=re.IGNORECASE)
-    # Italian
-    string = re.sub(r'nuova ser(?![a-z])', 'nuova serie', string, flags=re.IGNORECASE)
-    # Spanish
-    string = re.sub(r'correg\.*\s*y\s*aum\.*', 'corregida y aumentada', string, flags=re.IGNORECASE)
+    for (regex, expansion) in MULTI_WORD_ABBREVIATIONS:
+        string = regex.sub(expansion, string)
 
     # Expand single-word abbreviations
-    words = re.split('([\w\-]+\.*)', string)
+    words = RE_WORD.split(string)
     for i, word in enumerate(words):
         words[i] = mrx.Abbreviations().sub(words[i])
         if word != '' and case:
@@ -845,7 +1262,7 @@ def expand_place_abbreviations(string, ctrys=None):
     string = string.replace('$42blnpn', '').replace('42blnpn', '')
     string = mrx.PlaceNamesUK().sub(string)
     string = mrx.PlaceNamesUS().sub(string)
-    if countries:
+    if ctrys:
         if 'Australia' in ctrys:
             string = mrx.PlaceNamesAustralia().sub(string)
         if 'Brazil' in ctrys:
@@ -855,11 +1272,9 @@ def expand_place_abbreviations(string, ctrys=None):
         if 'New Zealand' in ctrys:
             string = mrx.PlaceNamesNewZealand().sub(string)
     string = mrx.PlaceNamesOther().sub(string)
-    string = re.sub(r'[nN]ew[\-\s]*[yY]ork\s*(\(?,?\s*(NY|New York|City)\)?)?', 'New York', string)
-    string = re.sub(r'(\bin the )?\bcounty of\b', '', string)
-    string = re.sub(
-        r'[,\s]+(U[\.\s]*K[\.\s]*|U[\.\s]*S[\.\s]*A*[\.\s]*|United\s*Kingdom|United\s*States(\s*of\s*America)?)\s*$',
-        '', string, flags=re.IGNORECASE)
+    string = RE_NEW_YORK.sub('New York', string)
+    string = RE_COUNTY_OF.sub('', string)
+    string = RE_TRAILING_UK_US.sub('', string)
     string = string.replace('Saint Christopher - Nevis', 'Saint Kitts-Nevis')
     string = quick_clean(string).strip('?')
     return string
@@ -874,41 +1289,31 @@ def clean_250(string):
         return ''
 
     # Remove characters that aren't needed
-    string = quick_clean(re.sub(r'\s*[:;\]\/]+', ',', re.sub(r'[\[<>{}*]', '', string)))
+    string = quick_clean(RE_250_SEPARATORS.sub(',', RE_250_UNWANTED_CHARACTERS.sub('', string)))
     # Replace & with and
-    string = quick_clean(re.sub(r'\s*&[aceimst\/]{1,3}\.*\s*', ' et cetera ', string, flags=re.IGNORECASE))
+    string = quick_clean(RE_250_ET_CETERA.sub(' et cetera ', string))
     if string.lower().endswith(' et cetera'): string = quick_clean(string[:-10])
     string = string.replace('&', ' and ')
     # Remove 'the' from start of string
-    string = re.sub(r'^the\s+', '', string, flags=re.IGNORECASE)
+    string = RE_LEADING_THE.sub('', string)
     # Replace ellipsis with comma
-    string = re.sub(r'\s*\.\.\.+\s*', ', ', string)
+    string = RE_ELLIPSIS.sub(', ', string)
     # Add space between numbers and letters
-    string = re.sub(r'[\s,]+i\.*\s*e[\.\s]+', ', that is ', string, flags=re.IGNORECASE)
+    string = RE_THAT_IS.sub(', that is ', string)
     string = string.replace('U.K.', 'UK')
-    string = re.sub(r'([a-z])\.*([0-9])', r'\1 \2', string)
-    string = re.sub(r'([a-z])\.+([a-z])', r'\1. \2', string)
+    string = RE_LETTER_STOP_DIGIT.sub(r'\1 \2', string)
+    string = RE_LETTER_STOP_LETTER.sub(r'\1. \2', string)
 
     # Known spelling mistakes
-    string = re.sub(r'new[.,]+\s*ed', r'new ed', string, flags=re.IGNORECASE)
+    string = RE_NEW_EDITION.sub(r'new ed', string)
     string = string.replace('Reprograf. Nachdr. d.', 'Reprografischen Nachdruck der')
-    string = re.sub(r'(?<![a-z])stere?o-*(typed)?[\.\s]+', 'stereotyped ', string, flags=re.IGNORECASE)
+    string = RE_STEREOTYPED.sub('stereotyped ', string)
     string = string.replace('Unifrom', 'Uniform')
 
     string = quick_clean(string)
 
-    string = re.sub(r'(?<=[0-9])(th| )ed(ition)?\.*', 'th edition', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![01])1(st[.,]*|\s*a[.,\s]+)\s*', '1st ', string, flags=re.IGNORECASE)
-    string = re.sub(r'^([0-9]{0,2}1)[.][.,]*\s*', r'\1st ', string, flags=re.IGNORECASE)
-    string = re.sub(r'2((nd|gn)[.,\s]+|[ad](?![a-z])[.,]*)\s*', '2nd ', string, flags=re.IGNORECASE)
-    string = re.sub(r'^([0-9]{0,2}2)[.][.,]*\s*', r'\1nd ', string, flags=re.IGNORECASE)
-    string = re.sub(r'3(rd[.,]|\s*(am|rda|te|[ad])(?![a-z])[.,]*)\s*', '3rd ', string, flags=re.IGNORECASE)
-    string = re.sub(r'^([0-9]{0,2}3)[.][.,]*\s*', r'\1rd ', string, flags=re.IGNORECASE)
-    string = re.sub(r'([4-9])(th[.,]|\s*the(?![a-z])[.,]*)\s*', r'\1th ', string, flags=re.IGNORECASE)
-    string = re.sub(r'^([0-9]{0,2}4-9])[.][.,]*\s*', r'\1th ', string, flags=re.IGNORECASE)
-    string = re.sub(r'^([0-9]{1,3})\.', r'\1th ', string, flags=re.IGNORECASE)
-    string = re.sub(r'([0-9])(st|gn|nd|rd|th)(?![a-z])[.,]\s*', r'\1\2 ', string, flags=re.IGNORECASE)
-    string = re.sub(r'([0-9])-?o?e(?![a-z])[.,]*\s*', r'\1e ', string, flags=re.IGNORECASE)
+    for (regex, ordinal) in EDITION_ORDINALS:
+        string = regex.sub(ordinal, string)
     string = expand_abbreviations(string)
     words = ('a', 'another', 'augmented', 'by', 'complete', 'critical',
              'edition', 'edited', 'editor', 'editors',
@@ -925,19 +1330,19 @@ def clean_250(string):
 def clean_26X(string):
     if string == '': return ''
     # Remove rubbish values
-    if any(s in string.lower() for s in ['not identified', 'not indentified']): return ''
+    if NOT_IDENTIFIED.search(string): return ''
     string = quick_clean(string)
     if string.lower() in 'b.i. b. i. bi b i b.m. b. m. bm b m s.n. s. n. sn s n s.l. s. l. sl s l s.i. si s i nv n.v. n. v. n v np n.p. n. p. n p anno domini imprinted in the year': return ''
     # Remove brackets
     if len(string) >= 3: remove_brackets(string)
     # Remove information about pagination and volume numbers
-    string = quick_clean(re.sub(r'^((ff|p(p|ages?)|vol)[.\s]+[0-9,.\-\sivxfp\[\]]+\b\s*|[0-9,.\-\sivxfp\[\]]+\b\s*p(p|ages?))', '', string))
+    string = quick_clean(RE_26X_PAGINATION.sub('', string))
     # Remove information about size
-    string = quick_clean(re.sub(r'\s*\b[0-9]+\s*cm[.\s]*$', '', string))
+    string = quick_clean(RE_26X_SIZE.sub('', string))
     # Remove known problems from the start of the string
-    string = quick_clean(re.sub(r'^(at\s+|a paris)(?!press)', '', string))
+    string = quick_clean(RE_26X_AT.sub('', string))
     # Remove known problems from the end of the string
-    string = quick_clean(re.sub(r'\s+(etc|anno)$', '', string))
+    string = quick_clean(RE_26X_ET_CETERA.sub('', string))
     return string
 
 
@@ -947,28 +1352,28 @@ def clean_300(field):
     for subfield in field:
         code, content = subfield[0], clean(subfield[1].lower())
         if code in ['a', 'b', 'c', 'e', 'f', 'g', '3'] and content not in ['cm', 'p. cm'] \
-                and not (any(s in content for s in ['jaggard', 'london', 'macmillan'])):
+                and not PUBLISHERS_IN_300.search(content):
             sub_desc = ''
             # Remove characters that aren't needed
-            content = re.sub(r'[:;]+', ',', re.sub(r'[\[\]<>{}*]', '', content))
+            content = RE_300_SEPARATORS.sub(',', RE_300_UNWANTED_CHARACTERS.sub('', content))
             # Replace & with and
-            content = re.sub(r'\s*&[aceimsts\/]{1,3}\.*\s*', ' et cetera ', content)
+            content = RE_300_ET_CETERA.sub(' et cetera ', content)
             content = content.replace('&', ' and ')
             # Replace combining ring above (u030a) masculine ordinal indicator (u00ba) and superscript zero (u2070) with degree (u00b0)
-            content = re.sub(u'[.\s]*[\u030a\u00ba\u2070\u00b0]+m*', u'\u00b0', content)
-            content = re.sub(u'(?<=[0-9])\s*(mo|o|to|vo)(?![a-z])', u'\u00b0', content)
+            content = RE_DEGREE_SIGN.sub(u'\u00b0', content)
+            content = RE_FORMAT_ABBREVIATION.sub(u'\u00b0', content)
             # Add space between numbers and letters
             content = content.replace('i.e.', ', that is ')
-            content = re.sub(r'([0-9])([a-z])', r'\1 \2', content)
-            content = re.sub(r'([a-z])([0-9])', r'\1 \2', content)
+            content = RE_DIGIT_LETTER.sub(r'\1 \2', content)
+            content = RE_LETTER_DIGIT.sub(r'\1 \2', content)
             # Add space after full stops after letters
-            content = re.sub(r'([a-z])\.', r'\1. ', content)
+            content = RE_LETTER_STOP.sub(r'\1. ', content)
             # Check space around brackets, commas and hyphens
-            content = re.sub(r'\s*-\s*', '-', re.sub(r'\s*,\s*', ', ', re.sub(r'\s*\)\s*', ') ', re.sub(r'\s*\(\s*', ' (', content))))
+            content = RE_SPACED_HYPHEN.sub('-', RE_SPACED_COMMA.sub(', ', RE_SPACED_CLOSE_PARENTHESIS.sub(') ', RE_SPACED_OPEN_PARENTHESIS.sub(' (', content))))
             content = content.replace('front.', 'frontispiece')
-            content = re.sub(r'b(lack)?\.*\s*(and)?/*\s*w(hite)?\.*', 'black and white', content)
+            content = RE_BLACK_AND_WHITE.sub('black and white', content)
             # Split into words
-            for item in re.split(r'\s+', content):
+            for item in RE_WHITESPACE.split(content):
                 oB, cB, cP = '', '', ''
                 if item.endswith(','): cP = ','
                 item = quick_clean(item)
@@ -985,29 +1390,29 @@ def clean_300(field):
                     item = 'DVD'
                 elif item == 'ill':
                     item = 'illustrations'
-                elif not re.fullmatch(RE_NUMERAL, item):
+                elif not RE_NUMERAL.fullmatch(item):
                     item = quick_clean(mrx.Abbreviations().sub(item))
                 sub_desc += ' ' + oB + item + cB + cP
             # If pages appears before numeration, move it afterwards
-            sub_desc = re.sub(r'^\s*pages ([0-9\-]+),*', r'\1 pages,', sub_desc)
+            sub_desc = RE_PAGES_BEFORE_NUMBER.sub(r'\1 pages,', sub_desc)
             description = add_string(quick_clean(sub_desc), description, ', ')
     description = quick_clean(description)
     # Final cleaning
-    description = re.sub(r'(?<![0-9])1 ([a-z]+[a-tv-z])s(?![a-z])', r'1 \1', description)
+    description = RE_SINGLE_PLURAL.sub(r'1 \1', description)
     description = description.replace(', and', ' and').replace(', (', ' (').replace(', of ', ' of ')
     description = description.replace('compact disc', 'CD')
-    description = re.sub(r'4\s*((sup)?\s*3/(sub)?\s*4|\.75)', '4 3/4', description)
+    description = RE_FOUR_THREE_QUARTERS.sub('4 3/4', description)
     description = description.replace('en colour', '(colour)')
     description = description.replace('some of which are in colour', '(some colour)')
     description = description.replace('general table', 'genealogical table')
     description = description.replace('loose leaf', 'loose-leaf')
     description = description.replace('min score', 'miniature score')
-    description = re.sub(r'(?<![a-z])n s(?![a-z])', 'new series', description)
+    description = RE_NEW_SERIES.sub('new series', description)
     description = description.replace('no pagination provided', '(unpaged)')
     description = description.replace('volume unpaged', 'volume (unpaged)')
     description = description.replace('wood engraved', 'wood engravings')
-    description = re.sub(r'(?<![a-z])s sheet', 'single sheet', description)
-    description = re.sub(r' (illustrations|maps) \((colour|black and white)\)', r' \2 \1', description)
+    description = RE_SINGLE_SHEET.sub('single sheet', description)
+    description = RE_COLOUR_ILLUSTRATIONS.sub(r' \2 \1', description)
 
     if len(description) < 5: return ''
     description = quick_clean(description)
@@ -1038,7 +1443,7 @@ def clean_362(field, start_year='', end_year=''):
 def clean_490(string):
     if string == '': return ''
     string = quick_clean(string.lstrip('$.,:;/\-[])} ').rstrip('.,:;/\-[]({ '))
-    string = clean(re.sub(r'bibl\.*[\s]*pp?\.*[0-9\-]+$', '', string))
+    string = clean(RE_490_BIBLIOGRAPHY.sub('', string))
     if len(string) >= 3:
         string = remove_brackets(string)
     string = expand_abbreviations(string)
@@ -1047,18 +1452,18 @@ def clean_490(string):
 
 def clean_490_number(string):
     if string == '': return ''
-    string = re.sub(r'(?<![a-z])u[.\s]*p[.\s]*(?![a-z])', 'UP', string, flags=re.IGNORECASE)
+    string = RE_490_UNPAGED.sub('UP', string)
     string = expand_abbreviations(string, plurals=False, case=False)
-    string = re.sub(r'^t[.\s]+', 'tome ', string, flags=re.IGNORECASE)
-    string = re.sub(r'^n[.\s]+', 'number ', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])v[.\s]+', 'volume ', string, flags=re.IGNORECASE)
+    string = RE_490_TOME.sub('tome ', string)
+    string = RE_490_NUMBER.sub('number ', string)
+    string = RE_490_VOLUME.sub('volume ', string)
     # Remove space around hyphens
-    string = re.sub(r'\s*-\s*', '-', string)
+    string = RE_SPACED_HYPHEN.sub('-', string)
     # Space between letters and numbers
-    string = re.sub(r'([0-9])([a-z])', r'\1 \2', string)
-    string = re.sub(r'([a-z])([0-9])', r'\1 \2', string)
+    string = RE_DIGIT_LETTER.sub(r'\1 \2', string)
+    string = RE_LETTER_DIGIT.sub(r'\1 \2', string)
     # Replace full stop between parts of numbers with comma
-    string = re.sub(r'([0-9])\.\s+([a-z])', r'\1, \2', string)
+    string = RE_DIGIT_STOP_LETTER.sub(r'\1, \2', string)
     string = quick_clean(string)
     return string
 
@@ -1067,7 +1472,7 @@ def clean_500(string):
     if string.lower() in ['formerly cip', 'formerley cip']: return ''
     string = expand_abbreviations(string, plurals=False, case=False)
     # string = string.replace(' ed.', ' edition ').replace('edition  ', 'edition ')
-    string = re.sub(r'(?<![a-z])[sS]ig\.?(?![a-z])', 'signatures', string)
+    string = RE_SIGNATURES.sub('signatures', string)
     string = quick_clean(string)
     return string
 
@@ -1076,17 +1481,13 @@ def clean_510(string):
     string = string.replace(' ed.', ' edition').replace('edition  ', 'edition ')
     string = string.replace(' bibl p', ' bibliography p')
     string = string.replace(' vol.', ' volume')
-    string = re.sub(r'[cC][dD]-*[rR][oO][mM]', 'cd-rom', string)
+    string = RE_CD_ROM.sub('cd-rom', string)
     string = quick_clean(string)
     return string
 
 
 def clean_852(string):
-    if any(s in string.lower() for s in
-           ['available', 'availalbe', 'british museum', 'catalog', 'classmark', 'customer service', 'discard',
-            'holding', 'impression', 'lacking', 'libraries', 'not found', 'on order', 'pending', 'pressmark',
-            'shelmark', 'shelfmrk', 'shelfmark', 'shelfmrak', 'smk', 'spacer', 'stained', 'superseded',
-            'test', 'tightly bound', 'unavailable']):
+    if NOT_SHELFMARKS.search(string):
         return ''
     string = string.replace('?', '').replace('for hard copy', '')
     if string.lower() in 'conf id conf index post id conf index eld digital store':
@@ -1095,7 +1496,7 @@ def clean_852(string):
 
 
 def clean_genre(string):
-    string = re.sub(r'[^a-z0-9\s]', '', string.lower())
+    string = RE_NOT_ALPHANUMERIC.sub('', string.lower())
     string = mrx.Genres().sub(string)
     return string
 
@@ -1106,34 +1507,8 @@ def clean_words_associated_with_name(string):
     if ' ' in string and string.lower().split(' ', 1)[0] in ['and']:
         return ''
     if ' ' not in string: string = string.lower()
-    # string = re.sub(r'(?<![a-z])[aA]uth?(o|eu)r','author',string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[bB]art\.*(?![a-z])', 'Baronet', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[bB]aron', 'Baron', string, flags=re.IGNORECASE)
-    # string = re.sub(r'(?<![a-z])[cC]ivil engineer','civil engineer',string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[cC]urate', 'curate', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[eE]arl', 'Earl', string, flags=re.IGNORECASE)
-    # string = re.sub(r'(?<![a-z])[eE]ditor','editor',string, flags=re.IGNORECASE)
-    # string = re.sub(r'(?<![a-z])[eE]d\.*(?![a-z])','editor',string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[eE]xpression', '', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[hH]on\.*(?![a-z])', 'Honourable', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[hH]ungarian', 'Hungarian', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[iI]ssui?ng [bB]ody', 'issuing body', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[lL]ady', 'Lady', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[lL]ord', 'Lord', string, flags=re.IGNORECASE)
-    # string = re.sub(r'(?<![a-z])[mM]athematics [tT]eacher','mathematics teacher',string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[mM]inister', 'minister', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[pP]reacher', 'preacher', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[mM]rs', 'Mrs', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[rR]ev\.*(?![a-z])', 'Reverend', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[rR]t\.*(?![a-z])', 'Right', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[sS]chool[\-\s]*master', 'schoolmaster', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[sS]ir', 'Sir', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[sS]tudent', 'student', string, flags=re.IGNORECASE)
-    # string = re.sub(r'(?<![a-z])[tT]eacher','teacher',string, flags=re.IGNORECASE)
-    # string = re.sub(r'(?<![a-z])[tT]r\.*(?![a-z])','translator',string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[vV]icar', 'vicar', string, flags=re.IGNORECASE)
-    string = re.sub(r'(?<![a-z])[vV]iscount', 'Viscount', string, flags=re.IGNORECASE)
-    # string = re.sub(r'(?<![a-z])[wW]riter','writer',string, flags=re.IGNORECASE)
+    for (regex, word) in NAME_WORDS:
+        string = regex.sub(word, string)
 
     string = string.replace(".'", "'").replace('.]', ']').replace(' and ', ', ').replace('Mrs.', 'Mrs').replace(
         'Of ', 'of ').replace('The ', 'the ')
@@ -1145,38 +1520,38 @@ def clean_words_associated_with_name(string):
 def clean_name_dates(string):
     string = string.strip().lstrip('.:,;/()[]! ').rstrip('.:,;/()[]! ').replace(';', ' ')
     # B.C. and A.D.
-    string = re.sub(r'B\.?C\.?', 'BC', string)
-    string = re.sub(r'A\.?D\.?', 'AD', string)
+    string = RE_BC.sub('BC', string)
+    string = RE_AD.sub('AD', string)
     # century
-    string = re.sub(r'cent(?!u)', 'century', string)
-    string = re.sub(r'([0-9]+) century', r'\1th century', string)
-    string = re.sub(r'([0-9]+)th\. century', r'\1th century', string)
-    string = re.sub(r'([0-9]+)-([0-9]+)th century', r'\1th century-\2th century', string)
-    string = re.sub(r'\(([0-9]+)th\.?\)', r'(\1th century)', string)
+    string = RE_CENT.sub('century', string)
+    string = RE_CENTURY.sub(r'\1th century', string)
+    string = RE_CENTURY_STOP.sub(r'\1th century', string)
+    string = RE_CENTURY_RANGE.sub(r'\1th century-\2th century', string)
+    string = RE_CENTURY_PARENTHESES.sub(r'(\1th century)', string)
     # approximately
-    string = re.sub(r'ca?[.,]*\s*([0-9]+)', r'approximately \1', string, flags=re.IGNORECASE)
-    string = re.sub(r'([0-9]{4})\s*\?', r'approximately \1', string, flags=re.IGNORECASE)
+    string = RE_CIRCA.sub(r'approximately \1', string)
+    string = RE_QUERIED_YEAR.sub(r'approximately \1', string)
     # b. -> -
     # ne -> -
-    string = re.sub(r'^(b|n.)[.,]*\s*([0-9]+)', r'\2-', string, flags=re.IGNORECASE)
-    string = re.sub(r'^b[.,]*\s*(approximately [0-9]+)', r'\1-', string, flags=re.IGNORECASE)
+    string = RE_BORN.sub(r'\2-', string)
+    string = RE_BORN_APPROXIMATELY.sub(r'\1-', string)
     # d. -> -
-    string = re.sub(r'd?d[.,]*\s*([0-9]+)', r'-\1', string)
-    string = re.sub(r'^cd[.,]*\s*(approximately [0-9]+)', r'-\1', string, flags=re.IGNORECASE)
-    string = re.sub(r'^D[.,]*\s*([0-9]+)', r'-\1', string, flags=re.IGNORECASE)
+    string = RE_DIED.sub(r'-\1', string)
+    string = RE_DIED_APPROXIMATELY.sub(r'-\1', string)
+    string = RE_LEADING_DIED.sub(r'-\1', string)
     # fl. -> active
-    string = re.sub(r'^f[.,]*l?[.,]*\s*([0-9]+)', r'active \1', string, flags=re.IGNORECASE)
+    string = RE_FLOURISHED.sub(r'active \1', string)
     # _ -> -
     # -- -> -
     string = string.replace('_', '-')
     string = string.replace('--', '-')
     # Remove r before numbers
-    string = re.sub(r'r([0-9]{4})', r'\1', string)
+    string = RE_REIGNED.sub(r'\1', string)
     # bap. -. born approximately
-    string = re.sub(r'bap\. ([0-9]{4})', r'approximately \1-', string)
+    string = RE_BAPTISED.sub(r'approximately \1-', string)
     # Remove titles after dates
-    string = re.sub(r'([0-9]+\??)\. .*$', r'\1', string)
-    string = re.sub(r' [^ac][a-zA-Z]*$', '', string)
+    string = RE_TEXT_AFTER_DATES.sub(r'\1', string)
+    string = RE_TRAILING_WORD.sub('', string)
     string = unicodedata.normalize('NFC', string)
     return string
 
@@ -1186,32 +1561,20 @@ def clean_publication_places(string, ctys=None):
     if string == '': return publishers, states, places
     # Detect if string appears to contain publisher names
     # Space after 'for' to prevent detection of 'ford' e.g. Bradford
-    publisher_flags = ['& co', 'book', 'for ', 'printed', 'private', 'published', 'shop', 'sold']
-    if ',' not in string and any(s in string.lower() for s in publisher_flags):
+    if ',' not in string and PUBLISHER_FLAGS.search(string):
         return clean_publisher_names(string)
-    words_to_trim = ['one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
-                     'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth',
-                     '1st', '2nd', '3rd', '4th', '5th', '6th', '7th', '8th', '9th', '10th',
-                     'erste', 'zweite', 'dritte', 'vierte', u'f\u00FCnfte', 'sechste', 'siebte', 'achte', 'neunte',
-                     'zehnte',
-                     'at', 'bde', 'by', u'd\u00EDl', 'for', 'heft', 'hefte', 'hft', 'hfte', 'honorary', 'imprinted',
-                     'in', 'kn',
-                     'page', 'pages', 'play', 'plays', 'pp', 'printed', 'privately', 'pt', 'reihe',
-                     'sammlung', 'secretary', 'stuk', 'the', 'thl', 'vol',
-                     u'\u03BC\u03B5\u03C1\u03B7', u'\u1F10\u03BD'
-                     ]
     string = quick_clean(string)
-    string = re.sub(r'\b([A-Z]) \[([a-z]+)\][.,\s]+', r'\1\2 ', string)
-    string = re.sub(r'[\s\-.,]*[:;\[\]\\/(){}<>&*?|]+[\s\-.,]*', ';', string)
-    string = re.sub(r'[\s\-.,]*(\bi[.\s]*e\b[.\s]*)[\s\-.,]*', ';', string, flags=re.IGNORECASE)
-    if any(s in string.lower() for s in publisher_flags):
-        string = re.sub(r'[\s\-.,]*,\s*(&|\bet\b|\band\b|\bund\b)[\s\-.,]*', ';', string, flags=re.IGNORECASE)
+    string = RE_INITIAL_EXPANSION.sub(r'\1\2 ', string)
+    string = RE_PLACE_SEPARATORS.sub(';', string)
+    string = RE_PLACE_THAT_IS.sub(';', string)
+    if PUBLISHER_FLAGS.search(string):
+        string = RE_PLACE_COMMA_AND.sub(';', string)
     else:
-        string = re.sub(r'[\s\-.,]*(&|\bet\b|\band\b|\bund\b)[\s\-.,]*', ';', string, flags=re.IGNORECASE)
-    string = re.sub(r'(\s*;\s*)+', ';', string)
+        string = RE_PLACE_AND.sub(';', string)
+    string = RE_SEMICOLONS.sub(';', string)
     string = quick_clean(string, hyphens=False)
     for substring in string.split(';'):
-        if ',' not in substring and any(s in substring.lower() for s in publisher_flags):
+        if ',' not in substring and PUBLISHER_FLAGS.search(substring):
             subpublishers, substates, subplaces = clean_publisher_names(substring)
             for item in subpublishers:
                 publishers.add(item)
@@ -1227,9 +1590,9 @@ def clean_publication_places(string, ctys=None):
 
             if ' ' in substring:
                 first = quick_clean(substring.split(None, 1)[0], hyphens=False)
-                while ' ' in substring and (first.lower() in words_to_trim or re.sub(r'[0-9\-.,]', '', first) == '' or len(first) == 1 
-                                            or first in countries.values() or first in ['S.A', 'U.S.A']):
-                    if first in countries.values():
+                while ' ' in substring and (first.lower() in PLACE_WORDS_TO_TRIM or only_characters(first, NUMERIC_PUNCTUATION) or len(first) == 1 
+                                            or first in COUNTRY_NAMES or first in ['S.A', 'U.S.A']):
+                    if first in COUNTRY_NAMES:
                         states.add(first)
                     elif first == 'S.A':
                         states.add('South Africa')
@@ -1241,9 +1604,9 @@ def clean_publication_places(string, ctys=None):
 
             if ' ' in substring:
                 last = quick_clean(substring.rsplit(None, 1)[1], hyphens=False)
-                while ' ' in substring and (last.lower() in words_to_trim or re.sub(r'[0-9\-.,]', '', last) == '' or len(last) == 1
-                                            or last in countries.values() or last in ['S.A', 'U.S.A']):
-                    if last in countries.values():
+                while ' ' in substring and (last.lower() in PLACE_WORDS_TO_TRIM or only_characters(last, NUMERIC_PUNCTUATION) or len(last) == 1
+                                            or last in COUNTRY_NAMES or last in ['S.A', 'U.S.A']):
+                    if last in COUNTRY_NAMES:
                         states.add(last)
                     elif last == 'S.A':
                         states.add('South Africa')
@@ -1256,17 +1619,17 @@ def clean_publication_places(string, ctys=None):
             # Take out full stops
             substring = substring.replace('.-', '-').replace('.', ' ')
             # Replace and with &
-            substring = re.sub(r'[,.\-\s]*\b(and|et|und|&)\b[,.\-\s]*', ' & ', substring, flags=re.IGNORECASE)
+            substring = RE_AND.sub(' & ', substring)
             substring = quick_clean(substring, hyphens=False)
 
             substring = remove_quotes(substring)
             substring = quick_clean(substring, hyphens=False).strip('?')
 
-            if substring.lower() in words_to_trim or len(substring) <= 3 or re.sub(r'[0-9\-.,]', '', substring) == '':
+            if substring.lower() in PLACE_WORDS_TO_TRIM or len(substring) <= 3 or only_characters(substring, NUMERIC_PUNCTUATION):
                 substring = ''
 
             if substring != '':
-                if substring in countries.values():
+                if substring in COUNTRY_NAMES:
                     states.add(substring)
                 elif substring == 'S A':
                     states.add('South Africa')
@@ -1277,18 +1640,8 @@ def clean_publication_places(string, ctys=None):
                 else:
                     places.add(substring)
                     substring = substring.title()
-                    if substring in PLACES_US:
-                        states.add('United States of America')
-                    elif substring in PLACES_ENGLAND:
-                        states.add('England')
-                    elif substring in PLACES_IRELAND:
-                        states.add('Ireland')
-                    elif substring in PLACES_N_IRELAND:
-                        states.add('Northern Ireland')
-                    elif substring in PLACES_SCOTLAND:
-                        states.add('Scotland')
-                    elif substring in PLACES_WALES:
-                        states.add('Wales')
+                    if substring in PLACE_STATES:
+                        states.add(PLACE_STATES[substring])
 
     return publishers, states, places
 
@@ -1296,48 +1649,20 @@ def clean_publication_places(string, ctys=None):
 def clean_publisher_names(string):
     publishers, states, places = set(), set(), set()
     if string == '': return publishers, states, places
-    words_to_trim = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '&', '?', 'co', u'\u00E0', u'\u00E1',
-                     'ac', u'academi\u00E6', 'act', 'aedibus', 'ah', 'also', 'all', 'an', 'and', 'appointment', 'apud',
-                     'as', 'at', 'au', 'be', 'bei', 'beim', 'bey', 'books', 'bookds', 'bookseller', 'booksellers',
-                     'bros', 'by', 'cased', 'catalogue', 'catalogues', 'cc', 'chez', 'chex', 'cie', 'city', 'co',
-                     'collegio', 'company', 'cum', 'de', 'de\'', 'dem', 'der', 'designed', 'directs', 'didtributed',
-                     'distribution', 'distributor', 'distributorp', 'distributors', 'distribuzione', 'each', 'ed',
-                     u'\u00E9d', u'\u00E9diteur', 'edition', 'editions', 'editor', 'editore', 'editors', 'editrice',
-                     'editura', 'edizioni', 'elsewhere', 'engraved', u'\u00E9rudition', 'esplanade', 'et', 'etiam',
-                     'etonae', 'ex', 'exclusive', 'exclusively', 'excudebant', 'excudebat', 'execudit', 'excusum',
-                     'filhos', 'filios', 'following', 'for', 'forlag', 'from', 'fur', u'f\u00FCr', 'gedruckt',
-                     u'glasgu\u00E6', 'gmbh', 'graveur', 'had', 'her', 'herausgeber', 'him', 'his', 'impensa',
-                     'impensis', 'impr', 'imprime', u'imprim\u00E9', 'imprimerie', 'imprint', 'imprinted', 'imprynt',
-                     'in', 'inc', 'issued', 'istributor', 'izdanie', u'izdan\u012Be', u'izdatel\u02B9',
-                     u'izdatel\u02B9stvo', u'izdava\u010Dko', 'izd-vo', 'kent', u'kiad\u00E1s', u'kiad\u00E1sa',
-                     'kiadja', u'kiad\u00F3', 'king', u'k\u00F6nyvek', u'k\u00F6nyvkiad\u00F3' u'k\u00F6nyvkiad\u00F3',
-                     'komm', 'kommission', 'law', 'librairies', 'librairie', 'librarie', u'libraire-\u00E9diteur',
-                     'londini', u'limi\u1E6De\u1E0Da', 'majesty', 'may', 'musicsellers', 'na', 'nakladatelstvi', 'near',
-                     'nella', 'newly', 'no', 'of', 'official', 'officina', 'oficyna', 'on', 'only', 'or', 'other',
-                     'others', 'oxf', 'p', 'par', 'pl', 'por', 'pour', 'pr', u'preduze\u0107e', 'presso', 'print',
-                     'printd', 'printed', 'printer', 'printers', 'printing', 'privately', 'privilegi', 'quem',
-                     'reprinted', 're-printed', 'repirnted', 'rest', 'revised', 'sa', 'sculp', 'se', 'si', 'sohn',
-                     'son', 'sons', 'son-in-law', 'stamperia', 'stereotype', 'stereotyped', 'stereotyper', 'sumtibus',
-                     u'szerkeszt\u0151s\u00E9ge', 'the', 'them', 'tip', 'to', 'tpagr', u'tpagrut\u02BFiwn', 'tparan',
-                     'translator', 'trova', 'trustees', 'typ', 'typograph', 'typographia', 'typographum', 'typis', 'u',
-                     'uitgeverij', 'uk', 'vend', 'vendido', 'vendita', 'veneunt', 'verbindung', 'verl', 'verlag',
-                     'verlegt', 'verlegung', 'von', 'vormals', 'with', 'within', 'without', 'withowt', 'written',
-                     'wydawn', 'wydawnictwa', 'wydawnictwo', 'www', 'xi']
-    # Can't add to the above: association, house, library, libraries, lit, mit, trust
     string = quick_clean(string)
-    string = re.sub(r'\b([A-Z]) \[([a-z]+)\][.,\s]+', r'\1\2 ', string)
-    string = re.sub(r'[\s\-.,]*[:;\[\]\\/(){}<>|]+[\s\-.,]*', ';', string)
-    string = re.sub(r'[\s\-.,]*((\b[1-2][0-9]{3}\b|\.\.\.+|(&|\bet|\band|\bund)\s*c(o(mp(an)?y)?|(omp)?ie|orp)\b\.*|&c(ie)?\b\.*|\be[.\s]*t[.\s]*c\b[.\s]*|\bi[.\s]*e\b[.\s]*|\bl[.\s]*t[.\s]*d([.\s]*a)?\b[.\s]*|\bb[.\s]*[im]\b[.\s]*|\bn[.\s]*[pv]\b[.\s]*|\bs[.\s]*[inl]\b[.\s]*|\bp[.\s]*[ltv][.\s]*[cty]\b[.\s]*|\b(et\s*al|sic|viz)\b[.\s]*|(&|\bet|\band|\bund)\s*(bro(ther)?|son|the)s*\b[.\s]*|\b(also|distribution\s*(services*)?|exclusively|excudebant|incorporat(ing|ed)|issued|likewise|limited|lithographically|originally|serviced)\s*((by|for|in|into|par|pour|with)\b)?\s*(the\b)?|\bnot\s*avail(able)?\b|(\ban*)?\s*\b(book|division|imprint|part|publication)\s*(from|of)\b|(\bfor\s*)?\bsubscribers*\s*only\b|\btrading\s*as\b|(\bfor)?\s*(\bthe)?\s*\bprivate\s*(circulation|press)\b\s*(of\b)?|,([\s\-.,]*\b(an|and|at|by|chez|et|for|in|par|pour|the|typ|und|under|with)\b)+|\b(by|in|on|with)\s*(associatio?n|assignment|assistance|arrangement|authority|behalf|collaboration|conjunction|co-*operation|permission)\s*((from|of|with)\b)?\s*(the\b)?\s*((trustee|executor|guardian|proprietor)s*)?\s*(of\b)?\s*(the\b)?|(\b(for|from|of|with))?\s*(the)?\s*\b((trustee|executor|guardian|proprietor)s*)\b\s*(of\b)?\s*(the\b)?(late\b)?|\b((exclusive|joint|private)ly\s*)?((co|re)[\-\s]*)?((distribut|issu|print|produc|pub(lish|\.)?)ed\s*((&|\bet|\band|\bund)\b)?\s*)+((exclusive|joint|private)ly\s*)?\s*((at\s*the\s*office\s*of|by|for|par|pour|with)\b)?\s*(the\b)?\s*(assistance\b)?\s*(of\b)?\s*(the\b)?|(\b(&|all|and|by|catholic|every|following|others?|principal|the|rest)[\s\-.,]*)*\b(administrator|author|distribute*or|.dit(eu|o)r|heir|perfumer|printer|proprietor|publisher|(book|law|music)[\s\-.,]*seller|stationer|successor)\'*s*(\s*(friend|syndicate)s?)?\b([\s\-.,]*(&|and|britain|city|country|county|great|in|kingdom|of|the|scotland|town|york)\b)*|\b(under|with)\s*the\s*((assistance|auspices?|co-*operation|direction|permission|sponsorship)\s*((&|\bet|\band|\bund)\b)?\s*)+\s*(of\b)?\s*(the\b)?|((&|\bet|\band|\bund)\s*(are\s*to\s*be)|((&|\bet|\band|\bund)\b)?\s*(are\s*to\s*be))\s*solde?\b|(&|\bet|\band|\bund)\s*subsidiar(y|ies)\b|\bar\s*ran\b|\bargraphwyd\s*(dros)?\b|\b(et\s*)?(a\s*lond.*?)?se\s*(trouve|vend)\b.*?(lond.*?)?che.*?propriet[aeious]*res?\b|\baux?\s*frais\s*(de\s*(l[eas]*\s*)?)?|\bimprim.e*.*?d.pens.*?ladite.*?academie\s*(par|pour)?\b|\bzu\s*finden\s*beym\b|\bdruck\s*der\b|\b(to|for)\s*((her|his|the\s*(king|queen)[.s\s]*most\s*excellent)\s*(majesty|royal\s*highness)([,\s]*pall-mall)?|the\s*society)([,\s]*(the\s*)?prince(\s*of\s*wales|sses))?\b|(&|\bet|\band|\bund)\s*(all|one|two|three|four|five|six|seven|eight|nine|ten|[0-9]+)?\s*others?\b|\ba favourite song in the enchanter\b|\ba scrapbook of pieces from m[.\s]*d\b[.\s]*|\bas\s*the\s*act\s*directs\b|\b(where|by\s*whom)\s*advertisements\s*are\s*taken\s*in\b|\bby\s*the\s*author.?s\s*appointment\b|\bmass\s*market\s*paperback\b|\bentered\s*at\s*stationer.?s hall\b|\b(also)?\s*(in|at)\s*(h(er|is)\s*majesty.?s|the|the\s*(king|queen)\'*s)\s*theatre\s*(in\b)?\s*(the\b)?\s*(hay-*market)?|\bin\s*(the)?\s*(u[.\s]*s[.\s]*a\b[.\s]*|north\s*(&|and)\s*south\s*america|united\s*states(\s*of\s*america)?|western\s*hemisphere)|\bat\s*(his|the)\s*(library|shop|(wholesale)?\s*warehouses?),?(\s*on\s*the\s*esplanade)?)[\s\-.,]*)+', ';', string, flags=re.IGNORECASE)
-    string = re.sub(r'[\s\-.,]*\b(committee|office)s*\s*of\b[\s\-.,]*\'', ';\'', string, flags=re.IGNORECASE)
-    string = re.sub(r'\'[\s\-.,]*\b(publi(cation|shing))s*[\s\-.,]*', '\';', string, flags=re.IGNORECASE)
+    string = RE_INITIAL_EXPANSION.sub(r'\1\2 ', string)
+    string = RE_PUBLISHER_SEPARATORS.sub(';', string)
+    string = RE_PUBLISHER_PHRASES.sub(';', string)
+    string = RE_PUBLISHER_COMMITTEE.sub(';\'', string)
+    string = RE_PUBLISHER_PUBLICATIONS.sub('\';', string)
     # Words to split after
-    string = re.sub(r'[\s\-.,]*\b(agency|associatio?n|library|newspapers|organisation|organization|society|trust|university press)[\s\-.,]+(?!for|of)', r' \1;', string, flags=re.IGNORECASE)
-    string = re.sub(r'[\s\-.,]*\b(press|publications|publishing)[\s\-.,]*(co)?[\s\-.,]+(?!and|house)', r' \1;', string, flags=re.IGNORECASE)
+    string = RE_PUBLISHER_SPLIT_AFTER.sub(r' \1;', string)
+    string = RE_PUBLISHER_SPLIT_AFTER_PRESS.sub(r' \1;', string)
     # Words to split before
-    string = re.sub(r'[\s\-.,]*\b(bloomsbury|british library|british school of|dover|j(ohn)? murray|methuen|penguin)', r';\1 ', string, flags=re.IGNORECASE)
+    string = RE_PUBLISHER_SPLIT_BEFORE.sub(r';\1 ', string)
     # Words to split between
-    string = re.sub(r'[\s\-.,]*\b(books|london|westminster)[\s\-.,]*(?:&|et|and|und)?[\s\-.,]*(for the|london|westminster)\b', r' \1;\2 ', string, flags=re.IGNORECASE)
-    string = re.sub(r'(\s*;\s*)+', ';', string)
+    string = RE_PUBLISHER_SPLIT_BETWEEN.sub(r' \1;\2 ', string)
+    string = RE_SEMICOLONS.sub(';', string)
     string = quick_clean(string)
 
     for substring in string.split(';'):
@@ -1345,19 +1670,19 @@ def clean_publisher_names(string):
             substring = clean_26X(quick_clean(substring, hyphens=False))
             substring = publisher.Publishers().sub(substring).strip()
             if substring not in ['Books of Africa', 'Independent Publishers Group']:
-                substring = re.sub(r'\s*\bu(ni)?(versity)?[.\s]*pr*(ess)?\b[.\s]*', ' University Press ', substring, flags=re.IGNORECASE)
+                substring = RE_UNIVERSITY_PRESS.sub(' University Press ', substring)
                 substring = quick_clean(substring, hyphens=False)
 
                 if ' ' in substring:
                     first = quick_clean(substring.split(None, 1)[0], hyphens=False)
-                    while ' ' in substring and ( (first.lower() in words_to_trim and first != 'UK') or is_lower_case_letter(first)):
+                    while ' ' in substring and ( (first.lower() in PUBLISHER_WORDS_TO_TRIM and first != 'UK') or is_lower_case_letter(first)):
                         substring = quick_clean(substring.split(None, 1)[1], hyphens=False)
                         if ' ' not in substring: break
                         first = quick_clean(substring.split(None, 1)[0], hyphens=False)
 
                 if ' ' in substring:
                     last = quick_clean(substring.rsplit(None, 1)[1], hyphens=False)
-                    while ' ' in substring and (last.lower() in words_to_trim or is_lower_case_letter(last)):
+                    while ' ' in substring and (last.lower() in PUBLISHER_WORDS_TO_TRIM or is_lower_case_letter(last)):
                         substring = quick_clean(substring.rsplit(None, 1)[0], hyphens=False)
                         if ' ' not in substring: break
                         last = quick_clean(substring.rsplit(None, 1)[1], hyphens=False)
@@ -1365,20 +1690,20 @@ def clean_publisher_names(string):
                 # Take out full stops
                 substring = substring.replace('.-', '-').replace('(?!www).(?<!(co|uk))', ' ')
                 # Replace and with &
-                substring = re.sub(r'[,.\-\s]*\b(and|et|und|&)\b[,.\-\s]*', ' & ', substring, flags=re.IGNORECASE)
+                substring = RE_AND.sub(' & ', substring)
                 substring = quick_clean(substring, hyphens=False)
 
                 substring = remove_quotes(substring)
                 substring = quick_clean(substring, hyphens=False).strip('?')
 
-                if substring.lower() in words_to_trim or len(substring) <= 3 \
+                if substring.lower() in PUBLISHER_WORDS_TO_TRIM or len(substring) <= 3 \
                         or substring.lower() in ['book', 'children\'s', 'group', 'members', 'private',
                                                  'publication', 'publications', 'publishing', 'publishing'] \
-                        or re.sub(r'[0-9\-.,]', '', substring) == '':
+                        or only_characters(substring, NUMERIC_PUNCTUATION):
                     substring = ''
 
                 if substring != '':
-                    if substring in countries.values():
+                    if substring in COUNTRY_NAMES:
                         states.add(substring)
                     elif substring == 'S A':
                         states.add('South Africa')
@@ -1389,18 +1714,8 @@ def clean_publisher_names(string):
                     elif substring.title() in PLACES:
                         substring = substring.title()
                         places.add(substring)
-                        if substring in PLACES_US:
-                            states.add('United States of America')
-                        elif substring in PLACES_ENGLAND:
-                            states.add('England')
-                        elif substring in PLACES_IRELAND:
-                            states.add('Ireland')
-                        elif substring in PLACES_N_IRELAND:
-                            states.add('Northern Ireland')
-                        elif substring in PLACES_SCOTLAND:
-                            states.add('Scotland')
-                        elif substring in PLACES_WALES:
-                            states.add('Wales')
+                        if substring in PLACE_STATES:
+                            states.add(PLACE_STATES[substring])
                     else:
                         for item in substring.split(';'):
                             item = quick_clean(item)
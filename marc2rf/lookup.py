@@ -167,8 +167,16 @@ PLACES_OTHER = ['Aabenraa', 'Aachen', 'Aalborg', 'Aalen', 'Aalten', 'Aarau', 'Aa
                 'Winnipeg', 'Worcester', 'Wuppertal', 'Yokohama', 'Zagreb', 'Zevenbergen', 'Zurich', 'Zutphen',
                 'Zwolle', ]
 
-PLACES = list(set().union(PLACES_ENGLAND, PLACES_IRELAND, PLACES_N_IRELAND, PLACES_SCOTLAND, PLACES_WALES, PLACES_US,
-                          PLACES_OTHER))
+PLACES = frozenset().union(PLACES_ENGLAND, PLACES_IRELAND, PLACES_N_IRELAND, PLACES_SCOTLAND, PLACES_WALES, PLACES_US,
+                           PLACES_OTHER)
+
+# Lookup table for the state containing a place
+# The place lists do not overlap, so a single lookup replaces the chain of list membership tests
+PLACE_STATES = {place: state
+                for (state, places) in [('United States of America', PLACES_US), ('England', PLACES_ENGLAND),
+                                        ('Ireland', PLACES_IRELAND), ('Northern Ireland', PLACES_N_IRELAND),
+                                        ('Scotland', PLACES_SCOTLAND), ('Wales', PLACES_WALES)]
+                for place in places}
 
 # Lookup table for MARC fields
 marc_fields = {
@@ -1289,6 +1297,9 @@ countries = {
     'za': 'Zambia',
 }
 
+# Set of country names, for membership tests
+COUNTRY_NAMES = frozenset(countries.values())
+
 # Lookup table for languages
 languages = {
     'aar': 'Afar',
@@ -6,15 +6,19 @@
 # Import required modules
 # These should all be contained in the standard library
 from collections import OrderedDict
-import copy
+import bisect
 import datetime
 import gc
 import glob
+import heapq
+import json
 import locale
 import os
 import regex as re
+import sqlite3
 import sys
 import unicodedata
+import zlib
 
 # Modules specific to Researcher Format
 from marc2rf.lookup import *
@@ -26,13 +30,60 @@ __license__ = 'MIT License'
 __version__ = '1.0.0'
 __status__ = '4 - Beta Development'
 
-# Set locale to assist with sorting
-locale.setlocale(locale.LC_ALL, '')
-
 # Disable garbage collection (except when called)
 # Automatic garbage collection disrupts MultiRegex replacements
 gc.disable()
 
+# ====================
+#   Global variables
+# ====================
+
+# Number of MARC records read between checkpoints, at which progress is saved so that a run can be resumed
+CHECKPOINT_INTERVAL = 10000
+CHECKPOINT_FILE = 'researcherFormat.checkpoint'
+
+# File written by each shard of a conversion once all of its records have been converted
+DONE_FILE = 'researcherFormat.done'
+
+# Number of consecutive MARC records in each chunk, when records are divided between shards by count
+SHARD_CHUNK = 1000
+
+# Extension of the file to which MARC fields are spooled, when using MARC fields as column headings
+SPOOL_EXT = '.spool'
+
+# Extension of the index of NID identifiers and URLs saved next to a file of MARC records, for Newspaper records
+NID_INDEX_EXT = '.nid.db'
+# Number of bytes at the start and end of the indexed part of a MARC file, checked to detect changes to it
+NID_INDEX_CHECK = 65536
+
+# ====================
+#  Regular expressions
+# ====================
+# Used in convert_record()
+RE_DISAGGREGATED = LazyPattern(r'dis[\s\-]*ag*reg')
+RE_PROJECTION = LazyPattern(r'(?<![a-z])proj\.?(?![a-z])', flags=re.IGNORECASE)
+RE_TRAILING_DATE = LazyPattern('(,\s+|^)(©|\u00A9|c)?[0-9\-]{4}[0-9\-]*($|\s*\()')
+RE_SIC = LazyPattern(r'\[sic\.?\]', flags=re.IGNORECASE)
+RE_TITLE_PUNCTUATION = LazyPattern(r'[.\[\]?:;]')
+RE_SWAP_SEMICOLON = LazyPattern(r'([^;]*);([^;]*)')
+RE_866_PRINT_NOT_AVAILABLE = LazyPattern(r'(^newspaper library\s*:?|^newspapers\s*:|[\s\(:\[]*print\s*(copies|issues)?\s*(is|are)?\s*not\s*(made)?\s*available\s*(for\s*conservations?\s*reas[on]*s)?\s*(whe(n|re)\s*(an\s*alternative\s*(format)?\s*(version)?|a\s*micrf?ofilm\s*alternative)\s*exists?)?\.?\]?)', flags=re.IGNORECASE)
+RE_866_MICROFILM_AVAILABLE = LazyPattern(r'[\s\(see separate record for microfilm holdings|:\[]*(\-*\s*microfilm (is|will be) available (at a later date)?|(see)?\s*all editions microfilm is available for \'kentish express\')[\.:,\)\]]*', flags=re.IGNORECASE)
+RE_866_SEPARATE_RECORD = LazyPattern(r'[\s\(:\[]*(newspapers|newspaper\s*library|(please)?\s*see\s*(also)?\s*sep[ae]rate\s*record\s*for\s*(microfilm|print)\s*holdings|(please)?\s*see\s*(microfilm|print)\s*record|(microfilm|print)\s*holdings\s*only|some\s*issues\s*are\s*held\s*in\s*(microfilm|print)\s*only|(microfilm|print)\s*is\s*available|microfilms?\s*of\s*varied\s*quality\s*with\s*imperfect\s*holdings|for\s*holdings\s*of\s*this\s*title,?\s*(please)?\s*see\s*record|(print|microfilm)\s*for\s*(this\s*title\s*is\s*available\s*on\s*that)\s*for\s*\'[^\']+\'|see\s*\'[^\']+\'\s*(microfilm)?\s*record\s*for\s*(print|microfilm)\s*holdings|for\s*issues\s*(to)?\s*[0-9]{4}\s*(onwards)?,?\s*see\s*(microfilm|print)|ISSN\s*[0-9]{4}\-[0-9]{4})\s*[\.:,\)\]]*', flags=re.IGNORECASE)
+RE_866_MICROFILM_NOTES = LazyPattern(r'[\s\(:\[]*(all\s*editions\s*microfilm|microfilm\s*will\s*be\s*available\s*at\s*a\s*later\s*date|this\s*record\s*has\s*holdings\s*for\s*both\s*print\s*and\s*microfilm\s*versions|(for)?\s*(earlier|later)?\s*issues\s*(to)?\s*[0-9,\-\s]*\s*(available\s*[io]n|(please)?\s*see)\s*(microfilm|print)\s*(holdings)?)\s*[\.:,\)\]]*', flags=re.IGNORECASE)
+RE_866_SERIES = LazyPattern(r'[\s\(:\[]*(n\s*s\s*|(new|original)\s*series|nuova\s*serie|feest\-?nummer|nouvelle\s*s.rie|extra\s*no|no\s*di\s*propaganda|numero\s*(unico|sp.cimen|extraordinario|de\s*reprise)|(centenary\s*souvenir|centennial)\s*number|cyfres\s*newydd|ekstranummer|(pilot|preview|registration)\s*issues?|print|proefnummer|foglio\s*unico|supplement\s*only|sic|see|etc|weekly\s*eds?|extraordinary\s*numbers?)[\.:,\)\]]*', flags=re.IGNORECASE)
+RE_866_ENUMERATION = LazyPattern(r'(?<![a-z])(no|yr|year|vol)\s+[0-9\-,\s]+', flags=re.IGNORECASE)
+
+# Used in marc2rf_researcherFormat()
+RE_LEADING_SPACE = LazyPattern(r'^ ')
+RE_NOT_FIELD_CHARACTER = LazyPattern(r'[^a-zA-Z0-9|]')
+
+# Used in marc2rf_write_rf_config()
+RE_NOT_CODE_CHARACTER = LazyPattern(r'[^a-z.|\s]')
+RE_REPEATED_DIGIT_RANGE = LazyPattern(r'\[(\d)-\1\]')
+
+# Used in DeweyRanges
+RE_DEWEY_NUMBER = LazyPattern(r'^([0-9]{1,3})(\.[0-9]+)?(?![0-9])')
+
 # ====================
 #       Classes
 # ====================
@@ -284,22 +335,188 @@ class Output:
                 self.values[v] = set()
 
 
+class ShardFile(object):
+    """A part of an output file, written by one shard of a conversion.
+
+    Alongside the part, an index file records the position in the MARC file of each record
+    written to the part, and the number of lines written for it, so that the parts written
+    by all the shards can be merged in the original order of the records.
+
+    :param path: Path to the part file.
+    :param mode: Mode in which to open the part file and its index.
+    """
+
+    def __init__(self, path, mode='w'):
+        self.name = path
+        self.file = open(path, mode=mode, encoding='utf-8', errors='replace')
+        self.index = open(path + '.idx', mode=mode, encoding='utf-8', errors='replace')
+        self.files = [self.file, self.index]
+        self.lines = 0
+
+    def write(self, string):
+        self.lines += string.count('\n')
+        return self.file.write(string)
+
+    def end_record(self, sequence):
+        """Record the lines written since the previous record against the record at position sequence.
+        Headers are recorded against position -1."""
+        if self.lines:
+            self.index.write('{} {}\n'.format(str(sequence), str(self.lines)))
+            self.lines = 0
+
+    def flush(self):
+        for f in self.files:
+            f.flush()
+
+    def close(self):
+        for f in self.files:
+            f.close()
+
+
+class NIDIndex(object):
+    """An index of NID identifiers (944/NID $a) and the URLs of digitised newspapers (856 $u)
+    found in the same record, in a file of MARC records.
+
+    The index is saved in an SQLite database next to the MARC file, so that it is only built once
+    for repeated conversions of the same file. If records have been appended to an uncompressed file
+    of MARC21 records since the index was saved, only the new records are indexed; if the file has
+    otherwise changed, the index is rebuilt. If the database cannot be written, the index is kept in memory.
+
+    :param marc_path: Path to file of MARC records, in any of the formats read by marc_reader.
+    :param debug: Display additional output to assist with debugging.
+    """
+
+    def __init__(self, marc_path, debug=False):
+        self.marc_path = marc_path
+        self.path = marc_path + NID_INDEX_EXT
+        # Only records in MARC21 transmission format can be appended to a file
+        self.appendable = marc_format(marc_path) == '.lex' and not is_compressed(marc_path)
+        self.debug = debug
+        self.conn, self.cursor = None, None
+        self.rows = []
+
+    def open(self):
+        """Open the index, bringing it up to date with the MARC file."""
+        try:
+            # Another process may be updating the index, so wait for it to finish
+            self.conn = sqlite3.connect(self.path, timeout=3600, isolation_level=None)
+            self.update()
+        except:
+            if self.debug:
+                print('\nCould not save NID index to {}: {}'.format(self.path, str(sys.exc_info())))
+            self.close()
+            self.conn = sqlite3.connect(':memory:', isolation_level=None)
+            self.update()
+        self.cursor = self.conn.cursor()
+        self.cursor.execute('PRAGMA mmap_size = 268435456;')
+        return self
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn, self.cursor = None, None
+
+    def checks(self, size):
+        """Return checksums of the start and end of the first size bytes of the MARC file."""
+        with open(self.marc_path, 'rb') as mfile:
+            head = zlib.crc32(mfile.read(min(size, NID_INDEX_CHECK)))
+            mfile.seek(max(size - NID_INDEX_CHECK, 0))
+            tail = zlib.crc32(mfile.read(min(size, NID_INDEX_CHECK)))
+        return head, tail
+
+    def update(self):
+        """Index any records which are not already in the index."""
+        cursor = self.conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE;')
+        self.rows = []
+        try:
+            cursor.execute('CREATE TABLE IF NOT EXISTS nid_urls (NID TEXT, URL TEXT, PRIMARY KEY (NID, URL)) WITHOUT ROWID;')
+            cursor.execute('CREATE TABLE IF NOT EXISTS indexed (Size INTEGER, MTime REAL, Head INTEGER, Tail INTEGER);')
+            stat = os.stat(self.marc_path)
+            start = 0
+            row = cursor.execute('SELECT Size, MTime, Head, Tail FROM indexed;').fetchone()
+            if row is not None:
+                size, mtime, head, tail = row
+                if size == stat.st_size and mtime == stat.st_mtime:
+                    cursor.execute('COMMIT;')
+                    return
+                if self.appendable and size <= stat.st_size and (head, tail) == self.checks(size):
+                    start = size
+            if start == 0:
+                cursor.execute('DELETE FROM nid_urls;')
+
+            print('\nBuilding NID index ...')
+            print('----------------------------------------')
+            print(str(datetime.datetime.now()))
+            if start > 0: print('Indexing records added since the index was saved')
+            # Records are only decoded as far as the fields needed for the index, and then skipped
+            reader = marc_reader([self.marc_path], self.add_record, ['944', 'NID', '856'])
+            if start > 0: reader.resume(start, 0)
+            for record in reader: pass
+            end = reader.file_handle.tell() if self.appendable else stat.st_size
+            reader.close()
+            print('\r{0} MARC records processed'.format(str(reader.count)))
+            self.flush(cursor)
+
+            cursor.execute('DELETE FROM indexed;')
+            cursor.execute('INSERT INTO indexed VALUES (?, ?, ?, ?);', (end, stat.st_mtime) + self.checks(end))
+            cursor.execute('COMMIT;')
+        except:
+            cursor.execute('ROLLBACK;')
+            raise
+
+    def add_record(self, record):
+        """Add the NID identifiers and URLs in a partially decoded record to the index."""
+        urls = [su for field in record.get_fields('856') for su in field.get_subfields('u')
+                if 'http://www.britishnewspaperarchive.co.uk' in su]
+        if urls:
+            for field in record.get_fields('944', 'NID'):
+                for sa in field.get_subfields('a'):
+                    sa = keep_characters(sa, DIGITS)
+                    self.rows.extend((sa, su) for su in urls)
+        if len(self.rows) >= 10000:
+            self.flush(self.conn.cursor())
+        return False
+
+    def flush(self, cursor):
+        cursor.executemany('INSERT OR IGNORE INTO nid_urls VALUES (?, ?);', self.rows)
+        self.rows = []
+
+    def urls(self, nid):
+        """Return the URLs of digitised newspapers in records with the NID identifier nid."""
+        return [row[0] for row in self.cursor.execute('SELECT URL FROM nid_urls WHERE NID = ?;', (nid,))]
+
+
 class Converter(object):
     """A class for converting records.
 
-    :param marc_path: Path to file of MARC records.
+    :param marc_path: Path to file of MARC records, which may be compressed, or to several files (see marc_paths).
     :param request_path: Path to Outlook message containing details of the request.
     :param output_folder: Folder to save Researcher Format output files.
     :param options: Options to set default transformation parameters.
     :param debug: Display additional output to assist with debugging.
+    :param select: Only convert records which meet the selection criteria in the request message.
+    :param resume: Resume an interrupted conversion from the last checkpoint saved in the output folder.
+    :param shards: Number of shards into which the conversion is divided.
+    :param shard: Number of the shard to convert, from 1 to shards.
+    :param shard_by: Divide records between shards by 'count', in chunks of consecutive records,
+        or by 'id', using a hash of the record identifier.
     """
 
-    def __init__(self, marc_path, request_path, output_folder, options, debug=False):
+    def __init__(self, marc_path, request_path, output_folder, options, debug=False, select=False, resume=False,
+                 shards=1, shard=1, shard_by='count'):
         self.marc_path = marc_path
         self.request_path = request_path
         self.output_folder = output_folder
-        self.options = re.sub(r'[^a-z]', '', options)
+        self.options = keep_characters(options, LOWER_CASE_LETTERS)
         self.debug = debug
+        self.select = select
+        self.selector = None
+        self.resume = resume
+        self.checkpoint = None
+        self.shards, self.shard, self.shard_by = shards, shard, shard_by
+        self.reader = None
+        self.output_files = OrderedDict()
         self.header = '========================================\n' \
                       'researcherFormat\n' \
                       'MARC record conversion for Researcher Format\n' \
@@ -312,12 +529,230 @@ class Converter(object):
         # Parameters for output files to be included
         self.file_records, self.file_titles, self.file_names, self.file_topics, self.file_classification = \
             False, False, False, False, False
-        self.fields_present, self.nid_urls = {}, {}
+        self.marc_paths = []
+        self.nid_indexes = []
+        self.prefilter_tests, self.prefilter_tags = [], set()
 
     def show_header(self):
         if self.header:
             print(self.header)
 
+    @staticmethod
+    def is_current(record):
+        """Return False if the status of a record shows that it is deleted, suppressed or prepublication.
+
+        These records are not written to the output after conversion, so they can be skipped
+        before being decoded in full. The test only uses the fields that convert_record() reads
+        for the record status (SX), and is applied to each status value separately.
+        """
+        for field in record.get_fields('932'):
+            for subfield in field.get_subfields('a'):
+                if STATUS_FLAGS.search(subfield): return False
+        for field in record.get_fields('STA', 'LDD'):
+            for subfield in field.get_subfields():
+                if STATUS_FLAGS.search(subfield.replace('-', '')): return False
+        return True
+
+    def open_output(self, file_name, header=''):
+        """Open an output file and write its header.
+
+        If resuming from a checkpoint, the file is instead truncated to its size at the checkpoint,
+        and opened to append further output.
+        """
+        path = self.shard_path(file_name)
+        mode = 'w'
+        if self.checkpoint is not None:
+            mode = 'a'
+            for p in [path, path + '.idx'] if self.shards > 1 else [path]:
+                if os.path.basename(p) not in self.checkpoint['files'] or not os.path.isfile(p):
+                    exit_prompt('Error: Output file {} does not match the checkpoint'.format(os.path.basename(p)))
+                with open(p, mode='r+b') as f:
+                    f.truncate(self.checkpoint['files'][os.path.basename(p)])
+        if self.shards > 1: ofile = ShardFile(path, mode)
+        else: ofile = open(path, mode=mode, encoding='utf-8', errors='replace')
+        if self.checkpoint is None:
+            ofile.write(header)
+        self.output_files[file_name] = ofile
+        return ofile
+
+    def shard_path(self, file_name):
+        """Return the path to a file in the output folder, for the shard being converted."""
+        path = os.path.join(self.output_folder, file_name)
+        if self.shards > 1:
+            path = '{}.shard{}of{}'.format(path, str(self.shard), str(self.shards))
+        return path
+
+    def in_shard(self, record):
+        """Return True if a record belongs to the shard being converted."""
+        if self.shard_by == 'id':
+            for field in record.get_fields('001'):
+                return zlib.crc32(field.data.encode('utf-8')) % self.shards == self.shard - 1
+        # Records without an identifier are divided by count
+        return ((self.reader.count - 1) // SHARD_CHUNK) % self.shards == self.shard - 1
+
+    def end_record(self, sequence):
+        """Mark the end of the output for the record at position sequence in the MARC file."""
+        if self.shards > 1:
+            for ofile in self.output_files.values():
+                ofile.end_record(sequence)
+
+    @staticmethod
+    def read_shard_index(path, shard):
+        with open(path, mode='r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                sequence, lines = line.split()
+                yield int(sequence), shard, int(lines)
+
+    def merge_shards(self):
+        """Merge the part files written by each shard into single output files,
+        with one header and with records in their original order."""
+        print('\nMerging {} shards ...'.format(str(self.shards)))
+        print('----------------------------------------')
+        print(str(datetime.datetime.now()))
+
+        # Every shard must have finished, with the same parameters, before any part is merged
+        # A shard which is still running, or which was stopped, has not written its DONE_FILE
+        parameters = None
+        for shard in range(1, self.shards + 1):
+            path = os.path.join(self.output_folder, '{}.shard{}of{}'.format(DONE_FILE, str(shard), str(self.shards)))
+            try:
+                with open(path, mode='r', encoding='utf-8') as f:
+                    done = json.load(f)
+            except:
+                exit_prompt('Error: Shard {} of {} has not finished'.format(str(shard), str(self.shards)))
+            # Each shard records its own number, which is the only parameter expected to differ
+            done['parameters']['shards'][1] = None
+            if parameters is None: parameters = done['parameters']
+            elif done['parameters'] != parameters:
+                exit_prompt('Error: Shard {} was converted with different parameters'.format(str(shard)))
+            if os.path.isfile(os.path.join(self.output_folder, '{}.shard{}of{}'.format(
+                    CHECKPOINT_FILE, str(shard), str(self.shards)))):
+                exit_prompt('Error: Shard {} has not finished'.format(str(shard)))
+
+        suffix = '.shard1of{}'.format(str(self.shards))
+        file_names = []
+        for first in sorted(glob.glob(os.path.join(glob.escape(self.output_folder), '*' + suffix))):
+            file_name = os.path.basename(first)[:-len(suffix)]
+            if file_name in [CHECKPOINT_FILE, DONE_FILE]: continue
+            for shard in range(1, self.shards + 1):
+                part = os.path.join(self.output_folder, '{}.shard{}of{}'.format(file_name, str(shard), str(self.shards)))
+                if not os.path.isfile(part) or not os.path.isfile(part + '.idx'):
+                    exit_prompt('Error: Shard {} of {} has not been written'.format(str(shard), file_name))
+            file_names.append(file_name)
+
+        for file_name in file_names:
+            parts = [os.path.join(self.output_folder, '{}.shard{}of{}'.format(file_name, str(shard), str(self.shards)))
+                     for shard in range(1, self.shards + 1)]
+            print('Merging {}'.format(file_name))
+            part_files = [open(part, mode='rb') for part in parts]
+            header = False
+            with open(os.path.join(self.output_folder, file_name), mode='wb') as ofile:
+                for sequence, shard, lines in heapq.merge(*(self.read_shard_index(part + '.idx', shard)
+                                                            for shard, part in enumerate(parts))):
+                    data = b''.join(next(part_files[shard]) for i in range(lines))
+                    # Each part starts with the header, which is only written once
+                    if sequence < 0:
+                        if header: continue
+                        header = True
+                    ofile.write(data)
+            # Parts are only removed if every line of each part has been merged
+            complete = all(not f.read(1) for f in part_files)
+            for f in part_files:
+                f.close()
+            if not complete:
+                os.remove(os.path.join(self.output_folder, file_name))
+                exit_prompt('Error: The parts of {} do not match their indexes'.format(file_name))
+            for part in parts:
+                os.remove(part)
+                os.remove(part + '.idx')
+            if file_name.endswith(SPOOL_EXT):
+                self.write_spooled_records(file_name[:-len(SPOOL_EXT)])
+
+        for shard in range(1, self.shards + 1):
+            os.remove(os.path.join(self.output_folder, '{}.shard{}of{}'.format(DONE_FILE, str(shard), str(self.shards))))
+
+    def write_spooled_records(self, records_name):
+        """Write the records spooled when using MARC fields as column headings to a CSV file,
+        with a column for each MARC field present in any record.
+
+        Each line of the spool holds the values of the MARC fields in one record, keyed by tag,
+        and whether the record is current.
+        """
+        spool_path = os.path.join(self.output_folder, records_name + SPOOL_EXT)
+        print('\nWriting {} ...'.format(records_name))
+        tags = set()
+        with open(spool_path, mode='r', encoding='utf-8', errors='replace') as spool:
+            for line in spool:
+                tags.update(json.loads(line)[1])
+        # If any record has STA, only current records with a 001 are written
+        check_status = 'STA' in tags
+        tags = sorted(tag for tag in tags if tag != 'STA')
+        with open(spool_path, mode='r', encoding='utf-8', errors='replace') as spool, \
+                open(os.path.join(self.output_folder, records_name), mode='w', encoding='utf-8', errors='replace') as records:
+            records.write('"' + '","'.join(tags) + '"\n')
+            records.write('"' + '","'.join(marc_fields[tag] for tag in tags) + '"\n')
+            for line in spool:
+                current, values = json.loads(line)
+                if current or not check_status:
+                    records.write('"' + '","'.join(values.get(tag, '') for tag in tags) + '"\n')
+        os.remove(spool_path)
+
+    def checkpoint_parameters(self):
+        """Return the parameters which must be the same for a conversion to be resumed."""
+        return {
+            'marc_path': [os.path.abspath(path) for path in self.marc_paths],
+            'marc_size': [os.path.getsize(path) for path in self.marc_paths],
+            'request_path': os.path.abspath(self.request_path) if self.request_path != '' else '',
+            'options': self.options,
+            'profile': self.profile,
+            'select': self.select,
+            'shards': [self.shards, self.shard, self.shard_by],
+            'columns': [v for v in self.output_fields.values if self.output_fields.values[v] is True],
+            'files': [self.file_records, self.file_titles, self.file_names, self.file_topics, self.file_classification],
+        }
+
+    def read_checkpoint(self):
+        """Read the checkpoint saved in the output folder, if it matches the current parameters."""
+        try:
+            with open(self.shard_path(CHECKPOINT_FILE), mode='r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except:
+            print('\nNo checkpoint found; starting from the first record')
+            return None
+        if checkpoint.get('parameters') != self.checkpoint_parameters():
+            exit_prompt('Error: The checkpoint in {} was saved with different parameters'.format(self.output_folder))
+        print('\nResuming after {} MARC records'.format(str(checkpoint['records'])))
+        return checkpoint
+
+    def save_checkpoint(self, offset, records):
+        """Save the position in the MARC file and the size of each output file.
+
+        :param offset: Byte offset of the next record in the MARC file.
+        :param records: Number of MARC records read before the offset.
+        """
+        files = {}
+        for ofile in self.output_files.values():
+            ofile.flush()
+            for f in getattr(ofile, 'files', [ofile]):
+                files[os.path.basename(f.name)] = os.path.getsize(f.name)
+        checkpoint = {
+            'parameters': self.checkpoint_parameters(),
+            'offset': offset,
+            'records': records,
+            'files': files,
+        }
+        # The checkpoint is replaced in a single step, so it is never left partly written
+        path = self.shard_path(CHECKPOINT_FILE)
+        with open(path + '.tmp', mode='w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(path + '.tmp', path)
+
+    def prefilter(self, record):
+        """Return False if a partially decoded record will not be written to the output."""
+        for test in self.prefilter_tests:
+            if not test(record): return False
+        return True
+
     def write_readme(self):
         if self.profile in ['B', 'F', 'M', 'N', 'R']: return None
 
@@ -476,9 +911,8 @@ class Converter(object):
         """Function to convert a single MARC record to Researcher Format."""
         output = Output(self.profile)
         if self.profile == 'M':
-            output.values = copy.deepcopy(self.fields_present)
-            for v in output.values:
-                output.values[v] = set()
+            # Only the MARC fields present in this record are needed
+            output.values = {field.tag: set() for field in record.fields if field.tag in marc_fields}
 
         start_year, end_year = '', ''
 
@@ -508,8 +942,8 @@ class Converter(object):
                                 # Don't strip subfield codes from control fields
                                 output.values[v].add(clean(field.data, space=False))
                             elif field.tag == '985':
-                                if re.search(r'dis[\s\-]*ag*reg', str(field).lower()) is not None \
-                                        and re.search(r'dis[\s\-]*ag*reg', str(field).lower()) != '':
+                                if RE_DISAGGREGATED.search(str(field).lower()) is not None \
+                                        and RE_DISAGGREGATED.search(str(field).lower()) != '':
                                     output.values[v].add((' '.join('$' + subfield[0] + clean(subfield[1], space=False) for subfield in field)).strip())
                             else:
                                 # Don't strip subfield codes
@@ -557,14 +991,14 @@ class Converter(object):
 
             for field in record.get_fields('008'):
 
-                try: date = re.sub(r'[^0-9]', '', field.data[7:11])
+                try: date = keep_characters(field.data[7:11], DIGITS)
                 except: pass
                 else:
                     if len(date) == 4 and date != '9999':
                         start_year = date
                         output.values['P1'].add(date)
 
-                try: date = re.sub(r'[^0-9]', '', field.data[11:15])
+                try: date = keep_characters(field.data[11:15], DIGITS)
                 except: pass
                 else:
                     if len(date) == 4 and date != '9999':
@@ -587,31 +1021,31 @@ class Converter(object):
                     elif end_year != '':
                         output.values['PD'].add('-{}'.format(end_year))
 
-                try: country = countries.get(re.sub(r'[^a-z]', '', field.data[15:18]), '')
+                try: country = countries.get(keep_characters(field.data[15:18], LOWER_CASE_LETTERS), '')
                 except: pass
                 else: output.values['PC'].add(country)
 
                 if self.profile == 'N':
-                    try: frequency = frequencies.get(re.sub(r'[^a-z]', '', field.data[18]), '')
+                    try: frequency = frequencies.get(keep_characters(field.data[18], LOWER_CASE_LETTERS), '')
                     except: pass
                     else: output.values['FC'].add(frequency)
 
                 # Target audience and literary form are restricted to monographs only
                 if 'Language material' in output.values['CT'] and 'Monograph' in output.values['RT']:
-                    try: audience = audiences.get(re.sub(r'[^a-z]', '', field.data[22]), '')
+                    try: audience = audiences.get(keep_characters(field.data[22], LOWER_CASE_LETTERS), '')
                     except: pass
                     else: output.values['TA'].add(audience)
 
-                    try: literary_form = literary_forms.get(re.sub(r'[^01a-z]', '', field.data[33]), '')
+                    try: literary_form = literary_forms.get(keep_characters(field.data[33], LITERARY_FORM_CHARACTERS), '')
                     except: pass
                     else: output.values['LF'].add(literary_form)                
 
-                try: language = languages.get(re.sub(r'[^a-z]', '', field.data[35:38]), '')
+                try: language = languages.get(keep_characters(field.data[35:38], LOWER_CASE_LETTERS), '')
                 except: pass
                 else: output.values['LA'].add(language)
 
                 if any (s in output.values['CT'] for s in ['c', 'd', 'j']):
-                    try: form = musical_forms.get(re.sub(r'[^a-z]', '', field.data[18:20]), '')
+                    try: form = musical_forms.get(keep_characters(field.data[18:20], LOWER_CASE_LETTERS), '')
                     except: pass
                     else: output.values['MF'].add(form)
 
@@ -645,7 +1079,7 @@ class Converter(object):
             # Material type qualifier
             for field in record.get_fields('020'):
                 for subfield in field.get_subfields('a'):
-                    subfield = re.sub(r'[^0-9X]', '', subfield.upper())
+                    subfield = keep_characters(subfield.upper(), STANDARD_NUMBER_CHARACTERS)
                     if is_isbn_10(subfield):
                         output.values['IB'].add(isbn_convert(subfield))
                     if is_isbn_13(subfield):
@@ -662,8 +1096,8 @@ class Converter(object):
 
                 for subfield in field.get_subfields('c', cleaning=False):
                     # set cleaning=False to avoid stripping $ from prices in dollars
-                    subfield = re.sub(r'[^0-9£$\u20AC.]', '', subfield.upper().replace('EUR', u'\u20AC'))
-                    if re.sub(r'[^0-9]', '', subfield) != '' and len(subfield) <= 9:
+                    subfield = keep_characters(subfield.upper().replace('EUR', u'\u20AC'), PRICE_CHARACTERS)
+                    if keep_characters(subfield, DIGITS) != '' and len(subfield) <= 9:
                         output.values['PR'].add(subfield)
 
             # 022
@@ -671,12 +1105,12 @@ class Converter(object):
             # IL    # ISSN-L
             for field in record.get_fields('022'):
                 for subfield in field.get_subfields('a'):
-                    subfield = re.sub(r'[^0-9X]', '', subfield.upper())
+                    subfield = keep_characters(subfield.upper(), STANDARD_NUMBER_CHARACTERS)
                     if len(subfield) == 8:
                         output.values['IS'].add(subfield[:4] + '-' + subfield[4:])
 
                 for subfield in field.get_subfields('l'):
-                    subfield = re.sub(r'[^0-9X]', '', subfield.upper())
+                    subfield = keep_characters(subfield.upper(), STANDARD_NUMBER_CHARACTERS)
                     if len(subfield) == 8:
                         output.values['IL'].add(subfield[:4] + '-' + subfield[4:])
 
@@ -711,9 +1145,9 @@ class Converter(object):
             # CD    # Coordinates
             # CA    # Additional notes for cartographic materials
             for field in record.get_fields('034'):
-                scale = '-'.join(sorted('1:{}'.format(re.sub(r'[^0-9]', '', subfield))
+                scale = '-'.join(sorted('1:{}'.format(keep_characters(subfield, DIGITS))
                                         for subfield in field.get_subfields('b')
-                                        if re.sub(r'[^0-9]', '', subfield) != ''))
+                                        if keep_characters(subfield, DIGITS) != ''))
                 if scale != '':
                     output.values['SC'].add(scale)
                 coordinates = ', '.join(field.get_subfields('d', 'e', 'f', 'g', cleaning=False))
@@ -791,7 +1225,7 @@ class Converter(object):
             # LN    # Library of Congress classification
             for field in record.get_fields('050'):
                 for subfield in field.get_subfields('a'):
-                    subfield = re.sub(r'[^0-9A-Z.]', '', subfield.upper())
+                    subfield = keep_characters(subfield.upper(), LC_CLASS_CHARACTERS)
                     if subfield != '':
                         output.values['LN'].add(subfield)
 
@@ -799,7 +1233,7 @@ class Converter(object):
             # DW    # Dewey classification
             for field in record.get_fields('082'):
                 for subfield in field.get_subfields('a'):
-                    subfield = re.sub(r'[^0-9.]', '', subfield)
+                    subfield = keep_characters(subfield, DECIMAL_CHARACTERS)
                     if '.' in subfield:
                         subfield = ('0000' + subfield.split('.', 1)[0])[-3:] + '.' \
                                    + subfield.split('.')[1].replace('.', '')
@@ -899,7 +1333,7 @@ class Converter(object):
                     if subfield != '' and 'not given' not in subfield:
                         output.values['CA'].add(subfield)
                 for subfield in field.get_subfields('b'):
-                    subfield = re.sub(r'(?<![a-z])proj\.?(?![a-z])', 'projection', subfield, flags=re.IGNORECASE)
+                    subfield = RE_PROJECTION.sub('projection', subfield)
                     if subfield != '':
                         output.values['JK'].add(subfield)
                 for subfield in field.get_subfields('c', cleaning=False):
@@ -921,11 +1355,10 @@ class Converter(object):
                 for subfield in field.get_subfields('a'):
                     subfield = clean_26X(subfield)
                     # Test for a date at the end of the subfield
-                    rx = re.compile('(,\s+|^)(©|\u00A9|c)?[0-9\-]{4}[0-9\-]*($|\s*\()')
-                    if rx.search(subfield):
-                        if not quick_clean(rx.search(subfield).group(0)) == '':
-                            output.values['PU'].add(quick_clean(rx.search(subfield).group(0)))
-                            subfield = quick_clean(subfield.replace(rx.search(subfield).group(0), ''))
+                    if RE_TRAILING_DATE.search(subfield):
+                        if not quick_clean(RE_TRAILING_DATE.search(subfield).group(0)) == '':
+                            output.values['PU'].add(quick_clean(RE_TRAILING_DATE.search(subfield).group(0)))
+                            subfield = quick_clean(subfield.replace(RE_TRAILING_DATE.search(subfield).group(0), ''))
 
                     if ':' in subfield:
                         publishers, states, places = clean_publication_places(subfield.split(':', 1)[0], output.values['PC'])
@@ -952,7 +1385,7 @@ class Converter(object):
 
                 for subfield in field.get_subfields('c'):
                     subfield = clean_26X(subfield)
-                    subfield = quick_clean(re.sub(r'[.\[\]?:;]', '', re.sub(r'\[sic\.?\]', '', subfield, flags=re.IGNORECASE)))
+                    subfield = quick_clean(RE_TITLE_PUNCTUATION.sub('', RE_SIC.sub('', subfield)))
                     if subfield != '':
                         output.values['PU'].add(subfield)
                         if RE_YEAR_POST_1500.search(subfield) is not None:
@@ -971,7 +1404,7 @@ class Converter(object):
             # PJ    # Projected publication date
             for field in record.get_fields('263'):
                 for subfield in field.get_subfields('a'):
-                    subfield = re.sub(r'[^0-9]', '', subfield)
+                    subfield = keep_characters(subfield, DIGITS)
                 if len(subfield) == 6:
                     output.values['PJ'].add(subfield[0:4] + '-' + subfield[4:])
                 elif len(subfield) == 4:
@@ -995,8 +1428,8 @@ class Converter(object):
                 for subfield in field.get_subfields('b'):
                     dates.add(get_date_range(subfield))
                 dates = ' ; '.join(dates).replace('- ; -', '-')
-                if len(re.sub(r'[^;]', '', dates)) == 1:
-                    dates = re.sub(r'\s+', ' ', re.sub(r'([^;]*);([^;]*)', r'\2 ; \1', dates)).replace(
+                if dates.count(';') == 1:
+                    dates = RE_WHITESPACE.sub(' ', RE_SWAP_SEMICOLON.sub(r'\2 ; \1', dates)).replace(
                         '- ; -', '-').strip()
                 dates = quick_clean(dates)
                 if dates != '' and frequency != '':
@@ -1039,8 +1472,8 @@ class Converter(object):
                 date_range = clean_362(field, start_year, end_year)
                 pg.add(date_range)
             pg = ' ; '.join(pg).replace('- ; -', '-')
-            if len(re.sub(r'[^;]', '', pg)) == 1:
-                pg = re.sub(r'\s+', ' ', re.sub(r'([^;]*);([^;]*)', r'\2 ; \1', pg)).replace('- ; -', '-').strip()
+            if pg.count(';') == 1:
+                pg = RE_WHITESPACE.sub(' ', RE_SWAP_SEMICOLON.sub(r'\2 ; \1', pg)).replace('- ; -', '-').strip()
             for sub_range in pg.split(';'):
                 output.values['PG'].add(sub_range.strip())
                 output.values['FA'].add(sub_range.strip())
@@ -1153,21 +1586,11 @@ class Converter(object):
                     # For newspapers, geographical subject headings
                     # are also used to detect country and place of publication
                     if self.profile == 'N' and len(output.values['PC']) == 0:
-                        for country in countries.values():
+                        for country in COUNTRY_NAMES:
                             if country in subfield: output.values['PC'].add(country)
                         subfield = subfield.title()
-                        if subfield in PLACES_ENGLAND:
-                            output.values['PC'].add('England')
-                        elif subfield in PLACES_IRELAND:
-                            output.values['PC'].add('Ireland')
-                        elif subfield in PLACES_N_IRELAND:
-                            output.values['PC'].add('Northern Ireland')
-                        elif subfield in PLACES_SCOTLAND:
-                            output.values['PC'].add('Scotland')
-                        elif subfield in PLACES_WALES:
-                            output.values['PC'].add('Wales')
-                        elif subfield in PLACES_US:
-                            output.values['PC'].add('United States of America')
+                        if subfield in PLACE_STATES:
+                            output.values['PC'].add(PLACE_STATES[subfield])
                         elif 'Great Britain' in subfield:
                             output.values['PC'].add('United Kingdom')
                         for city in PLACES:
@@ -1222,7 +1645,7 @@ class Converter(object):
                         subfield = expand_place_abbreviations(subfield, output.values['PC'])
                         place = add_string(subfield, place, '--')
                         output.values['CC'].add(subfield)
-                        if subfield in countries.values(): output.values['PC'].add(subfield)
+                        if subfield in COUNTRY_NAMES: output.values['PC'].add(subfield)
                     # $b - First-order political jurisdiction (NR)
                     for subfield in field.get_subfields('b'):
                         subfield = expand_place_abbreviations(subfield, output.values['PC'])
@@ -1239,23 +1662,13 @@ class Converter(object):
                     for subfield in field.get_subfields('d'):
                         subfield = expand_place_abbreviations(subfield, output.values['PC'])
                         output.values['CY'].add(subfield)
-                        if subfield in PLACES_ENGLAND:
-                            output.values['PC'].add('England')
-                        elif subfield in PLACES_IRELAND:
-                            output.values['PC'].add('Ireland')
-                        elif subfield in PLACES_N_IRELAND:
-                            output.values['PC'].add('Northern Ireland')
-                        elif subfield in PLACES_SCOTLAND:
-                            output.values['PC'].add('Scotland')
-                        elif subfield in PLACES_WALES:
-                            output.values['PC'].add('Wales')
-                        elif subfield in PLACES_US:
-                            output.values['PC'].add('United States of America')
+                        if subfield in PLACE_STATES:
+                            output.values['PC'].add(PLACE_STATES[subfield])
                     output.values['CG'].add(place)
                 else:
                     for subfield in field.get_subfields('a'):
                         subfield = expand_place_abbreviations(subfield, output.values['PC'])
-                        if subfield in countries.values(): output.values['PC'].add(subfield)
+                        if subfield in COUNTRY_NAMES: output.values['PC'].add(subfield)
                     for subfield in field.get_subfields('b', 'c', 'd'):
                         subfield = expand_place_abbreviations(subfield, output.values['PC'])
                         output.values['PP'].add(subfield)
@@ -1280,7 +1693,7 @@ class Converter(object):
                 for subfield in field.get_subfields('b', 'c', 'd', 'g', 'h', 'i', 'k', 'm', 'n', 'o', 'r', 's', 't', 'z'):
                     notes = add_string(subfield, notes, '. ')
                 for subfield in field.get_subfields('x'):
-                    subfield = re.sub(r'[^0-9xX]', '', subfield)
+                    subfield = keep_characters(subfield, ISSN_CHARACTERS)
                     if len(subfield) == 8:
                         notes = add_string('(ISSN: {}-{})'.format(subfield[:4], subfield[4:]), notes, ' ')
                 if notes != '':
@@ -1310,7 +1723,7 @@ class Converter(object):
                 for subfield in field.get_subfields('b', 'c', 'd', 'g', 'h', 'i', 'k', 'm', 'n', 'o', 'r', 's', 't', 'z'):
                     notes = add_string(subfield, notes, '. ')
                 for subfield in field.get_subfields('x'):
-                    subfield = re.sub(r'[^0-9xX]', '', subfield)
+                    subfield = keep_characters(subfield, ISSN_CHARACTERS)
                     if len(subfield) == 8:
                         notes = add_string('(ISSN: {}-{})'.format(subfield[:4], subfield[4:]), notes, ' ')
                 if notes != '':
@@ -1342,7 +1755,7 @@ class Converter(object):
                 for subfield in field.get_subfields('b', 'c', 'd', 'g', 'h', 'i', 'k', 'm', 'n', 'o', 'r', 's', 't', 'z'):
                     notes = add_string(subfield, notes, '. ')
                 for subfield in field.get_subfields('x'):
-                    subfield = re.sub(r'[^0-9xX]', '', subfield)
+                    subfield = keep_characters(subfield, ISSN_CHARACTERS)
                     if len(subfield) == 8:
                         notes = add_string('(ISSN: {}-{})'.format(subfield[:4], subfield[4:]), notes, ' ')
                 if notes != '':
@@ -1389,25 +1802,15 @@ class Converter(object):
             for field in record.get_fields('866'):
                 for subfield in field.get_subfields('a'):
                     subfield = subfield.replace('.', ' ')
-                    subfield = re.sub(
-                        r'(^newspaper library\s*:?|^newspapers\s*:|[\s\(:\[]*print\s*(copies|issues)?\s*(is|are)?\s*not\s*(made)?\s*available\s*(for\s*conservations?\s*reas[on]*s)?\s*(whe(n|re)\s*(an\s*alternative\s*(format)?\s*(version)?|a\s*micrf?ofilm\s*alternative)\s*exists?)?\.?\]?)',
-                        '', subfield, flags=re.IGNORECASE)
-                    subfield = re.sub(
-                        r'[\s\(see separate record for microfilm holdings|:\[]*(\-*\s*microfilm (is|will be) available (at a later date)?|(see)?\s*all editions microfilm is available for \'kentish express\')[\.:,\)\]]*',
-                        '', subfield, flags=re.IGNORECASE)
+                    subfield = RE_866_PRINT_NOT_AVAILABLE.sub('', subfield)
+                    subfield = RE_866_MICROFILM_AVAILABLE.sub('', subfield)
                     subfield = quick_clean(subfield)
                     if 'micro' not in subfield.lower():
                         output.values['HA'].add(expand_abbreviations(subfield, plurals=False, case=False))
-                    subfield = re.sub(
-                        r'[\s\(:\[]*(newspapers|newspaper\s*library|(please)?\s*see\s*(also)?\s*sep[ae]rate\s*record\s*for\s*(microfilm|print)\s*holdings|(please)?\s*see\s*(microfilm|print)\s*record|(microfilm|print)\s*holdings\s*only|some\s*issues\s*are\s*held\s*in\s*(microfilm|print)\s*only|(microfilm|print)\s*is\s*available|microfilms?\s*of\s*varied\s*quality\s*with\s*imperfect\s*holdings|for\s*holdings\s*of\s*this\s*title,?\s*(please)?\s*see\s*record|(print|microfilm)\s*for\s*(this\s*title\s*is\s*available\s*on\s*that)\s*for\s*\'[^\']+\'|see\s*\'[^\']+\'\s*(microfilm)?\s*record\s*for\s*(print|microfilm)\s*holdings|for\s*issues\s*(to)?\s*[0-9]{4}\s*(onwards)?,?\s*see\s*(microfilm|print)|ISSN\s*[0-9]{4}\-[0-9]{4})\s*[\.:,\)\]]*',
-                        '', subfield, flags=re.IGNORECASE)
-                    subfield = re.sub(
-                        r'[\s\(:\[]*(all\s*editions\s*microfilm|microfilm\s*will\s*be\s*available\s*at\s*a\s*later\s*date|this\s*record\s*has\s*holdings\s*for\s*both\s*print\s*and\s*microfilm\s*versions|(for)?\s*(earlier|later)?\s*issues\s*(to)?\s*[0-9,\-\s]*\s*(available\s*[io]n|(please)?\s*see)\s*(microfilm|print)\s*(holdings)?)\s*[\.:,\)\]]*',
-                        '', subfield, flags=re.IGNORECASE)
-                    subfield = re.sub(
-                        r'[\s\(:\[]*(n\s*s\s*|(new|original)\s*series|nuova\s*serie|feest\-?nummer|nouvelle\s*s.rie|extra\s*no|no\s*di\s*propaganda|numero\s*(unico|sp.cimen|extraordinario|de\s*reprise)|(centenary\s*souvenir|centennial)\s*number|cyfres\s*newydd|ekstranummer|(pilot|preview|registration)\s*issues?|print|proefnummer|foglio\s*unico|supplement\s*only|sic|see|etc|weekly\s*eds?|extraordinary\s*numbers?)[\.:,\)\]]*',
-                        '', subfield, flags=re.IGNORECASE)
-                    subfield = re.sub(r'(?<![a-z])(no|yr|year|vol)\s+[0-9\-,\s]+', '', subfield, flags=re.IGNORECASE)
+                    subfield = RE_866_SEPARATE_RECORD.sub('', subfield)
+                    subfield = RE_866_MICROFILM_NOTES.sub('', subfield)
+                    subfield = RE_866_SERIES.sub('', subfield)
+                    subfield = RE_866_ENUMERATION.sub('', subfield)
                     subfield = quick_clean(subfield)
                     (first, last) = get_holdings_years(subfield, start_year, end_year)
                     output.values['HF'].add(first)
@@ -1417,7 +1820,7 @@ class Converter(object):
             # Check whether there is 903 $9 AQN $a L7 (for newspapers not retained)
             # 8F    # 852 holdings flag
             for field in record.get_fields('903'):
-                if '9' in field.subfields:
+                if '9' in field:
                     output.values['8F'].add('L7')
 
             for field in record.get_fields('AQN'):
@@ -1454,10 +1857,10 @@ class Converter(object):
             # NL    # Link to digitised resource
             for field in record.get_fields('944', 'NID'):
                 for subfield in field.get_subfields('a'):
-                    subfield = re.sub(r'[^0-9]', '', subfield)
+                    subfield = keep_characters(subfield, DIGITS)
                     output.values['ND'].add(subfield)
-                    if subfield in self.nid_urls:
-                        for item in self.nid_urls[subfield]:
+                    for nid_index in self.nid_indexes:
+                        for item in nid_index.urls(subfield):
                             output.values['NL'].add(item)
 
             # Remove null values from output
@@ -1480,11 +1883,28 @@ class Converter(object):
 
     def marc2rf_researcherFormat(self):
         """Convert MARC records to Researcher Format."""
+        # Set locale to assist with sorting
+        locale.setlocale(locale.LC_ALL, '')
         self.show_header()
         records, names, titles, topics, classification, mfile = None, None, None, None, None, None
 
         # Check file locations
-        marc_folder, marc_file, marc_ext = check_file_location(self.marc_path, 'MARC records', '.lex', True)
+        self.marc_paths = marc_paths(self.marc_path)
+        if not self.marc_paths:
+            exit_prompt('Error: The specified MARC records file cannot be found')
+        for path in self.marc_paths:
+            check_file_location(split_compressed_ext(path)[0], 'MARC records')
+            if marc_format(path) not in MARC_EXTENSIONS:
+                exit_prompt('Error: The specified file should have one of the extensions {}'.format(', '.join(MARC_EXTENSIONS)))
+            if marc_format(path) != marc_format(self.marc_paths[0]):
+                exit_prompt('Error: Files of MARC records must all be in the same format')
+            if not os.path.isfile(path):
+                exit_prompt('Error: The specified MARC records file {} cannot be found'.format(path))
+            if split_compressed_ext(path)[1] == '.zst' and zstandard is None:
+                exit_prompt('Error: The zstandard package must be installed to read {}'.format(path))
+        # Output files are named after the first file of MARC records
+        marc_folder, marc_file, marc_ext = check_file_location(split_compressed_ext(self.marc_paths[0])[0],
+                                                               'MARC records')
         if self.request_path != '':
             request_folder, request_file, request_ext = check_file_location(self.request_path, 'request message', '.msg', True)
         if self.output_folder != '':
@@ -1495,17 +1915,23 @@ class Converter(object):
                 exit_prompt('Error: Could not create folder for output files')
         if len(self.options) > 1:
             exit_prompt('Error: too many optional parameters specified')
+        if self.select and self.request_path == '':
+            exit_prompt('Error: REQUEST_PATH must be specified to select records')
 
         # --------------------
         # Parameters seem OK => start program
         # --------------------
 
         # Display confirmation information about the transformation
-        print('Input file: {}'.format(marc_file + marc_ext))
+        if len(self.marc_paths) > 1:
+            print('Input files: {} files, starting with {}'.format(str(len(self.marc_paths)), os.path.basename(self.marc_paths[0])))
+        else: print('Input file: {}'.format(os.path.basename(self.marc_paths[0])))
         if self.request_path != '':
             print('Request message: {}'.format(request_file + request_ext))
         if self.output_folder != '':
             print('Output folder: {}'.format(self.output_folder))
+        if self.select:
+            print('Selecting records using criteria in request message')
         if self.debug:
             print('Debug mode')
             print('options: {}'.format(str(self.options)))
@@ -1525,23 +1951,23 @@ class Converter(object):
                 line = clean_msg(line)
                 if 'End of coded parameters' in line: break
                 if '=' in line:
-                    p, vals = line.split('=', 1)[0].strip(), re.sub(r'^ ', '', line.split('=', 1)[-1])
+                    p, vals = line.split('=', 1)[0].strip(), RE_LEADING_SPACE.sub('', line.split('=', 1)[-1])
                     if p != '' and vals != '':
                         if self.debug:
                             try: print('Parameter: {}\nValues: {}\n'.format(p, vals))
                             except: pass
                         if p == 'o':
-                            for v in re.sub(r'[^a-zA-Z0-9|]', '.', vals).split('|'):
+                            for v in RE_NOT_FIELD_CHARACTER.sub('.', vals).split('|'):
                                 if v in self.output_fields.values:
                                     self.output_fields.values[v] = True
-                        elif p == 'v' and (re.sub(r'[^rtnscRTNSC|]', '', vals) == vals):
+                        elif p == 'v' and only_characters(vals, 'rtnscRTNSC|'):
                             vals = vals.lower()
                             self.file_records = 'r' in vals
                             self.file_titles = 't' in vals
                             self.file_names = 'n' in vals
                             self.file_topics = 's' in vals
                             self.file_classification = 'c' in vals
-                        elif p == 's' and (re.sub(r'[^beimBEIM|]', '', vals) == vals):
+                        elif p == 's' and only_characters(vals, 'beimBEIM|'):
                             vals = vals.upper()
                             self.bnb = 'B' in vals
                             self.estc = 'E' in vals
@@ -1552,6 +1978,8 @@ class Converter(object):
                                 self.output_fields.headings['PP'] = 'Place of creation/publication'
                                 self.output_fields.headings['PU'] = 'Date of publication (not standardised)'
             msgfile.close()
+            if self.select:
+                self.selector = RecordSelector(os.path.join(request_folder, request_file + request_ext), self.debug)
 
         else:
             if self.debug:
@@ -1678,7 +2106,19 @@ class Converter(object):
                 self.file_topics = get_boolean('Include the Topics file? (Y/N):')
                 self.file_classification = get_boolean('Include the Classification file? (Y/N):')
 
-        self.write_readme()
+        if self.shard == 1:
+            self.write_readme()
+
+        # Any checkpoint from an earlier run is removed, unless the run is being resumed
+        # The shard is not finished until it has converted all of its records, even if it finished before
+        if self.shards > 1:
+            try: os.remove(self.shard_path(DONE_FILE))
+            except: pass
+        if self.resume:
+            self.checkpoint = self.read_checkpoint()
+        else:
+            try: os.remove(self.shard_path(CHECKPOINT_FILE))
+            except: pass
 
         if self.file_records and self.profile != 'M':
             records_header = '"' + \
@@ -1689,8 +2129,7 @@ class Converter(object):
             elif self.profile == 'F': records_name = marc_file + '_FRBRized.csv'
             elif self.profile == 'M': records_name = marc_file + '.csv'
             else: records_name = 'records.csv'
-            records = open(os.path.join(self.output_folder, records_name), mode='w', encoding='utf-8', errors='replace')
-            records.write(records_header)
+            records = self.open_output(records_name, records_header)
 
         if self.file_names:
             names_header = '"' + '","'.join(s for s in ['Name', 'Dates associated with name', 'Type of name', 'Role',
@@ -1700,8 +2139,7 @@ class Converter(object):
                                                         '","'.join(self.output_fields.headings[v] for v in self.output_fields.values
                                                                    if self.output_fields.values[v] and v not in ['AA', 'AD', 'AT', 'AR', 'II', 'VF', 'AN'])
                                                         ] if s != '') + '"\n'
-            names = open(os.path.join(self.output_folder, 'names.csv'), mode='w', encoding='utf-8', errors='replace')
-            names.write(names_header)
+            names = self.open_output('names.csv', names_header)
 
         if self.file_titles:
             titles_header = '"' + '","'.join(['Title', 'Other titles',
@@ -1709,72 +2147,31 @@ class Converter(object):
                                                   self.output_fields.headings[v] for v in self.output_fields.values
                                                   if self.output_fields.values[v] and v not in ['TT', 'TV', 'TU', 'TK'])
                                               ]) + '"\n'
-            titles = open(os.path.join(self.output_folder, 'titles.csv'), mode='w', encoding='utf-8', errors='replace')
-            titles.write(titles_header)
+            titles = self.open_output('titles.csv', titles_header)
 
         if self.file_topics:
             topics_header = '"' + '","'.join(['Topic', 'Type of topic',
                                               '","'.join(self.output_fields.headings[v] for v in self.output_fields.values
                                                          if self.output_fields.values[v] and v != 'SU')
                                               ]) + '"\n'
-            topics = open(os.path.join(self.output_folder, 'topics.csv'), mode='w', encoding='utf-8', errors='replace')
-            topics.write(topics_header)
+            topics = self.open_output('topics.csv', topics_header)
 
         if self.file_classification:
             classification_header = '"' + '","'.join(['Dewey classification',
                                                       '","'.join(self.output_fields.headings[v] for v in self.output_fields.values
                                                                  if self.output_fields.values[v] and v != 'DW')
                                                       ]) + '"\n'
-            classification = open(os.path.join(self.output_folder, 'classification.csv'), mode='w', encoding='utf-8', errors='replace')
-            classification.write(classification_header)
+            classification = self.open_output('classification.csv', classification_header)
 
         if self.profile == 'M':
-            records = open(os.path.join(self.output_folder, marc_file + '.csv'), mode='w', encoding='utf-8', errors='replace')
-            # Check which MARC fields are present
-            record_count = 0
-            print('\nChecking which MARC fields are present ...')
-            print('----------------------------------------')
-            print(str(datetime.datetime.now()))
-
-            mfile = open(os.path.join(marc_folder, marc_file + marc_ext), 'rb')
-            reader = MARCReader(mfile)
-            for record in reader:
-                record_count += 1
-                print('\r{0} MARC records processed'.format(str(record_count)), end='\r')
-                for field in record.fields:
-                    if field.tag not in self.fields_present and field.tag in marc_fields:
-                        self.fields_present[field.tag] = []
-            mfile.close()
-            records.write('"' + '","'.join(tag for tag in sorted(self.fields_present) if tag != 'STA') + '"\n')
-            records.write(
-                '"' + '","'.join(marc_fields[tag] for tag in sorted(self.fields_present) if tag != 'STA') + '"\n')
-            print('\n')
+            # The MARC fields present are not known until every record has been converted,
+            # so records are spooled, and written to the CSV file when the conversion is complete
+            records = self.open_output(marc_file + '.csv' + SPOOL_EXT)
 
         if self.profile == 'N':
-            # Build index of NID identifiers and URLs linking to digitized resources
-            record_count = 0
-            print('\nBuilding NID index ...')
-            print('----------------------------------------')
-            print(str(datetime.datetime.now()))
-
-            mfile = open(os.path.join(marc_folder, marc_file + marc_ext), 'rb')
-            reader = MARCReader(mfile)
-            for record in reader:
-                record_count += 1
-                print('\r{0} MARC records processed'.format(str(record_count)), end='\r')
-
-                # 944, NID
-                # ND    # NID (Newspaper ID)
-                for f1 in record.get_fields('944', 'NID'):
-                    for sa in f1.get_subfields('a'):
-                        sa = re.sub(r'[^0-9]', '', sa)
-                        for f2 in record.get_fields('856'):
-                            if sa not in self.nid_urls: self.nid_urls[sa] = set()
-                            for su in f2.get_subfields('u'):
-                                if 'http://www.britishnewspaperarchive.co.uk' in su:
-                                    self.nid_urls[sa].add(su)
-            mfile.close()
-            print('\n')
+            # Index of NID identifiers and URLs linking to digitized resources
+            # Each file of MARC records has its own index
+            self.nid_indexes = [NIDIndex(path, self.debug).open() for path in self.marc_paths]
 
         # --------------------
         # Main transformation
@@ -1785,14 +2182,39 @@ class Converter(object):
         print('----------------------------------------')
         print(str(datetime.datetime.now()))
 
-        record_count = 0
+        # Skip records which will not be output before they are decoded in full
+        if self.shards > 1:
+            self.prefilter_tests.append(self.in_shard)
+            if self.shard_by == 'id': self.prefilter_tags.add('001')
+        if self.profile not in ['F', 'M']:
+            self.prefilter_tests.append(self.is_current)
+            self.prefilter_tags.update(['932', 'STA', 'LDD'])
+        if self.selector and self.selector.tags is not None:
+            self.prefilter_tests.append(self.selector.matches)
+            self.prefilter_tags.update(self.selector.tags)
+
         if self.debug:
-            print('Opening file: {}'.format(str(os.path.join(marc_folder, marc_file + marc_ext))))
-        mfile = open(os.path.join(marc_folder, marc_file + marc_ext), 'rb')
-        reader = MARCReader(mfile)
+            for path in self.marc_paths:
+                print('Opening file: {}'.format(str(path)))
+        if self.prefilter_tests:
+            reader = marc_reader(self.marc_paths, self.prefilter, self.prefilter_tags)
+        else: reader = marc_reader(self.marc_paths)
+        mfile = reader
+        if self.checkpoint is not None:
+            reader.resume(self.checkpoint['offset'], self.checkpoint['records'])
+        self.reader = reader
+        next_checkpoint = reader.count + CHECKPOINT_INTERVAL
+        # Headers are written before the first record
+        sequence = -1
         for record in reader:
-            record_count += 1
-            print('\r{0} MARC records processed'.format(str(record_count)), end='\r')
+            self.end_record(sequence)
+            sequence = reader.count - 1
+            print('\r{0} MARC records processed'.format(str(reader.count)), end='\r')
+            if reader.count > next_checkpoint:
+                # Output for all records before this one has been written
+                self.save_checkpoint(reader.offset, reader.count - 1)
+                next_checkpoint += CHECKPOINT_INTERVAL
+            if self.selector and self.selector.tags is None and not self.selector.matches(record): continue
             output = self.convert_record(record)
 
             # Write record to output file
@@ -1802,13 +2224,10 @@ class Converter(object):
                                                for tag in output.values) + '"\n')
 
             elif self.profile == 'M':
-                if 'STA' not in output.values:
-                    records.write('"' + '","'.join((' ; '.join(sort_quotes(str(p)) for p in output.values[tag]).strip())
-                                                   for tag in sorted(output.values)) + '"\n')
-                elif not (any(s in ''.join(output.values['STA']).lower() for s in
-                            ['deleted', 'suppressed', 'prepublication'])) and len(output.values['001']) > 0:
-                    records.write('"' + '","'.join((' ; '.join(sort_quotes(str(p)) for p in output.values[tag]).strip())
-                                                   for tag in sorted(output.values) if tag != 'STA') + '"\n')
+                # Whether the record is current can only be applied once it is known whether any record has STA
+                current = not STATUS_FLAGS.search(''.join(output.values.get('STA', ''))) and len(output.values.get('001', '')) > 0
+                records.write(json.dumps([current, {tag: (' ; '.join(sort_quotes(str(p)) for p in output.values[tag]).strip())
+                                                    for tag in output.values}], ensure_ascii=False) + '\n')
 
             elif self.profile == 'N':
                 # Limit to UK, Ireland and current UK dependencies removed 2019-03-20
@@ -1819,8 +2238,7 @@ class Converter(object):
                         'tristan da cunha', 'turks and caicos', 'britain', 'british', 'united kingdom',
                         'england', 'wales', 'scotland', 'ireland']) or len(output.values['PC']) == 0:'''
                 # Records must have shelfmarks and not have 'L7' in field AQN $a or 903 $9 (indicated by 8F)
-                if not (any(s in ''.join(output.values['SX']).lower() for s in
-                            ['deleted', 'suppressed', 'prepublication'])) \
+                if not STATUS_FLAGS.search(''.join(output.values['SX'])) \
                         and len(output.values['ID']) > 0 and 'Y' in output.values['8F']:
                     # Delimiter for Newspaper records is | but for all other outputs is ;
                     output_string = '"'
@@ -1835,8 +2253,7 @@ class Converter(object):
 
             else:
 
-                if not (any(s in ''.join(output.values['SX']).lower() for s in
-                            ['deleted', 'suppressed', 'prepublication'])) \
+                if not STATUS_FLAGS.search(''.join(output.values['SX'])) \
                         and len(output.values['ID']) > 0 \
                         and not (len(''.join(output.values['TT'])) <= 5 and len(output.values['AA']) == 0 and len(output.values['PD']) == 0):
 
@@ -1855,7 +2272,7 @@ class Converter(object):
                                             s = add_string(name, s, ' ; ')
                                     output_string += sort_quotes(s) + '","'
                                 elif v == 'SU':
-                                    s = ''
+                                    s, topic = '', ''
                                     for item in output.values['SU']:
                                         if item[0] != '': topic = str(item[0])
                                         s = add_string(topic, s, ' ; ')
@@ -1906,7 +2323,7 @@ class Converter(object):
                                 for v in self.output_fields.values:
                                     if v in output.values and self.output_fields.values[v]:
                                         if v == 'SU':
-                                            s = ''
+                                            s, topic = '', ''
                                             for item3 in output.values['SU']:
                                                 if item3[0] != '': topic = str(item3[0])
                                                 s = add_string(topic, s, ' ; ')
@@ -1943,7 +2360,7 @@ class Converter(object):
                                                 s = add_string(name, s, ' ; ')
                                         output_string += sort_quotes(s) + '","'
                                     elif v == 'SU':
-                                        s = ''
+                                        s, topic = '', ''
                                         for item3 in output.values['SU']:
                                             if item3[0] != '': topic = str(item3[0])
                                             s = add_string(topic, s, ' ; ')
@@ -2007,7 +2424,7 @@ class Converter(object):
                                                     s = add_string(name, s, ' ; ')
                                             output_string += sort_quotes(s) + '","'
                                         elif v == 'SU':
-                                            s = ''
+                                            s, topic = '', ''
                                             for item3 in output.values['SU']:
                                                 if item3[0] != '': topic = str(item3[0])
                                                 s = add_string(topic, s, ' ; ')
@@ -2029,11 +2446,26 @@ class Converter(object):
 
                     gc.collect()
 
+        self.end_record(sequence)
+        if self.debug:
+            print('\n{} MARC records skipped before conversion'.format(str(reader.skipped)))
+
         # Close files
-        for file in [records, names, titles, topics, classification, mfile]:
+        for file in [records, names, titles, topics, classification, mfile] + self.nid_indexes:
             try: file.close()
             except: pass
 
+        if self.profile == 'M' and self.shards == 1:
+            self.write_spooled_records(marc_file + '.csv')
+
+        # The conversion is complete, so the checkpoint is no longer needed
+        # Each shard records that it has finished, so that its parts can be merged
+        if self.shards > 1:
+            with open(self.shard_path(DONE_FILE), mode='w', encoding='utf-8') as f:
+                json.dump({'parameters': self.checkpoint_parameters(), 'records': reader.count}, f)
+        try: os.remove(self.shard_path(CHECKPOINT_FILE))
+        except: pass
+
 
 class ConfigWriter(object):
     """A class for writing config files.
@@ -2067,6 +2499,170 @@ class ConfigWriter(object):
         if self.header:
             print(self.header)
 
+    def read_request(self, request_path):
+        """Read selection parameters from a request message.
+
+        :param request_path: Path to Outlook message containing details of the request.
+        """
+        msgfile = open(request_path, mode='r', encoding='utf-8', errors='replace')
+        for filelineno, line in enumerate(msgfile):
+            line = clean_msg(line)
+            if 'Coded parameters for your transformation' in line: break
+        for filelineno, line in enumerate(msgfile):
+            line = clean_msg(line)
+            if 'End of coded parameters' in line: break
+            if '=' in line:                
+                p, vals = line.split('=', 1)[0].strip(), RE_LEADING_SPACE.sub('', line.split('=', 1)[-1])
+                if p != '' and vals != '':
+                    if self.debug:
+                        try: print('Parameter: {}\nValues: {}\n'.format(p, vals))
+                        except: pass
+                    if p == 'txt':
+                        for v in vals.split('|'):
+                            self.parameters[p].add(v)
+                    elif p in ['cp1', 'l1']:
+                        for v in RE_NOT_CODE_CHARACTER.sub('', vals.lower()).split('|'):
+                            if 2 <= len(v) <= 3:
+                                self.parameters[p].add((v + ' ')[:3])
+                    elif p == 'dw':
+                        for v in keep_characters(vals, '0123456789.-;').split(';'):
+                            self.parameters['dw'].add(v)
+                    elif p in ['d1', 'd2'] and len(keep_characters(vals, DIGITS)) >= 4:
+                        self.parameters[p] = keep_characters(vals, DIGITS)[:4]
+                    elif p in ['os1', 'os2']:
+                        if keep_characters(vals.lower(), LOWER_CASE_LETTERS) == 'on':
+                            self.parameters[p] = True
+                    elif p == 's':
+                        self.parameters[p] = set(keep_characters(vals, LETTERS))
+                    elif p == 'or':
+                        if 'u' in vals:
+                            self.parameters['or2'] = set('cdj')
+                        self.parameters['or1'] = set(keep_characters(vals, 'temidv'))
+        msgfile.close()
+
+        # Dates
+        if self.parameters['d1'] != '' and self.parameters['d2'] == '':
+            self.parameters['d2'] = '9999'
+        if self.parameters['d2'] != '' and self.parameters['d1'] == '':
+            self.parameters['d1'] = '0000'
+
+    def valid_dates(self):
+        """Return True if the request specifies a valid date range."""
+        return self.parameters['d1'] != '' and self.parameters['d2'] != '' \
+            and is_number(self.parameters['d1']) and is_number(self.parameters['d2']) \
+            and float(self.parameters['d1']) <= float(self.parameters['d2'])
+
+    def dewey_patterns(self):
+        """Return a list of regular expressions matching the start of
+        Dewey numbers within the requested Dewey ranges."""
+        patterns = []
+        # Ranges contained within other ranges are redundant
+        for class_range in DeweyRanges(self.parameters['dw']).class_ranges:
+            if '-' in class_range:
+                # Save start and end of range
+                start_dewey, end_dewey = class_range.split('-', 1)
+                start_dewey = normalize_dewey(start_dewey)
+                end_dewey = normalize_dewey(end_dewey)
+                if self.debug:
+                    print('Start of Dewey range: {}'.format(start_dewey))
+                    print('End of Dewey range: {}'.format(end_dewey))
+                # Check end of range exceeds start of range
+                if start_dewey != '' and end_dewey != '':
+                    j = 0
+                    if float(end_dewey) >= float(start_dewey):
+                        # Find first position where start and end ranges differ
+                        # Count starts from 0 and includes decimal point
+                        if start_dewey[0] == end_dewey[0]:
+                            while j in range(len(start_dewey)) and start_dewey[j] == end_dewey[j]:
+                                j += 1
+                        if self.debug:
+                            print('Start and end ranges differ at position {}'.format(str(j)))
+
+                        k = len(start_dewey) - 1
+                        while k > j:
+                            if self.debug: print('k: {}'.format(str(k)))
+                            if k != 3:
+                                if k == len(start_dewey) - 1:
+                                    last_digit = start_dewey[k]
+                                elif k in range(len(start_dewey)):
+                                    last_digit = str(int(start_dewey[k]) + 1)
+                                else:
+                                    last_digit = '0'
+
+                                number = '{}[{}-9]'.format(start_dewey[:k], last_digit).replace('[9-9]', '9')
+                                if 0 <= k <= 1:
+                                    number += '[0-9]' * (2 - k)
+                                number = normalize_dewey(number, escapes=True)
+
+                                if number != '' and last_digit != '10':
+                                    patterns.append(number)
+                            k -= 1
+
+                        if k == j:
+                            if self.debug: print('k: {}'.format(str(k)))
+                            if k != 3:
+                                number = ''
+                                if k == len(start_dewey) - 1:
+                                    number = RE_REPEATED_DIGIT_RANGE.sub('\1', '{}[{}-{}]'.format(
+                                        start_dewey[:k], str(int(start_dewey[k])), str(int(end_dewey[k]))))
+                                elif int(start_dewey[k]) + 1 <= int(end_dewey[k]) - 1:
+                                    number = RE_REPEATED_DIGIT_RANGE.sub('\1', '{}[{}-{}]'.format(
+                                        start_dewey[:k], str(int(start_dewey[k]) + 1), str(int(end_dewey[k]) - 1)))
+
+                                if 0 <= k <= 1:
+                                    number += '[0-9]' * (2 - k)
+                                number = normalize_dewey(number, escapes=True)
+
+                                if number != '':
+                                    patterns.append(number)
+
+                        k = len(end_dewey) - 1
+                        while k > j:
+                            if self.debug: print('k: {}'.format(str(k)))
+                            if k != 3:
+                                if k == len(end_dewey) - 1:
+                                    last_digit = end_dewey[k]
+                                elif k in range(len(end_dewey)):
+                                    last_digit = str(int(end_dewey[k]) - 1)
+                                else:
+                                    last_digit = '9'
+
+                                number = '{}[0-{}]'.format(end_dewey[:k], last_digit).replace('[0-0]', '0')
+                                if 0 <= k <= 1:
+                                    number += '[0-9]' * (2 - k)
+                                number = normalize_dewey(number, escapes=True)
+
+                                if number != '' and last_digit != '-1':
+                                    patterns.append(number)
+                            k -= 1
+            else:
+                class_range = normalize_dewey(class_range, escapes=True)
+                if class_range != '':
+                    patterns.append(class_range)
+        return patterns
+
+    def search_terms(self):
+        """Return a list of search terms from the request.
+
+        Each search term is a list of (subfield code, search string) pairs,
+        all of which must be found within a single field.
+        A subfield code of None indicates that the search string may be found in any subfield.
+        """
+        terms = []
+        for search_string in self.parameters['txt']:
+            search_string = search_string.strip()
+            if search_string != '' and not is_IAMS_id(search_string):
+                if '$' in search_string:
+                    term = []
+                    for subfield in search_string.split('$'):
+                        s = clean_search_string(subfield, escape=False)
+                        if len(s) >= 2:
+                            term.append((s[0], clean_search_string(s[1:])))
+                    terms.append(term)
+                else:
+                    terms.append([(None, clean_search_string(search_string))])
+        return terms
+
     def marc2rf_write_rf_config(self, request_path, output_folder):
         """Prepare config files for selection of MARC records to convert
         to Researcher Format.
@@ -2101,42 +2697,7 @@ class ConfigWriter(object):
         print('----------------------------------------')
         print(str(datetime.datetime.now()))
 
-        msgfile = open(os.path.join(request_folder, request_file + request_ext), mode='r', encoding='utf-8',
-                       errors='replace')
-        for filelineno, line in enumerate(msgfile):
-            line = clean_msg(line)
-            if 'Coded parameters for your transformation' in line: break
-        for filelineno, line in enumerate(msgfile):
-            line = clean_msg(line)
-            if 'End of coded parameters' in line: break
-            if '=' in line:                
-                p, vals = line.split('=', 1)[0].strip(), re.sub(r'^ ', '', line.split('=', 1)[-1])
-                if p != '' and vals != '':
-                    if self.debug:
-                        try: print('Parameter: {}\nValues: {}\n'.format(p, vals))
-                        except: pass
-                    if p == 'txt':
-                        for v in vals.split('|'):
-                            self.parameters[p].add(v)
-                    elif p in ['cp1', 'l1']:
-                        for v in re.sub(r'[^a-z.|\s]', '', vals.lower()).split('|'):
-                            if 2 <= len(v) <= 3:
-                                self.parameters[p].add((v + ' ')[:3])
-                    elif p == 'dw':
-                        for v in re.sub(r'[^0-9.\-;]', '', vals).split(';'):
-                            self.parameters['dw'].add(v)
-                    elif p in ['d1', 'd2'] and len(re.sub(r'[^0-9]', '', vals)) >= 4:
-                        self.parameters[p] = re.sub(r'[^0-9]', '', vals)[:4]
-                    elif p in ['os1', 'os2']:
-                        if re.sub(r'[^a-z]', '', vals.lower()) == 'on':
-                            self.parameters[p] = True
-                    elif p == 's':
-                        self.parameters[p] = set(re.sub(r'[^a-zA-Z]', '', vals))
-                    elif p == 'or':
-                        if 'u' in vals:
-                            self.parameters['or2'] = set('cdj')
-                        self.parameters['or1'] = set(re.sub(r'[^temidv]', '', vals))
-        msgfile.close()
+        self.read_request(os.path.join(request_folder, request_file + request_ext))
 
         if 'I' in self.parameters['s']:
             self.parameters['s'].discard('I')
@@ -2147,13 +2708,7 @@ class ConfigWriter(object):
         selection_criteria = ['', '']
 
         # Dates
-        if self.parameters['d1'] != '' and self.parameters['d2'] == '':
-            self.parameters['d2'] = '9999'
-        if self.parameters['d2'] != '' and self.parameters['d1'] == '':
-            self.parameters['d1'] = '0000'
-        if self.parameters['d1'] != '' and self.parameters['d2'] != '' \
-                and is_number(self.parameters['d1']) and is_number(self.parameters['d2']) \
-                and float(self.parameters['d1']) <= float(self.parameters['d2']):
+        if self.valid_dates():
             output_string = ''
             output_string = add_string(
                 '(FIELD 008 POSITION 7 EQUALS \"[eprst]\") AND (FIELD 008 POSITION 8-11 IN_RANGE \"{}-{}\")'.format(
@@ -2198,119 +2753,27 @@ class ConfigWriter(object):
         # Dewey
         if self.parameters['dw']:
             output_string = ''
-            for class_range in self.parameters['dw']:
-                if '-' in class_range:
-                    # Save start and end of range
-                    start_dewey, end_dewey = class_range.split('-', 1)
-                    start_dewey = normalize_dewey(start_dewey)
-                    end_dewey = normalize_dewey(end_dewey)
-                    if self.debug:
-                        print('Start of Dewey range: {}'.format(start_dewey))
-                        print('End of Dewey range: {}'.format(end_dewey))
-                    # Check end of range exceeds start of range
-                    if start_dewey != '' and end_dewey != '':
-                        j = 0
-                        if float(end_dewey) >= float(start_dewey):
-                            # Find first position where start and end ranges differ
-                            # Count starts from 0 and includes decimal point
-                            if start_dewey[0] == end_dewey[0]:
-                                while j in range(len(start_dewey)) and start_dewey[j] == end_dewey[j]:
-                                    j += 1
-                            if self.debug:
-                                print('Start and end ranges differ at position {}'.format(str(j)))
-
-                            k = len(start_dewey) - 1
-                            while k > j:
-                                if self.debug: print('k: {}'.format(str(k)))
-                                if k != 3:
-                                    if k == len(start_dewey) - 1:
-                                        last_digit = start_dewey[k]
-                                    elif k in range(len(start_dewey)):
-                                        last_digit = str(int(start_dewey[k]) + 1)
-                                    else:
-                                        last_digit = '0'
-
-                                    number = '{}[{}-9]'.format(start_dewey[:k], last_digit).replace('[9-9]', '9')
-                                    if 0 <= k <= 1:
-                                        number += '[0-9]' * (2 - k)
-                                    number = normalize_dewey(number, escapes=True)
-
-                                    if number != '' and last_digit != '10':
-                                        output_string = add_string(
-                                            '(FIELD 082 SUBFIELD a CONTAINS "^{}")'.format(number), output_string, '\n OR ')
-                                k -= 1
-
-                            if k == j:
-                                if self.debug: print('k: {}'.format(str(k)))
-                                if k != 3:
-                                    number = ''
-                                    if k == len(start_dewey) - 1:
-                                        number = re.sub(r'\[(\d)-\1\]', '\1', '{}[{}-{}]'.format(
-                                            start_dewey[:k], str(int(start_dewey[k])), str(int(end_dewey[k]))))
-                                    elif int(start_dewey[k]) + 1 <= int(end_dewey[k]) - 1:
-                                        number = re.sub(r'\[(\d)-\1\]', '\1', '{}[{}-{}]'.format(
-                                            start_dewey[:k], str(int(start_dewey[k]) + 1), str(int(end_dewey[k]) - 1)))
-
-                                    if 0 <= k <= 1:
-                                        number += '[0-9]' * (2 - k)
-                                    number = normalize_dewey(number, escapes=True)
-
-                                    if number != '':
-                                        output_string = add_string(
-                                            '(FIELD 082 SUBFIELD a CONTAINS "^{}")'.format(number), output_string, '\n OR ')
-
-                            k = len(end_dewey) - 1
-                            while k > j:
-                                if self.debug: print('k: {}'.format(str(k)))
-                                if k != 3:
-                                    if k == len(end_dewey) - 1:
-                                        last_digit = end_dewey[k]
-                                    elif k in range(len(end_dewey)):
-                                        last_digit = str(int(end_dewey[k]) - 1)
-                                    else:
-                                        last_digit = '9'
-
-                                    number = '{}[0-{}]'.format(end_dewey[:k], last_digit).replace('[0-0]', '0')
-                                    if 0 <= k <= 1:
-                                        number += '[0-9]' * (2 - k)
-                                    number = normalize_dewey(number, escapes=True)
-
-                                    if number != '' and last_digit != '-1':
-                                        output_string = add_string(
-                                            '(FIELD 082 SUBFIELD a CONTAINS "^{}")'.format(number), output_string, '\n OR ')
-                                k -= 1
-                else:
-                    class_range = normalize_dewey(class_range, escapes=True)
-                    if class_range != '':
-                        output_string = add_string('(FIELD 082 SUBFIELD a CONTAINS "^{}")'.format(class_range), output_string, '\n OR ')
-
+            for number in self.dewey_patterns():
+                output_string = add_string('(FIELD 082 SUBFIELD a CONTAINS "^{}")'.format(number), output_string, '\n OR ')
             selection_criteria[0] = add_string(output_string, selection_criteria[0], '\nAND\n', brackets=True)
 
         # Search strings
         if self.parameters['txt']:
             output_string = ''
-            for search_string in self.parameters['txt']:
-                search_string = search_string.strip()
-                if search_string != '' and not is_IAMS_id(search_string):
-                    if '$' in search_string:
-                        temp = ''
-                        subfields = search_string.split('$')
-                        for j in range(len(subfields)):
-                            s = clean_search_string(subfields[j], escape=False)
-                            if len(s) >= 2:
-                                #temp = add_string('(FIELD 100-499 SUBFIELD {} CONTAINS CASE_INSENSITIVE "{}")'.format(
-                                temp = add_string('SUBFIELD {} CONTAINS CASE_INSENSITIVE "{}"'.format(
-                                    s[0], clean_search_string(s[1:])), temp, ' AND ',
-                                    allow_repeats=True)
-                        output_string = add_string('FIELD 100-499  {}'.format(temp), output_string, '\n OR ', brackets=True)
-                        output_string = add_string('FIELD 600-799  {}'.format(temp), output_string, '\n OR ', brackets=True)
-                        #output_string = add_string(temp.replace('FIELD 100-499 SUBFIELD', 'FIELD 600-799 SUBFIELD'), output_string, '\n OR ', brackets=True)
-                    else:
-                        search_string = clean_search_string(search_string)
-                        output_string = add_string(
-                            '(FIELD 100-499 SUBFIELD. CONTAINS CASE_INSENSITIVE "{}")'.format(search_string), output_string, '\n OR ')
-                        output_string = add_string(
-                            '(FIELD 600-799 SUBFIELD. CONTAINS CASE_INSENSITIVE "{}")'.format(search_string), output_string, '\n OR ')
+            for term in self.search_terms():
+                if term and term[0][0] is None:
+                    search_string = term[0][1]
+                    output_string = add_string(
+                        '(FIELD 100-499 SUBFIELD. CONTAINS CASE_INSENSITIVE "{}")'.format(search_string), output_string, '\n OR ')
+                    output_string = add_string(
+                        '(FIELD 600-799 SUBFIELD. CONTAINS CASE_INSENSITIVE "{}")'.format(search_string), output_string, '\n OR ')
+                else:
+                    temp = ''
+                    for code, search_string in term:
+                        temp = add_string('SUBFIELD {} CONTAINS CASE_INSENSITIVE "{}"'.format(code, search_string), temp,
+                                          ' AND ', allow_repeats=True)
+                    output_string = add_string('FIELD 100-499  {}'.format(temp), output_string, '\n OR ', brackets=True)
+                    output_string = add_string('FIELD 600-799  {}'.format(temp), output_string, '\n OR ', brackets=True)
 
             selection_criteria[1] = add_string(output_string, selection_criteria[1], '\nAND\n', brackets=True)
 
@@ -2326,3 +2789,206 @@ class ConfigWriter(object):
                 if os.stat(file).st_size == 0:
                     os.remove(file)
             except: pass
+
+
+class DeweyRanges(object):
+    """A class for testing whether Dewey numbers fall within a set of Dewey ranges.
+
+    A Dewey range is either a single class, which matches all Dewey numbers beginning with it,
+    or a start and end class separated by a hyphen. The end class is included in the range,
+    together with all Dewey numbers beginning with it.
+
+    Dewey numbers are normalized to 3 digits, optionally followed by a decimal point then more digits,
+    so that they sort as strings in numerical order. Each range becomes an interval of strings,
+    and overlapping intervals are merged so that a Dewey number can be found by binary search.
+
+    :param class_ranges: Dewey ranges, as in the dw parameter of a request.
+    """
+
+    # Sorts after any character in a normalized Dewey number,
+    # so that number + END_OF_CLASS sorts after every number beginning with number
+    END_OF_CLASS = '~'
+
+    def __init__(self, class_ranges):
+        intervals = []
+        for class_range in class_ranges:
+            if '-' in class_range:
+                start, end = class_range.split('-', 1)
+                start, end = self.normalize(start), self.normalize(end)
+                if start == '' or end == '' or end < start: continue
+            else:
+                # A single class is not padded to 3 digits, so that e.g. 8 matches 800-899
+                start = end = self.normalize(class_range, pad=False)
+                if start == '': continue
+            intervals.append((start, end + self.END_OF_CLASS, class_range))
+
+        # Sort by start, then by end in descending order, so that a range follows any range containing it
+        intervals.sort(key=lambda interval: interval[1], reverse=True)
+        intervals.sort(key=lambda interval: interval[0])
+        self.class_ranges = []
+        self.starts, self.ends = [], []
+        for start, end, class_range in intervals:
+            if self.ends and end <= self.ends[-1]: continue
+            self.class_ranges.append(class_range)
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    @staticmethod
+    def normalize(string, pad=True):
+        """Return the Dewey number at the start of a string, with the integer part padded to 3 digits,
+        or an empty string if the string does not start with a Dewey number."""
+        match = RE_DEWEY_NUMBER.match(normalize_dewey(string))
+        if match is None: return ''
+        integer, decimal = match.group(1), match.group(2) or ''
+        if pad: integer = integer.zfill(3)
+        return integer + decimal
+
+    def __bool__(self):
+        return len(self.starts) > 0
+
+    def __contains__(self, dewey):
+        dewey = self.normalize(dewey)
+        if dewey == '': return False
+        i = bisect.bisect_right(self.starts, dewey) - 1
+        return i >= 0 and dewey <= self.ends[i]
+
+
+class RecordSelector(object):
+    """A class for selecting MARC records which meet the criteria in a request.
+
+    The criteria are the same as those written to config files by ConfigWriter,
+    but are tested against each record as it is read.
+
+    :param request_path: Path to Outlook message containing details of the request.
+    :param debug: Display additional output to assist with debugging.
+    """
+
+    def __init__(self, request_path, debug=False):
+        self.debug = debug
+        config = ConfigWriter(debug)
+        config.read_request(request_path)
+        parameters = config.parameters
+        self.tests = []
+        # Tags of the fields needed to test the criteria, or None if the whole record is needed
+        self.tags = set()
+
+        # Dates
+        if config.valid_dates():
+            self.start_date, self.end_date = parameters['d1'], parameters['d2']
+            self.tests.append(self.match_dates)
+            self.tags.add('008')
+
+        # Language
+        if parameters['l1']:
+            self.languages = frozenset(parameters['l1'])
+            self.tests.append(self.match_language)
+            self.tags.add('008')
+
+        # Country of publication
+        if parameters['cp1']:
+            self.countries = frozenset(parameters['cp1'])
+            self.tests.append(self.match_country)
+            self.tags.add('008')
+
+        # BNB number
+        if parameters['os1']:
+            self.tests.append(self.match_bnb_number)
+            self.tags.add('015')
+
+        # BL shelfmark
+        if parameters['os2']:
+            self.tests.append(self.match_shelfmark)
+            self.tags.add('852')
+
+        # Types of resource
+        if parameters['or1']:
+            self.resource_types = frozenset(parameters['or1'])
+            self.tests.append(self.match_resource_type)
+            self.tags.add('007')
+        if parameters['or2']:
+            self.record_types = frozenset(parameters['or2'])
+            self.tests.append(self.match_record_type)
+
+        # Dewey
+        if parameters['dw']:
+            self.dewey = DeweyRanges(parameters['dw'])
+            if self.dewey:
+                self.tests.append(self.match_dewey)
+                self.tags.add('082')
+
+        # Search strings
+        if parameters['txt']:
+            self.search_terms = [[(code, re.compile(search_string, re.IGNORECASE)) for code, search_string in term]
+                                 for term in config.search_terms()]
+            self.tests.append(self.match_search_terms)
+            self.tags = None
+
+        if self.debug:
+            print('Selection tests: {}'.format(', '.join(test.__name__ for test in self.tests)))
+
+    def matches(self, record):
+        """Return True if a record meets all the selection criteria."""
+        for test in self.tests:
+            if not test(record): return False
+        return True
+
+    @staticmethod
+    def get_008(record):
+        for field in record.get_fields('008'):
+            return field.data
+        return ''
+
+    def match_dates(self, record):
+        data = self.get_008(record)
+        date_type, date1, date2 = data[6:7], data[7:11], data[11:15]
+        if date_type != '' and date_type in 'eprst':
+            return date1.isdigit() and len(date1) == 4 and self.start_date <= date1 <= self.end_date
+        if date_type != '' and date_type in 'cdikmqu':
+            return date1.isdigit() and date2.isdigit() and len(date1) == 4 and len(date2) == 4 \
+                and date1 < self.end_date and date2 > self.start_date
+        return False
+
+    def match_language(self, record):
+        data = self.get_008(record)[35:38]
+        return any(c in data for c in self.languages)
+
+    def match_country(self, record):
+        data = self.get_008(record)[15:18]
+        return any(c in data for c in self.countries)
+
+    @staticmethod
+    def match_bnb_number(record):
+        return any('bnb' in field.get_subfields('2', cleaning=False) for field in record.get_fields('015'))
+
+    @staticmethod
+    def match_shelfmark(record):
+        return any(field.get_subfields('h', 'j', cleaning=False) for field in record.get_fields('852'))
+
+    def match_resource_type(self, record):
+        return any(field.data[:1] in self.resource_types for field in record.get_fields('007') if field.data)
+
+    def match_record_type(self, record):
+        return record.leader[6:7] in self.record_types
+
+    def match_dewey(self, record):
+        for field in record.get_fields('082'):
+            for sa in field.get_subfields('a', cleaning=False):
+                if sa in self.dewey: return True
+        return False
+
+    def match_search_terms(self, record):
+        for field in record.fields:
+            if field.is_control_field() or not ('100' <= field.tag <= '499' or '600' <= field.tag <= '799'):
+                continue
+            for term in self.search_terms:
+                if all(self.match_subfields(field, code, pattern) for code, pattern in term):
+                    return True
+        return False
+
+    @staticmethod
+    def match_subfields(field, code, pattern):
+        codes = [code] if code else []
+        return any(pattern.search(value) for value in field.get_subfields(*codes, cleaning=False))
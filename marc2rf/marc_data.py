@@ -3,9 +3,24 @@
 """Classes for MARC records, fields and subfields used in the Researcher Format transformation.
 Code uses elements of https://github.com/edsu/pymarc but with significant modifications."""
 
+# Import required modules
+from array import array
+from xml.etree import ElementTree
+import glob
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+
 # Import required functions
 from marc2rf.cleaning_functions import clean
 
+# zstandard is only needed to read files compressed with zstd
+try: import zstandard
+except: zstandard = None
+
 __author__ = 'Victoria Morris'
 __license__ = 'MIT License'
 __version__ = '1.0.0'
@@ -25,6 +40,14 @@ END_OF_FIELD = chr(0x1E)
 END_OF_RECORD = chr(0x1D)
 ALEPH_CONTROL_FIELDS = ['DB ', 'FMT', 'SYS']
 
+# Extensions of files of MARC records: ISO 2709, MARCXML and line-delimited MARC-in-JSON,
+# and extensions of compressed files of MARC records
+MARC_EXTENSIONS = ['.lex', '.xml', '.json']
+COMPRESSED_EXTENSIONS = ['.gz', '.zst']
+# Size of the blocks in which files of MARC records are read, and number of decompressed blocks read ahead
+BLOCK_SIZE = 4 * 1024 * 1024
+READ_AHEAD = 4
+
 # ====================
 #     Exceptions
 # ====================
@@ -54,18 +77,269 @@ class BaseAddressError(Exception):
     def __str__(self): return 'Error locating base address of record'
 
 
+# ====================
+#      Functions
+# ====================
+
+
+def marc_paths(marc_path):
+    """Function to list the files of MARC records in marc_path.
+
+    marc_path may be a path to a file, a glob pattern matching several files, or several of these
+    separated by os.pathsep; it may also be a list of paths or patterns.
+    Files matching a pattern are listed in order of their names; only files with one of MARC_EXTENSIONS,
+    optionally followed by the extension of a compressed file, are matched.
+    """
+    if isinstance(marc_path, str): marc_path = marc_path.split(os.pathsep)
+    paths = []
+    for pattern in marc_path:
+        if any(c in pattern for c in '*?['):
+            paths.extend(path for path in sorted(glob.glob(pattern))
+                         if marc_format(path) in MARC_EXTENSIONS)
+        elif pattern != '': paths.append(pattern)
+    return paths
+
+
+def split_compressed_ext(path):
+    """Function to split the extension of a compressed file from its path."""
+    base, ext = os.path.splitext(path)
+    if ext.lower() in COMPRESSED_EXTENSIONS: return base, ext.lower()
+    return path, ''
+
+
+def marc_format(path):
+    """Function to return the extension which gives the format of a file of MARC records, e.g. '.lex'."""
+    return os.path.splitext(split_compressed_ext(path)[0])[1].lower()
+
+
+def marc_reader(paths, predicate=None, tags=()):
+    """Function to open a reader for the records in one or more files of MARC records,
+    which must all be in the same format."""
+    formats = set(marc_format(path) for path in paths)
+    if len(formats) != 1 or not formats <= set(MARC_EXTENSIONS):
+        raise ValueError('Files of MARC records must all have the same extension, one of {}'.format(', '.join(MARC_EXTENSIONS)))
+    reader = {'.lex': MARCReader, '.xml': MARCXMLReader, '.json': MARCJSONReader}[formats.pop()]
+    return reader(MARCStream(paths), predicate, tags)
+
+
+def local_name(tag):
+    """Function to remove the namespace from the tag of an XML element."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def is_compressed(path):
+    """Function to check whether a file of MARC records is compressed."""
+    return split_compressed_ext(path)[1] != ''
+
+
+def read_blocks(path, start=0):
+    """Function to read a file of MARC records in blocks.
+
+    Uncompressed files are read from start bytes into the file. Compressed files are read from
+    the beginning, and are decompressed by a background thread, up to READ_AHEAD blocks ahead,
+    so that decompression overlaps with the decoding of records.
+    """
+    if not is_compressed(path):
+        with open(path, 'rb') as file:
+            file.seek(start)
+            while True:
+                block = file.read(BLOCK_SIZE)
+                if not block: return
+                yield block
+
+    blocks, stop = queue.Queue(READ_AHEAD), threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+                return
+            except queue.Full: pass
+
+    def decompress():
+        try:
+            if split_compressed_ext(path)[1] == '.zst':
+                if zstandard is None: raise ImportError('The zstandard package is needed to read {}'.format(path))
+                file = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_size=BLOCK_SIZE,
+                                                                  read_across_frames=True, closefd=True)
+            else: file = gzip.open(path, 'rb')
+            with file:
+                while not stop.is_set():
+                    block = file.read(BLOCK_SIZE)
+                    put(block)
+                    if not block: return
+        except: put(sys.exc_info()[1])
+
+    thread = threading.Thread(target=decompress, daemon=True)
+    thread.start()
+    try:
+        while True:
+            block = blocks.get()
+            if isinstance(block, BaseException): raise block
+            if not block: return
+            yield block
+    finally:
+        stop.set()
+        thread.join()
+
+
 # ====================
 #       Classes
 # ====================
 
 
+class MARCStream(object):
+    """Read one or more files of MARC records, any of which may be compressed with gzip (.gz)
+    or zstd (.zst), as a single stream of bytes.
+
+    Positions used by tell() and seek() are offsets in the uncompressed stream. Seeking to a position
+    in a compressed file means decompressing the file up to that position.
+
+    :param paths: Paths to files of MARC records, in the order in which they are to be read.
+    """
+
+    def __init__(self, paths):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.blocks = None
+        self.rewind()
+
+    def rewind(self):
+        self.close()
+        self.part = -1
+        self.buffer, self.pos, self.offset = b'', 0, 0
+
+    def next_part(self, start=0):
+        """Start reading the next file, from start bytes into it. Return False if there are no more files."""
+        self.close()
+        self.part += 1
+        if self.part >= len(self.paths): return False
+        self.blocks = read_blocks(self.paths[self.part], start)
+        return True
+
+    def read(self, size, across_parts=True):
+        """Read size bytes. If across_parts is False, reading stops at the end of the current file,
+        and next_part() must be called to read the next one."""
+        while len(self.buffer) - self.pos < size:
+            block = next(self.blocks, None) if self.blocks is not None else None
+            if block is None:
+                if self.blocks is not None and not across_parts: break
+                if not self.next_part(): break
+                continue
+            self.buffer = self.buffer[self.pos:] + block
+            self.pos = 0
+        data = self.buffer[self.pos:self.pos + size]
+        self.pos += len(data)
+        self.offset += len(data)
+        return data
+
+    def tell(self):
+        return self.offset
+
+    def seek(self, offset):
+        self.rewind()
+        # Skip whole uncompressed files without reading them
+        while self.part + 1 < len(self.paths) and not is_compressed(self.paths[self.part + 1]):
+            size = os.path.getsize(self.paths[self.part + 1])
+            if offset - self.offset < size:
+                self.next_part(offset - self.offset)
+                self.offset = offset
+                return offset
+            self.part += 1
+            self.offset += size
+        while self.offset < offset and self.read(min(offset - self.offset, BLOCK_SIZE)): pass
+        return self.offset
+
+    def close(self):
+        if self.blocks is not None:
+            self.blocks.close()
+            self.blocks = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class MARCStreamPart(object):
+    """Read the current file of a MARCStream, without continuing to the next file."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def read(self, size=BLOCK_SIZE):
+        return self.stream.read(size, across_parts=False)
+
+
 class MARCReader(object):
+    """Iterate over the records in a file of MARC records.
+
+    If a predicate is given, each record is first decoded with only the fields in tags
+    (together with any linked 880 fields). The predicate is called with this partial record,
+    and if it returns False the record is skipped without being decoded in full.
+
+    The byte offset of the start of the most recent record returned is kept in offset,
+    and the number of records read so far, including those skipped, is kept in count.
+    """
 
-    def __init__(self, marc_target):
+    def __init__(self, marc_target, predicate=None, tags=()):
         # print(str(marc_target))
         super(MARCReader, self).__init__()
         if hasattr(marc_target, 'read') and callable(marc_target.read):
             self.file_handle = marc_target
+        self.predicate = predicate
+        self.tags = frozenset(tags)
+        self.skipped = 0
+        self.offset = 0
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def close(self):
+        if self.file_handle:
+            self.file_handle.close()
+            self.file_handle = None
+
+    def __next__(self):
+        while True:
+            offset = self.file_handle.tell()
+            first5 = self.file_handle.read(5)
+            if not first5: raise StopIteration
+            if len(first5) < 5: raise RecordLengthError
+            marc = first5 + self.file_handle.read(int(first5) - 5)
+            self.count += 1
+            if self.predicate is None or self.predicate(Record(marc, tags=self.tags)):
+                self.offset = offset
+                return Record(marc)
+            self.skipped += 1
+
+    def resume(self, offset, count):
+        """Continue reading from the record at offset, count records into the file."""
+        self.file_handle.seek(offset)
+        self.count = count
+
+
+class MARCXMLReader(object):
+    """Iterate over the records in a file of MARCXML records.
+
+    Records are parsed as the file is read, and discarded once they have been decoded,
+    so memory use does not depend on the size of the file. If marc_target is a MARCStream,
+    each of its files is parsed as a separate XML document.
+
+    A predicate and tags are used as by MARCReader. Since positions in an XML file
+    cannot be used to resume reading it, offset is the number of records read
+    before the most recent record returned.
+    """
+
+    def __init__(self, marc_target, predicate=None, tags=()):
+        self.file_handle = marc_target
+        self.predicate = predicate
+        self.tags = frozenset(tags)
+        self.skipped = 0
+        self.offset = 0
+        self.count = 0
+        self.records = self.read_records()
 
     def __iter__(self):
         return self
@@ -75,19 +349,121 @@ class MARCReader(object):
             self.file_handle.close()
             self.file_handle = None
 
+    def read_records(self):
+        """Generator of the leader and fields of each record."""
+        stream = isinstance(self.file_handle, MARCStream)
+        while True:
+            root = None
+            for event, elem in ElementTree.iterparse(MARCStreamPart(self.file_handle) if stream else self.file_handle,
+                                                     events=('start', 'end')):
+                if root is None: root = elem
+                if event != 'end' or local_name(elem.tag) != 'record': continue
+                leader, fields = '', []
+                for child in elem:
+                    name = local_name(child.tag)
+                    if name == 'leader': leader = child.text or ''
+                    elif name == 'controlfield': fields.append((child.get('tag', ''), None, child.text or ''))
+                    elif name == 'datafield':
+                        fields.append((child.get('tag', ''), [child.get('ind1', ' '), child.get('ind2', ' ')],
+                                       [value for subfield in child if local_name(subfield.tag) == 'subfield'
+                                        for value in (subfield.get('code', ''), subfield.text or '')]))
+                # Remove records which have been read from the tree
+                elem.clear()
+                root.clear()
+                yield leader, fields
+            if not stream or not self.file_handle.next_part(): return
+
+    def __next__(self):
+        while True:
+            leader, fields = next(self.records)
+            self.count += 1
+            if self.predicate is None or self.predicate(Record(leader=leader, fields=fields, tags=self.tags)):
+                self.offset = self.count - 1
+                return Record(leader=leader, fields=fields)
+            self.skipped += 1
+
+    def resume(self, offset, count):
+        """Continue reading from the record count records into the file."""
+        for i in range(count): next(self.records)
+        self.count = count
+
+
+class MARCJSONReader(object):
+    """Iterate over the records in a file of MARC-in-JSON records, with one record on each line.
+
+    Lines are read as the file is read, so memory use does not depend on the size of the file.
+    A predicate and tags are used as by MARCReader, and offset is the byte offset
+    of the start of the line containing the most recent record returned.
+    """
+
+    def __init__(self, marc_target, predicate=None, tags=()):
+        self.file_handle = marc_target
+        self.predicate = predicate
+        self.tags = frozenset(tags)
+        self.skipped = 0
+        self.offset = 0
+        self.count = 0
+        self.lines = self.read_lines()
+
+    def __iter__(self):
+        return self
+
+    def close(self):
+        if self.file_handle:
+            self.file_handle.close()
+            self.file_handle = None
+
+    def read_lines(self):
+        """Generator of the byte offset and text of each line which is not blank.
+        A line is not continued from one file of a MARCStream to the next."""
+        stream = isinstance(self.file_handle, MARCStream)
+        offset, buffer = self.file_handle.tell(), b''
+        while True:
+            block = self.file_handle.read(BLOCK_SIZE, across_parts=False) if stream else self.file_handle.read(BLOCK_SIZE)
+            if not block:
+                if buffer.strip(): yield offset, buffer
+                if not stream or not self.file_handle.next_part(): return
+                offset, buffer = self.file_handle.tell(), b''
+                continue
+            lines = (buffer + block).split(b'\n')
+            buffer = lines.pop()
+            for line in lines:
+                if line.strip(): yield offset, line
+                offset += len(line) + 1
+
     def __next__(self):
-        first5 = self.file_handle.read(5)
-        if not first5: raise StopIteration
-        if len(first5) < 5: raise RecordLengthError
-        return Record(first5 + self.file_handle.read(int(first5) - 5))
+        while True:
+            offset, line = next(self.lines)
+            data = json.loads(line.decode('utf-8'))
+            fields = []
+            for field in data.get('fields', []):
+                for tag, value in field.items():
+                    if isinstance(value, dict):
+                        fields.append((tag, [value.get('ind1', ' '), value.get('ind2', ' ')],
+                                       [item for subfield in value.get('subfields', [])
+                                        for code, text in subfield.items() for item in (code, text)]))
+                    else: fields.append((tag, None, value))
+            self.count += 1
+            if self.predicate is None or self.predicate(Record(leader=data.get('leader', ''), fields=fields, tags=self.tags)):
+                self.offset = offset
+                return Record(leader=data.get('leader', ''), fields=fields)
+            self.skipped += 1
+
+    def resume(self, offset, count):
+        """Continue reading from the record at offset, count records into the file."""
+        self.file_handle.seek(offset)
+        self.count = count
+        self.lines = self.read_lines()
 
 
 class Record(object):
-    def __init__(self, data='', leader=' ' * LEADER_LEN):
+    __slots__ = ('leader', 'fields')
+
+    def __init__(self, data='', leader=' ' * LEADER_LEN, tags=None, fields=None):
         self.leader = '{}22{}4500'.format(leader[0:10], leader[12:20])
         self.fields = list()
-        self.pos = 0
-        if len(data) > 0: self.decode_marc(data)
+        if len(data) > 0: self.decode_marc(data, tags)
+        elif fields is not None: self.decode_fields(leader, fields, tags)
 
     def __str__(self):
         text_list = ['=LDR  {}'.format(self.leader)]
@@ -104,13 +480,7 @@ class Record(object):
         return len(fields) > 0
 
     def __iter__(self):
-        self.__pos = 0
-        return self
-
-    def __next__(self):
-        if self.__pos >= len(self.fields): raise StopIteration
-        self.__pos += 1
-        return self.fields[self.__pos - 1]
+        return iter(self.fields)
 
     def add_field(self, *fields):
         self.fields.extend(fields)
@@ -124,7 +494,10 @@ class Record(object):
         if len(args) == 0: return self.fields
         return [f for f in self.fields if (f.tag in args or (q880 and f.tag == '880' and '6' in f and str(f['6'])[:3] in args))]
 
-    def decode_marc(self, marc):
+    def decode_marc(self, marc, tags=None):
+        """Decode a record from MARC21 transmission format.
+        If tags is specified, only fields with those tags (and 880 fields) are decoded.
+        """
         # Extract record leader
         try: self.leader = marc[0:LEADER_LEN].decode('ascii')
         except: print('Record has problem with and cannot be processed')
@@ -151,6 +524,9 @@ class Record(object):
             entry_end = entry_start + DIRECTORY_ENTRY_LEN
             entry = directory[entry_start:entry_end]
             entry_tag = entry[0:3]
+            if tags is not None and entry_tag not in tags and not (q880 and entry_tag == '880'):
+                field_count += 1
+                continue
             entry_length = int(entry[3:7])
             entry_offset = int(entry[7:12])
             entry_data = marc[base_address + entry_offset:base_address + entry_offset + entry_length - 1]
@@ -161,34 +537,41 @@ class Record(object):
             elif str(entry_tag) in ALEPH_CONTROL_FIELDS:
                 field = Field(tag=entry_tag, data=entry_data.decode('utf-8'))
 
-            else:
-                subfields = list()
-                subs = entry_data.split(SUBFIELD_INDICATOR.encode('ascii'))
-                # Missing indicators are recorded as blank spaces.
-                # Extra indicators are ignored.
-
-                subs[0] = subs[0].decode('ascii') + '  '
-                first_indicator, second_indicator = subs[0][0], subs[0][1]
-
-                for subfield in subs[1:]:
-                    if len(subfield) == 0: continue
-                    try: code, data = subfield[0:1].decode('ascii'), subfield[1:].decode('utf-8', 'strict')
-                    except: print('Error in subfield code')
-                    else:
-                        subfields.append(code)
-                        subfields.append(data)
-                field = Field(
-                    tag=entry_tag,
-                    indicators=[first_indicator, second_indicator],
-                    subfields=subfields,
-                )
+            else: field = Field.decode(entry_tag, entry_data)
             self.add_field(field)
             field_count += 1
 
         if field_count == 0: raise FieldsError
 
+    def decode_fields(self, leader, fields, tags=None):
+        """Decode a record from a leader and a list of fields read from MARCXML or MARC-in-JSON.
+        Each field is a tuple of its tag, its indicators (None for a control field),
+        and either its data or a list of alternating subfield codes and values.
+        If tags is specified, only fields with those tags (and 880 fields) are decoded.
+        """
+        # Lengths and addresses in the leader are not used when reading MARCXML or MARC-in-JSON,
+        # so a missing or short leader is padded with blanks rather than rejected
+        self.leader = (str(leader) if leader else '').ljust(LEADER_LEN)[:LEADER_LEN]
+        for tag, indicators, data in fields:
+            if tags is not None and tag not in tags and not (q880 and tag == '880'): continue
+            # As for MARC21 transmission format, the tag determines whether a field is a control field
+            if (tag < '010' and tag.isdigit()) or tag in ALEPH_CONTROL_FIELDS:
+                self.add_field(Field(tag=tag, data=data if indicators is None else ''.join(data)))
+            elif indicators is None: self.add_field(Field(tag=tag, indicators=[' ', ' ']))
+            else:
+                # Missing indicators are recorded as blank spaces
+                indicators = [(str(indicator) + ' ')[0] for indicator in (list(indicators) + [' ', ' '])[:2]]
+                self.add_field(Field(tag=tag, indicators=indicators, subfields=data))
+
 
 class Field(object):
+    """A MARC field.
+
+    The subfields of a data field are held compactly: their codes in a string with one character
+    for each subfield, and their values in a single string, with the start and end of each value
+    in an array of offsets. Values are only extracted from the string when they are used.
+    """
+    __slots__ = ('tag', 'data', 'indicator1', 'indicator2', 'codes', 'text', 'bounds')
 
     def __init__(self, tag, indicators=None, subfields=None, data=''):
         if indicators is None: indicators = []
@@ -197,6 +580,7 @@ class Field(object):
 
         # Normalize tag to three digits
         self.tag = '%03s' % tag
+        self.codes, self.text, self.bounds = '', '', array('L')
 
         # Check if tag is a control field
         if self.tag < '010' and self.tag.isdigit():
@@ -204,12 +588,76 @@ class Field(object):
         elif self.tag in ALEPH_CONTROL_FIELDS:
             self.data = str(data)
         else:
-            self.indicator1, self.indicator2 = self.indicators = indicators
-            self.subfields = subfields
+            self.indicator1, self.indicator2 = indicators
+            self.set_subfields(subfields[0::2], subfields[1::2])
+
+    @classmethod
+    def decode(cls, tag, data):
+        """Decode a data field from MARC21 transmission format.
+        The field is decoded from UTF-8 in one step, and the values of the subfields are not split from it."""
+        field = cls.__new__(cls)
+        field.tag = tag
+        first = data.find(SUBFIELD_INDICATOR.encode('ascii'))
+        # Missing indicators are recorded as blank spaces.
+        # Extra indicators are ignored.
+        indicators = (data if first < 0 else data[:first]).decode('ascii') + '  '
+        field.indicator1, field.indicator2 = indicators[0], indicators[1]
+        field.codes, field.text, field.bounds = '', '', array('L')
+        if first < 0: return field
+        try: text = data[first + 1:].decode('utf-8', 'strict')
+        except:
+            # Subfields which cannot be decoded are ignored
+            codes, values = [], []
+            for subfield in data[first + 1:].split(SUBFIELD_INDICATOR.encode('ascii')):
+                if len(subfield) == 0: continue
+                try: code, value = subfield[0:1].decode('ascii'), subfield[1:].decode('utf-8', 'strict')
+                except: print('Error in subfield code')
+                else:
+                    codes.append(code)
+                    values.append(value)
+            field.set_subfields(codes, values)
+            return field
+        codes, bounds = [], []
+        start, length = 0, len(text)
+        while start <= length:
+            end = text.find(SUBFIELD_INDICATOR, start)
+            if end < 0: end = length
+            if end > start:
+                if text[start] < '\x80':
+                    codes.append(text[start])
+                    bounds.append(start + 1)
+                    bounds.append(end)
+                else: print('Error in subfield code')
+            start = end + 1
+        field.codes, field.text, field.bounds = ''.join(codes), text, array('L', bounds)
+        return field
+
+    def set_subfields(self, codes, values):
+        """Set the subfields of a data field from lists of their codes and values."""
+        bounds, start = [], 0
+        for value in values:
+            bounds.append(start)
+            start += len(value)
+            bounds.append(start)
+        # Subfield codes are single characters
+        self.codes = ''.join((str(code) + ' ')[0] for code in codes)
+        self.text = ''.join(values)
+        self.bounds = array('L', bounds)
+
+    @property
+    def indicators(self):
+        return [self.indicator1, self.indicator2]
+
+    @property
+    def subfields(self):
+        """List of alternating subfield codes and values."""
+        return [item for subfield in self for item in subfield]
 
     def __iter__(self):
-        self.__pos = 0
-        return self
+        """Iterate over the subfields of the field, as tuples of code and value."""
+        text, bounds = self.text, self.bounds
+        for i, code in enumerate(self.codes):
+            yield code, text[bounds[2 * i]:bounds[2 * i + 1]]
 
     def __str__(self):
         if self.is_control_field() or self.tag in ALEPH_CONTROL_FIELDS:
@@ -232,27 +680,20 @@ class Field(object):
         return None
 
     def __contains__(self, subfield):
-        subfields = self.get_subfields(subfield)
-        return len(subfields) > 0
-
-    def __next__(self):
-        if not hasattr(self, 'subfields'):
-            raise StopIteration
-        while self.__pos < len(self.subfields):
-            subfield = (self.subfields[self.__pos], self.subfields[self.__pos + 1])
-            self.__pos += 2
-            return subfield
-        raise StopIteration
+        return len(subfield) == 1 and subfield in self.codes
 
     def get_subfields(self, *codes, cleaning=True):
         """Accepts one or more subfield codes and returns a list of subfield values
         Subfields are cleaned unless clean=False (may be useful for subfields containing URLs)
         """
         values = []
-        for subfield in self:
-            if len(codes) == 0 or subfield[0] in codes:
-                if cleaning: values.append(clean(str(subfield[1])))
-                else: values.append(str(subfield[1]))
+        if len(codes) > 0 and not any(code in self.codes for code in codes): return values
+        text, bounds = self.text, self.bounds
+        for i, code in enumerate(self.codes):
+            if len(codes) == 0 or code in codes:
+                value = text[bounds[2 * i]:bounds[2 * i + 1]]
+                if cleaning: values.append(clean(value))
+                else: values.append(value)
         return values
 
     def is_control_field(self):
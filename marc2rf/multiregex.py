@@ -3,6 +3,9 @@
 
 """Classes for making multiple regex replacements in the Researcher Format transformation."""
 
+import hashlib
+import os
+import pickle
 import regex as re
 import sys
 
@@ -12,11 +15,41 @@ __version__ = '1.0.0'
 __status__ = '4 - Beta Development'
 
 
+# Folder for compiled patterns saved between runs, alongside Python's own compiled modules
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+
+
+def compile_cached(name, pattern, flags):
+    """Function to compile a regular expression, reusing a copy saved by a previous run.
+
+    Compiled patterns are pickled to CACHE_FOLDER, in a file named after the class and a
+    hash of the pattern, its flags and the version of regex, so a saved copy is ignored as
+    soon as any of these change. The saved copy is only an optimisation: if it cannot be
+    read or written, the pattern is compiled as normal.
+    """
+    digest = hashlib.sha1('{}\n{}\n{}'.format(re.__version__, int(flags), pattern).encode('utf-8')).hexdigest()
+    path = os.path.join(CACHE_FOLDER, '{}.{}.pickle'.format(name, digest[:16]))
+    try:
+        with open(path, 'rb') as file: return pickle.load(file)
+    except: pass
+    rx = re.compile(pattern, flags=flags)
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        temp_path = '{}.{}'.format(path, os.getpid())
+        with open(temp_path, 'wb') as file: pickle.dump(rx, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except: pass
+    return rx
+
+
 class MultiRegex(object):
     regexes = ()
 
     def __init__(self):
-        try: self._rx = re.compile('|'.join(self.regexes), flags=re.IGNORECASE | re.V1)
+        # The pattern is compiled once per class and shared by all instances
+        cls = type(self)
+        if '_rx' in cls.__dict__: return
+        try: cls._rx = compile_cached(cls.__name__, '|'.join(self.regexes), re.IGNORECASE | re.V1)
         except:
             for r in self.regexes:
                 try: re.compile(r)
@@ -5,6 +5,7 @@
 
 import regex as re
 import sys
+from marc2rf.multiregex import compile_cached
 
 __author__ = 'Victoria Morris'
 __license__ = 'MIT License'
@@ -16,7 +17,10 @@ class PublisherMultiRegex(object):
     regexes = ()
 
     def __init__(self):
-        try: self._rx = re.compile('|'.join(self.regexes), flags=re.IGNORECASE)
+        # The pattern is compiled once per class and shared by all instances
+        cls = type(self)
+        if '_rx' in cls.__dict__: return
+        try: cls._rx = compile_cached(cls.__name__, '|'.join(self.regexes), re.IGNORECASE)
         except:
             for r in self.regexes:
                 try: re.compile(r)
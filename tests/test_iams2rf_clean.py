@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+"""Golden-output tests for the string cleaning functions in iams2rf.
+
+The expected output in data/iams2rf_clean.json was produced by the original, unfused implementation of clean()
+and quick_clean(). The corpus contains hand-written cases covering quotation marks, control characters,
+Unicode spaces and hyphens, entities and markup, and a fixed set of random strings built from the same pieces.
+If the behaviour of clean() is changed deliberately, the expected output must be updated in the same commit.
+
+Run with:
+    python -m unittest discover tests
+"""
+
+# Import required modules
+import json
+import os
+import unittest
+
+from iams2rf.main import clean, quick_clean
+
+__author__ = 'Victoria Morris'
+__license__ = 'MIT License'
+__version__ = '1.0.0'
+__status__ = '4 - Beta Development'
+
+# ====================
+#     Constants
+# ====================
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'iams2rf_clean.json')
+
+
+# ====================
+#       Tests
+# ====================
+
+
+class CleanGoldenTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(CORPUS_PATH, mode='r', encoding='utf-8') as f:
+            cls.corpus = json.load(f)
+
+    def test_corpus_loaded(self):
+        self.assertGreater(len(self.corpus), 300)
+
+    def test_clean(self):
+        for case in self.corpus:
+            with self.subTest(input=case['input']):
+                self.assertEqual(clean(case['input']), case['clean'])
+
+    def test_quick_clean(self):
+        for case in self.corpus:
+            with self.subTest(input=case['input']):
+                self.assertEqual(quick_clean(case['input']), case['quick_clean'])
+                self.assertEqual(quick_clean(case['input'], hyphens=False), case['quick_clean_no_hyphens'])
+
+    def test_none(self):
+        self.assertEqual(clean(None), '')
+        self.assertEqual(quick_clean(None), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
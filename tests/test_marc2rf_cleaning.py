@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+"""Differential tests for the string cleaning functions in marc2rf.
+
+clean(), quick_clean() and check_brackets() skip passes that cannot change a string, and fold several passes
+into one. The original, straightforward implementations are kept below as a reference, and both versions are run
+over a generated corpus of subfields, which must produce identical output.
+
+Run with:
+    python -m unittest discover tests
+"""
+
+# Import required modules
+import html
+import random
+import unicodedata
+import unittest
+
+import regex as re
+
+from marc2rf.cleaning_functions import check_brackets, clean, quick_clean
+
+__author__ = 'Victoria Morris'
+__license__ = 'MIT License'
+__version__ = '1.0.0'
+__status__ = '4 - Beta Development'
+
+# ====================
+#     Constants
+# ====================
+
+BRACKETS = [('[', ']'), ('(', ')'), ('{', '}')]
+
+# Number of generated subfields, and the seed used to generate them
+CORPUS_SIZE = 5000
+CORPUS_SEED = 20261018
+
+# Pieces from which subfields are built
+PIECES = list('abcXYZ019 .,:;/-?$=+[](){}<>') + [
+    # Quotation marks, control characters and Unicode spaces
+    '"', '\u055a', '\u2018', '\u201d', '\u275e', '\uff07', '`',
+    '\t', '\n', '\r', '\x00', '\x1c', '\x1f', '\x85', '\x9f', '\u2028',
+    '\u00a0', '\u1680', '\u2003', '\u200a', '\u202f', '\u3000', '\u200b',
+    # Characters which need normalization
+    'e\u0301', '\u00e9', '\u1e9b\u0323', 'A\u030a', '\u212b',
+    # Entities and markup
+    '&amp;', '&lt;', '&gt;', '&quot;', '&#39;', '&eacute;', '&',
+    '<b>', '</b>', '<br/>', '<EMPH>', '</i>', '<sup>', '<p >', '<ul/>', '<li>',
+    # Words which are replaced
+    'pseud', 'pseud.', 'Pseud..', 'xpseud', '(adaptations)', '(Adaptions)', 'number more', 'number',
+    # Punctuation which is tidied up
+    '( ', ' )', ' ,', ',,', ',.', '.,', '. [', ' : (', '= =', '= :', '+,',
+    ' ', '  ', '   ', 'the ', 'Title', 'London',
+]
+
+
+# ====================
+#  Reference functions
+# ====================
+
+
+def reference_clean(string, hyphens=True, space=True):
+    """Original implementation of clean()"""
+    string = html.unescape(string)
+    string = re.sub(u'[\u0022\u055A\u05F4\u2018\u2019\u201A\u201B\u201C\u201D\u201E\u201F\u275B\u275C\u275D\u275E\uFF07]', '\'', string)
+    string = re.sub(
+        u'[\u0000-\u0009\u000A-\u000f\u0010-\u0019\u001A-\u001F\u0080-\u0089\u008A-\u008F\u0090-\u0099\u009A-\u009F\u2028\u2029]+',
+        '', string)
+    if space:
+        string = re.sub(r'\s+', ' ', string)
+        string = re.sub(u'[\u00A0\u1680\u2000-\u200A\u202F\u205F\u3000]+', ' ', string)
+        string = re.sub(r'\(adap(ta)?tions\)', '', string, flags=re.IGNORECASE)
+        string = re.sub(r'(?<![a-z])pseud\.*(?![a-z])', 'pseudonym', string, flags=re.IGNORECASE)
+        string = reference_quick_clean(string, hyphens)
+        string = re.sub(r'</*(b|br|emph|i|li|ol|p|sup|sub|ul)\s*/*>', ' ', string, flags=re.IGNORECASE)
+        string = re.sub(r'\s+', ' ', string)
+        string = reference_check_brackets(string)
+    string = unicodedata.normalize('NFC', string).strip()
+    return string
+
+
+def reference_quick_clean(string, hyphens=True):
+    """Original implementation of quick_clean()"""
+    l = r'?$.,:;/\])} ' if hyphens else r'?$.,:;/\-])} '
+    r = r'.,:;/\[({ ' if hyphens else r'.,:;/\-[({ '
+    string = re.sub(r'\s+', ' ', string.strip().lstrip(l).rstrip(r)).strip()
+    string = string.replace('( ', '(').replace(' )', ')')
+    string = string.replace(' ,', ',').replace(',,', ',').replace(',.', '.').replace('.,', ',')
+    string = string.replace('. [', ' [').replace(' : (', ' (').replace('= =', '=').replace('= :', '=').replace('+,', '+')
+    string = string.replace('number more', 'no more')
+    return string
+
+
+def reference_check_brackets(string):
+    """Original implementation of check_brackets()"""
+    string = reference_quick_clean(string)
+    for (oB, cB) in [('[', ']'), ('<', '>')]:
+        while string.startswith(oB) and string.endswith(cB):
+            string = reference_quick_clean(string[1:-1])
+    for (oB, cB) in BRACKETS:
+        while string.startswith(oB) and cB not in string:
+            string = reference_quick_clean(string[1:])
+        while string.endswith(cB) and oB not in string:
+            string = reference_quick_clean(string[:-1])
+    for (oB, cB) in BRACKETS:
+        while string.count(oB) > string.count(cB):
+            string = string + cB
+        while string.count(cB) > string.count(oB):
+            string = oB + string
+        string = reference_quick_clean(string)
+    for (oB, cB) in BRACKETS:
+        if oB in string and cB in string and string.index(cB) < string.index(oB):
+            string = reference_quick_clean(string.replace(cB, '').replace(oB, ''))
+    string = re.sub(r'\s*[)}>]\s*', ') ', re.sub(r'\s*[({<]\s*', ' (', string)).strip()
+    string = re.sub(r'\s*\]\s*', '] ', re.sub(r'\s*\[\s*', ' [', string)).strip()
+    string = string.replace('()', '').replace('{}', '').replace('[]', '').replace('<>', '')
+    string = unicodedata.normalize('NFC', string).strip()
+    return string
+
+
+def subfield_corpus(size=CORPUS_SIZE, seed=CORPUS_SEED):
+    """Function to generate a reproducible list of subfield values"""
+    rng = random.Random(seed)
+    return [''.join(rng.choice(PIECES) for i in range(rng.randint(0, 24))) for j in range(size)]
+
+
+# ====================
+#       Tests
+# ====================
+
+
+class CleaningDifferentialTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.corpus = subfield_corpus()
+
+    def test_clean(self):
+        for string in self.corpus:
+            for hyphens in [True, False]:
+                for space in [True, False]:
+                    with self.subTest(string=string, hyphens=hyphens, space=space):
+                        self.assertEqual(clean(string, hyphens, space), reference_clean(string, hyphens, space))
+
+    def test_quick_clean(self):
+        for string in self.corpus:
+            for hyphens in [True, False]:
+                with self.subTest(string=string, hyphens=hyphens):
+                    self.assertEqual(quick_clean(string, hyphens), reference_quick_clean(string, hyphens))
+
+    def test_check_brackets(self):
+        for string in self.corpus:
+            with self.subTest(string=string):
+                self.assertEqual(check_brackets(string), reference_check_brackets(string))
+
+
+if __name__ == '__main__':
+    unittest.main()